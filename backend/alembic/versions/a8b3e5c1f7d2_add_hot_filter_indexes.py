@@ -0,0 +1,53 @@
+"""add composite indexes for hot foreign keys and filters
+
+Revision ID: a8b3e5c1f7d2
+Revises: f7a2d4b9e1c6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8b3e5c1f7d2"
+down_revision: Union[str, Sequence[str], None] = "f7a2d4b9e1c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = (
+    ("ix_attendance_sessions_section_date", "attendance_sessions", ["section_id", "session_date"]),
+    ("ix_course_sections_faculty", "course_sections", ["faculty_id"]),
+    ("ix_section_enrollments_section_status", "section_enrollments", ["section_id", "status"]),
+    ("ix_section_enrollments_student_status", "section_enrollments", ["student_id", "status"]),
+    ("ix_food_menu_items_vendor", "food_menu_items", ["vendor_id"]),
+    ("ix_food_orders_student_order_time", "food_orders", ["student_id", "order_time"]),
+    ("ix_food_orders_vendor_order_time", "food_orders", ["vendor_id", "order_time"]),
+    ("ix_food_orders_order_date_vendor", "food_orders", ["order_date", "vendor_id"]),
+    ("ix_order_items_order", "order_items", ["order_id"]),
+    ("ix_remedial_attendance_student_marked_at", "remedial_attendance", ["student_id", "marked_at"]),
+    ("ix_notifications_user_created", "notifications", ["user_id", "created_at"]),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not block writes.
+    # A failed concurrent build leaves an INVALID index behind; drop it and rerun.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,26 @@
+"""add face profile quality stats
+
+Revision ID: a8e3f1c6d2b9
+Revises: c1d5a3f8e2b7
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8e3f1c6d2b9"
+down_revision: Union[str, Sequence[str], None] = "c1d5a3f8e2b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("student_face_profiles", sa.Column("quality_stats", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("student_face_profiles", "quality_stats")
@@ -0,0 +1,60 @@
+"""add attendance session closed_at
+
+Revision ID: b6c2e8f4a1d7
+Revises: d4b7e2a9c3f1
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6c2e8f4a1d7"
+down_revision: Union[str, Sequence[str], None] = "d4b7e2a9c3f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The cube refresh finds newly closed sessions by server close time instead of end_time, which AI
+    # capture takes from the photo. Sessions closed before this revision are already in the cube.
+    op.add_column("attendance_sessions", sa.Column("closed_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE attendance_sessions SET closed_at = end_time WHERE is_closed")
+    # attendance_sessions takes writes all day; build its index without blocking them.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_attendance_sessions_closed_at",
+            "attendance_sessions",
+            ["closed_at"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_attendance_sessions_end_time",
+            table_name="attendance_sessions",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_attendance_sessions_end_time",
+            "attendance_sessions",
+            ["end_time"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_attendance_sessions_closed_at",
+            table_name="attendance_sessions",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_column("attendance_sessions", "closed_at")
@@ -0,0 +1,44 @@
+"""add notification digest events
+
+Revision ID: b8d4f1a6c2e7
+Revises: a7c2e5d9b3f4
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f1a6c2e7"
+down_revision: Union[str, Sequence[str], None] = "a7c2e5d9b3f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_digest_events",
+        sa.Column("event_id", sa.UUID(), nullable=False),
+        sa.Column("channel", sa.String(length=20), nullable=False),
+        sa.Column("audience", sa.String(length=20), nullable=False),
+        sa.Column("recipient", sa.String(length=255), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=False),
+        sa.Column("reference_id", sa.UUID(), nullable=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.Column("flush_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_index("ix_notification_digest_events_flush_at", "notification_digest_events", ["flush_at"], unique=False)
+    op.create_index(
+        "ix_notification_digest_events_recipient", "notification_digest_events", ["recipient", "channel"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_digest_events_recipient", table_name="notification_digest_events")
+    op.drop_index("ix_notification_digest_events_flush_at", table_name="notification_digest_events")
+    op.drop_table("notification_digest_events")
@@ -0,0 +1,157 @@
+"""partition attendance_records by month of session_date
+
+Revision ID: b9c4f2e7a1d3
+Revises: a8b3e5c1f7d2
+Create Date: 2026-10-19 19:00:00.000000
+
+Rebuilds attendance_records as a table range-partitioned on a new session_date column (copied
+from the session), one partition per month plus a default partition. Every row is copied, so run
+it in a maintenance window. Later months are created by the partition maintenance job
+(app/services/attendance_partitions.py).
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b9c4f2e7a1d3"
+down_revision: Union[str, Sequence[str], None] = "a8b3e5c1f7d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+COLUMNS = "record_id, session_id, student_id, session_date, status, marked_at, marked_by, confidence_score, image_url"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_archive_table() -> None:
+    op.create_table(
+        "attendance_record_archives",
+        sa.Column("partition_name", sa.String(length=63), nullable=False),
+        sa.Column("range_start", sa.Date(), nullable=False),
+        sa.Column("range_end", sa.Date(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("location", sa.String(length=500), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("partition_name"),
+    )
+
+
+def upgrade() -> None:
+    _create_archive_table()
+
+    op.execute(
+        """
+        CREATE TABLE attendance_records_partitioned (
+            record_id UUID NOT NULL,
+            session_id UUID,
+            student_id UUID,
+            session_date DATE NOT NULL,
+            status VARCHAR(20) NOT NULL,
+            marked_at TIMESTAMP WITHOUT TIME ZONE,
+            marked_by VARCHAR(50),
+            confidence_score FLOAT,
+            image_url VARCHAR(500)
+        ) PARTITION BY RANGE (session_date)
+        """
+    )
+    op.execute("CREATE TABLE attendance_records_default PARTITION OF attendance_records_partitioned DEFAULT")
+
+    first = op.get_bind().execute(
+        sa.text(
+            "SELECT MIN(s.session_date) FROM attendance_records r "
+            "JOIN attendance_sessions s ON s.session_id = r.session_id"
+        )
+    ).scalar()
+    this_month = date.today().replace(day=1)
+    month = min(first.replace(day=1), this_month) if first else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE attendance_records_p{month:%Y%m} PARTITION OF attendance_records_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    # Records without a session (mock data) are filed under the day they were marked.
+    op.execute(
+        f"""
+        INSERT INTO attendance_records_partitioned ({COLUMNS})
+        SELECT r.record_id, r.session_id, r.student_id,
+               COALESCE(s.session_date, CAST(r.marked_at AS DATE), CURRENT_DATE),
+               r.status, r.marked_at, r.marked_by, r.confidence_score, r.image_url
+        FROM attendance_records r
+        LEFT JOIN attendance_sessions s ON s.session_id = r.session_id
+        """
+    )
+    op.drop_table("attendance_records")
+    op.rename_table("attendance_records_partitioned", "attendance_records")
+
+    # Defined on the parent, these cascade to every current and future partition.
+    op.create_primary_key("attendance_records_pkey", "attendance_records", ["record_id", "session_date"])
+    op.create_unique_constraint(
+        "uq_attendance_records_session_student",
+        "attendance_records",
+        ["session_id", "student_id", "session_date"],
+    )
+    op.create_foreign_key(
+        "attendance_records_session_id_fkey",
+        "attendance_records",
+        "attendance_sessions",
+        ["session_id"],
+        ["session_id"],
+    )
+    op.create_index(
+        "ix_attendance_records_student_marked_at",
+        "attendance_records",
+        ["student_id", "marked_at"],
+        unique=False,
+    )
+    op.execute("ANALYZE attendance_records")
+
+
+def downgrade() -> None:
+    # Rows in archived months are not restored; use attendance_partitions.restore_partition first.
+    op.execute(
+        """
+        CREATE TABLE attendance_records_unpartitioned (
+            record_id UUID NOT NULL PRIMARY KEY,
+            session_id UUID REFERENCES attendance_sessions (session_id),
+            student_id UUID,
+            status VARCHAR(20) NOT NULL,
+            marked_at TIMESTAMP WITHOUT TIME ZONE,
+            marked_by VARCHAR(50),
+            confidence_score FLOAT,
+            image_url VARCHAR(500)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO attendance_records_unpartitioned
+            (record_id, session_id, student_id, status, marked_at, marked_by, confidence_score, image_url)
+        SELECT record_id, session_id, student_id, status, marked_at, marked_by, confidence_score, image_url
+        FROM attendance_records
+        """
+    )
+    op.drop_table("attendance_records")
+    op.rename_table("attendance_records_unpartitioned", "attendance_records")
+    op.create_unique_constraint(
+        "uq_attendance_records_session_student",
+        "attendance_records",
+        ["session_id", "student_id"],
+    )
+    op.create_index(
+        "ix_attendance_records_student_marked_at",
+        "attendance_records",
+        ["student_id", "marked_at"],
+        unique=False,
+    )
+    op.drop_table("attendance_record_archives")
@@ -0,0 +1,89 @@
+"""add attendance analytics cube
+
+Revision ID: c1d5a3f8e2b7
+Revises: b9c4f2e7a1d3
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c1d5a3f8e2b7"
+down_revision: Union[str, Sequence[str], None] = "b9c4f2e7a1d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left empty: the first refresh (Celery beat or POST /api/attendance/analytics/refresh) builds every cell.
+    op.create_table(
+        "attendance_cube",
+        sa.Column("section_id", sa.UUID(), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("session_type", sa.String(length=50), nullable=False),
+        sa.Column("course_id", sa.UUID(), nullable=True),
+        sa.Column("department", sa.String(length=100), nullable=True),
+        sa.Column("session_count", sa.Integer(), nullable=False),
+        sa.Column("present_count", sa.Integer(), nullable=False),
+        sa.Column("absent_count", sa.Integer(), nullable=False),
+        sa.Column("enrolled_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("section_id", "week_start", "session_type"),
+    )
+    op.create_index("ix_attendance_cube_department_week", "attendance_cube", ["department", "week_start"], unique=False)
+    op.create_index("ix_attendance_cube_course_week", "attendance_cube", ["course_id", "week_start"], unique=False)
+    op.create_index("ix_attendance_cube_week", "attendance_cube", ["week_start"], unique=False)
+
+    op.create_table(
+        "attendance_cube_refreshes",
+        sa.Column("refresh_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("full", sa.Boolean(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("sessions_folded", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("refresh_id"),
+    )
+    op.create_index(
+        "ix_attendance_cube_refreshes_finished_at", "attendance_cube_refreshes", ["finished_at"], unique=False
+    )
+
+    op.create_table(
+        "attendance_cube_sessions",
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("refresh_id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("session_id"),
+    )
+    op.create_index("ix_attendance_cube_sessions_refresh", "attendance_cube_sessions", ["refresh_id"], unique=False)
+
+    # attendance_sessions takes writes all day; build its index without blocking them.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_attendance_sessions_end_time",
+            "attendance_sessions",
+            ["end_time"],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_attendance_sessions_end_time",
+            table_name="attendance_sessions",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_index("ix_attendance_cube_sessions_refresh", table_name="attendance_cube_sessions")
+    op.drop_table("attendance_cube_sessions")
+    op.drop_index("ix_attendance_cube_refreshes_finished_at", table_name="attendance_cube_refreshes")
+    op.drop_table("attendance_cube_refreshes")
+    op.drop_index("ix_attendance_cube_week", table_name="attendance_cube")
+    op.drop_index("ix_attendance_cube_course_week", table_name="attendance_cube")
+    op.drop_index("ix_attendance_cube_department_week", table_name="attendance_cube")
+    op.drop_table("attendance_cube")
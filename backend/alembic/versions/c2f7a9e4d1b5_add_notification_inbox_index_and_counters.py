@@ -0,0 +1,51 @@
+"""add notification inbox index and unread counters
+
+Revision ID: c2f7a9e4d1b5
+Revises: b8d4f1a6c2e7
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f7a9e4d1b5"
+down_revision: Union[str, Sequence[str], None] = "b8d4f1a6c2e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notifications_user_read_created",
+        "notifications",
+        ["user_id", "is_read", "created_at"],
+        unique=False,
+    )
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.user_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute("UPDATE notifications SET is_read = false WHERE is_read IS NULL")
+    # Seed counters from existing rows; afterwards they are maintained incrementally.
+    op.execute(
+        """
+        INSERT INTO notification_counters (user_id, unread_count, updated_at)
+        SELECT user_id, COUNT(*), CURRENT_TIMESTAMP
+        FROM notifications
+        WHERE is_read = false AND user_id IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("notification_counters")
+    op.drop_index("ix_notifications_user_read_created", table_name="notifications")
@@ -0,0 +1,29 @@
+"""add face profile prototypes
+
+Revision ID: d4b7e2a9c3f1
+Revises: a8e3f1c6d2b9
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e2a9c3f1"
+down_revision: Union[str, Sequence[str], None] = "a8e3f1c6d2b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing profiles keep matching on embedding_vector until the student re-enrolls.
+    op.add_column("student_face_profiles", sa.Column("prototype_vectors", sa.LargeBinary(), nullable=True))
+    op.add_column("student_face_profiles", sa.Column("prototype_count", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("student_face_profiles", "prototype_count")
+    op.drop_column("student_face_profiles", "prototype_vectors")
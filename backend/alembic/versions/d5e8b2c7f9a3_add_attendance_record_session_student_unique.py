@@ -0,0 +1,50 @@
+"""add unique (session_id, student_id) to attendance records
+
+Revision ID: d5e8b2c7f9a3
+Revises: c2f7a9e4d1b5
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5e8b2c7f9a3"
+down_revision: Union[str, Sequence[str], None] = "c2f7a9e4d1b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the latest mark when a student was recorded more than once in a session.
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM attendance_records
+            WHERE record_id IN (
+                SELECT record_id FROM (
+                    SELECT record_id,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY session_id, student_id
+                               ORDER BY marked_at DESC NULLS LAST, record_id DESC
+                           ) AS position
+                    FROM attendance_records
+                    WHERE session_id IS NOT NULL AND student_id IS NOT NULL
+                ) ranked
+                WHERE ranked.position > 1
+            )
+            """
+        )
+    )
+    op.create_unique_constraint(
+        "uq_attendance_records_session_student",
+        "attendance_records",
+        ["session_id", "student_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_attendance_records_session_student", "attendance_records", type_="unique")
@@ -0,0 +1,66 @@
+"""add student section attendance stats
+
+Revision ID: e6f1c3a8d2b4
+Revises: d5e8b2c7f9a3
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e6f1c3a8d2b4"
+down_revision: Union[str, Sequence[str], None] = "d5e8b2c7f9a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "student_section_attendance_stats",
+        sa.Column("student_id", sa.UUID(), nullable=False),
+        sa.Column("section_id", sa.UUID(), nullable=False),
+        sa.Column("present_count", sa.Integer(), nullable=False),
+        sa.Column("total_count", sa.Integer(), nullable=False),
+        sa.Column("attendance_percent", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("student_id", "section_id"),
+    )
+    op.create_index(
+        "ix_attendance_stats_section_percent",
+        "student_section_attendance_stats",
+        ["section_id", "attendance_percent"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_attendance_stats_student",
+        "student_section_attendance_stats",
+        ["student_id"],
+        unique=False,
+    )
+    # Backfill from closed sessions; afterwards rows are maintained as sessions close.
+    op.execute(
+        """
+        INSERT INTO student_section_attendance_stats
+            (student_id, section_id, present_count, total_count, attendance_percent, updated_at)
+        SELECT r.student_id,
+               s.section_id,
+               SUM(CASE WHEN r.status = 'present' THEN 1 ELSE 0 END),
+               COUNT(*),
+               100.0 * SUM(CASE WHEN r.status = 'present' THEN 1 ELSE 0 END) / COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM attendance_records r
+        JOIN attendance_sessions s ON s.session_id = r.session_id
+        WHERE s.is_closed = true AND s.section_id IS NOT NULL AND r.student_id IS NOT NULL
+        GROUP BY r.student_id, s.section_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_stats_student", table_name="student_section_attendance_stats")
+    op.drop_index("ix_attendance_stats_section_percent", table_name="student_section_attendance_stats")
+    op.drop_table("student_section_attendance_stats")
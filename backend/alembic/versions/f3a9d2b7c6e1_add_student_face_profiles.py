@@ -0,0 +1,54 @@
+"""add student face profiles
+
+Revision ID: f3a9d2b7c6e1
+Revises: e1a2c3d4f5a6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d2b7c6e1"
+down_revision: Union[str, Sequence[str], None] = "e1a2c3d4f5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped while the app ran create_all at import already have this table.
+    if sa.inspect(op.get_bind()).has_table("student_face_profiles"):
+        return
+
+    op.create_table(
+        "student_face_profiles",
+        sa.Column("profile_id", sa.UUID(), nullable=False),
+        sa.Column("student_id", sa.UUID(), nullable=False),
+        sa.Column("embedding_vector", sa.Text(), nullable=False),
+        sa.Column("model_name", sa.String(length=64), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("consent_given", sa.Boolean(), nullable=False),
+        sa.Column("approval_status", sa.String(length=20), nullable=False),
+        sa.Column("reviewed_by", sa.UUID(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["students.student_id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["reviewed_by"], ["users.user_id"]),
+        sa.PrimaryKeyConstraint("profile_id"),
+    )
+    op.create_index(
+        op.f("ix_student_face_profiles_student_id"), "student_face_profiles", ["student_id"], unique=True
+    )
+    op.create_index(
+        op.f("ix_student_face_profiles_approval_status"), "student_face_profiles", ["approval_status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_student_face_profiles_approval_status"), table_name="student_face_profiles")
+    op.drop_index(op.f("ix_student_face_profiles_student_id"), table_name="student_face_profiles")
+    op.drop_table("student_face_profiles")
@@ -0,0 +1,30 @@
+"""add (student_id, marked_at) index to attendance records
+
+Revision ID: f7a2d4b9e1c6
+Revises: e6f1c3a8d2b4
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a2d4b9e1c6"
+down_revision: Union[str, Sequence[str], None] = "e6f1c3a8d2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_attendance_records_student_marked_at",
+        "attendance_records",
+        ["student_id", "marked_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_records_student_marked_at", table_name="attendance_records")
@@ -0,0 +1,183 @@
+"""Face detection + embedding backends and the per-process registry that keeps them loaded.
+
+A backend turns decoded RGB arrays into face boxes and embeddings. ``get_backend`` builds each one the
+first time it is asked for and keeps it for the life of the worker process, so model weights load once
+rather than per request (``AI_PRELOAD_ON_STARTUP`` does that at boot). Backends whose dependencies are
+missing raise RuntimeError from ``load``.
+
+``embedding_model`` names the embedding space: profiles are only matched against detections from a
+backend with the same ``embedding_model`` (both dlib detectors share dlib's ResNet encoder).
+"""
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.ai.runtime import load_face_recognition, load_numpy, load_onnxruntime, load_pil_image
+from app.config import settings
+
+# face_recognition's box order: top, right, bottom, left.
+FaceBox = Tuple[int, int, int, int]
+
+
+class FaceBackend:
+    name = ""
+    embedding_model = ""
+
+    def load(self) -> None:
+        """Load model weights; called once per process by ``get_backend``."""
+
+    def detect(self, pixels) -> List[FaceBox]:
+        raise NotImplementedError
+
+    def encode(self, pixels, boxes: Sequence[FaceBox]) -> List:
+        raise NotImplementedError
+
+    def landmarks(self, pixels, boxes: Sequence[FaceBox]) -> Optional[List[Dict]]:
+        """face_recognition-style landmark dicts (``left_eye``, ``right_eye``, ``nose_tip``), if supported."""
+        return None
+
+    def detect_batch(self, images: Sequence) -> List[List[FaceBox]]:
+        return [self.detect(pixels) for pixels in images]
+
+    def embed(self, images: Sequence) -> List[Tuple[List[FaceBox], List]]:
+        """Boxes and (unnormalized) embeddings for every face in each image."""
+        return [(boxes, self.encode(pixels, boxes)) for pixels, boxes in zip(images, self.detect_batch(images))]
+
+
+class DlibBackend(FaceBackend):
+    """dlib through face_recognition: HOG (fast, frontal faces) or the CNN detector (slower, on CPU here)."""
+
+    embedding_model = "face-recognition"
+
+    def __init__(self, detector: str = "hog", face_recognition=None):
+        self.detector = detector
+        self.name = f"dlib-{detector}"
+        self._face_recognition = face_recognition
+
+    def load(self) -> None:
+        # face_recognition loads dlib's detector, landmark and encoder weights when it is imported.
+        if self._face_recognition is None:
+            self._face_recognition = load_face_recognition()
+        if self._face_recognition is None:
+            raise RuntimeError(f"The {self.name} face backend requires the face_recognition package")
+
+    def detect(self, pixels) -> List[FaceBox]:
+        return [tuple(box) for box in self._face_recognition.face_locations(pixels, model=self.detector)]
+
+    def detect_batch(self, images: Sequence) -> List[List[FaceBox]]:
+        # dlib's CNN detector batches same-sized frames in one pass; HOG has no batch mode.
+        batchable = self.detector == "cnn" and len(images) > 1 and len({pixels.shape for pixels in images}) == 1
+        if not batchable or not hasattr(self._face_recognition, "batch_face_locations"):
+            return super().detect_batch(images)
+        found = self._face_recognition.batch_face_locations(list(images), batch_size=len(images))
+        return [[tuple(box) for box in boxes] for boxes in found]
+
+    def encode(self, pixels, boxes: Sequence[FaceBox]) -> List:
+        if not boxes:
+            return []
+        return list(self._face_recognition.face_encodings(pixels, list(boxes)))
+
+    def landmarks(self, pixels, boxes: Sequence[FaceBox]) -> Optional[List[Dict]]:
+        if not boxes or not hasattr(self._face_recognition, "face_landmarks"):
+            return None
+        return self._face_recognition.face_landmarks(pixels, list(boxes), model="small")
+
+
+class OnnxArcFaceBackend(FaceBackend):
+    """An ArcFace-style ONNX embedder (N x 3 x 112 x 112 RGB in, one embedding per row out) on CPU.
+
+    Faces are found with dlib HOG; the crops of every image in a batch go through one ``session.run``.
+    """
+
+    name = "onnx-arcface"
+    input_size = 112
+
+    def __init__(self, model_path: str = ""):
+        self.model_path = model_path
+        self.embedding_model = f"onnx-{Path(model_path).stem}" if model_path else "onnx"
+        self._detector = DlibBackend("hog")
+        self._session = None
+        self._input_name = ""
+
+    def load(self) -> None:
+        onnxruntime = load_onnxruntime()
+        if onnxruntime is None:
+            raise RuntimeError("The onnx-arcface face backend requires the onnxruntime package")
+        if not self.model_path or not Path(self.model_path).is_file():
+            raise RuntimeError("Set AI_ONNX_MODEL_PATH to an ArcFace-style .onnx model for the onnx-arcface backend")
+        self._detector.load()
+        options = onnxruntime.SessionOptions()
+        if settings.AI_ONNX_THREADS > 0:
+            options.intra_op_num_threads = settings.AI_ONNX_THREADS
+        self._session = onnxruntime.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def detect(self, pixels) -> List[FaceBox]:
+        return self._detector.detect(pixels)
+
+    def landmarks(self, pixels, boxes: Sequence[FaceBox]) -> Optional[List[Dict]]:
+        return self._detector.landmarks(pixels, boxes)
+
+    def _crop(self, pixels, box: FaceBox):
+        np = load_numpy()
+        top, right, bottom, left = box
+        face = pixels[max(top, 0):bottom, max(left, 0):right]
+        resized = load_pil_image().fromarray(face).resize((self.input_size, self.input_size))
+        return (np.asarray(resized, dtype=np.float32).transpose(2, 0, 1) - 127.5) / 127.5
+
+    def _run(self, crops: List) -> List:
+        if not crops:
+            return []
+        np = load_numpy()
+        embeddings = self._session.run(None, {self._input_name: np.stack(crops)})[0]
+        return list(embeddings)
+
+    def encode(self, pixels, boxes: Sequence[FaceBox]) -> List:
+        return self._run([self._crop(pixels, box) for box in boxes])
+
+    def embed(self, images: Sequence) -> List[Tuple[List[FaceBox], List]]:
+        found = self.detect_batch(images)
+        embeddings = self._run([self._crop(pixels, box) for pixels, boxes in zip(images, found) for box in boxes])
+        results, start = [], 0
+        for boxes in found:
+            results.append((boxes, embeddings[start:start + len(boxes)]))
+            start += len(boxes)
+        return results
+
+
+_factories: Dict[str, Callable[[], FaceBackend]] = {
+    "dlib-hog": lambda: DlibBackend("hog"),
+    "dlib-cnn": lambda: DlibBackend("cnn"),
+    "onnx-arcface": lambda: OnnxArcFaceBackend(settings.AI_ONNX_MODEL_PATH),
+}
+_loaded: Dict[str, FaceBackend] = {}
+_lock = threading.Lock()
+
+
+def register_backend(name: str, factory: Callable[[], FaceBackend]) -> None:
+    with _lock:
+        _factories[name] = factory
+        _loaded.pop(name, None)
+
+
+def backend_names() -> List[str]:
+    return sorted(_factories)
+
+
+def get_backend(name: Optional[str] = None) -> FaceBackend:
+    """The loaded backend ``name`` (default ``AI_FACE_BACKEND``); raises RuntimeError if it cannot load."""
+    name = name or settings.AI_FACE_BACKEND
+    backend = _loaded.get(name)
+    if backend is None:
+        with _lock:
+            backend = _loaded.get(name)
+            if backend is None:
+                factory = _factories.get(name)
+                if factory is None:
+                    raise RuntimeError(f"Unknown face backend {name!r}; choose one of {', '.join(sorted(_factories))}")
+                backend = factory()
+                backend.load()
+                _loaded[name] = backend
+    return backend
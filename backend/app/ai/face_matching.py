@@ -0,0 +1,91 @@
+"""Per-student prototype embeddings and the vectorized matcher over them.
+
+A profile keeps up to K unit-length prototypes (e.g. with and without glasses) instead of one average,
+stored as a packed float32 K x d array. Matching scores every detection against every prototype of
+every student in one detections x (students * K) matmul, then takes each student's best prototype
+with a segment max over the columns.
+"""
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.ai.runtime import load_numpy
+
+KMEANS_ITERATIONS = 10
+
+
+def _unit_rows(matrix):
+    np = load_numpy()
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-8)
+
+
+def _kmeans(samples, centers):
+    np = load_numpy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(samples @ centers.T, axis=1)
+        updated = _unit_rows(np.vstack([
+            samples[assignment == cluster].sum(axis=0) if np.any(assignment == cluster) else centers[cluster]
+            for cluster in range(len(centers))
+        ]))
+        if np.allclose(updated, centers):
+            break
+        centers = updated
+    return centers
+
+
+def build_prototypes(embeddings: List, count: int, min_members: int = 2):
+    """Spherical k-means over unit ``embeddings``: at most ``count`` unit prototypes, farthest-point seeded.
+
+    Every prototype averages at least ``min_members`` samples (unless there are fewer samples than
+    that): the smallest undersized cluster is dropped and k-means re-run until none is left, so a
+    single odd photo never matches on its own.
+    """
+    np = load_numpy()
+    samples = _unit_rows(np.vstack(embeddings).astype(np.float32))
+    count = max(1, min(count, len(samples)))
+    similarities = samples @ samples.T
+    # Seed with the medoid, then repeatedly with the sample least similar to every seed so far.
+    seeds = [int(np.argmax(similarities.sum(axis=1)))]
+    while len(seeds) < count:
+        seeds.append(int(np.argmin(similarities[:, seeds].max(axis=1))))
+    centers = samples[seeds]
+    while True:
+        centers = _kmeans(samples, centers)
+        sizes = np.bincount(np.argmax(samples @ centers.T, axis=1), minlength=len(centers))
+        undersized = np.flatnonzero(sizes < min_members)
+        if len(undersized) == 0 or len(centers) == 1:
+            break
+        # Its samples join their next-closest prototype on the re-run.
+        centers = np.delete(centers, undersized[np.argmin(sizes[undersized])], axis=0)
+    return np.ascontiguousarray(centers, dtype=np.float32)
+
+
+def pack_prototypes(prototypes) -> bytes:
+    np = load_numpy()
+    return np.ascontiguousarray(prototypes, dtype=np.float32).tobytes()
+
+
+def unpack_prototypes(blob: bytes, count: int):
+    np = load_numpy()
+    return np.frombuffer(blob, dtype=np.float32).reshape(count, -1)
+
+
+class PrototypeGallery:
+    """Every prototype of a roster stacked into one matrix, grouped by student for a segment max."""
+
+    def __init__(self, prototypes_by_student: Dict[Hashable, object]):
+        np = load_numpy()
+        self.student_ids = list(prototypes_by_student)
+        blocks = [np.atleast_2d(prototypes_by_student[student_id]) for student_id in self.student_ids]
+        self.matrix = np.vstack(blocks).astype(np.float32) if blocks else None
+        self.segment_starts = np.cumsum([0] + [len(block) for block in blocks[:-1]])
+
+    def best_matches(self, detections) -> List[Tuple[Optional[Hashable], float]]:
+        """For each detection, the student whose closest prototype is most similar, and that cosine similarity."""
+        np = load_numpy()
+        if self.matrix is None or len(detections) == 0:
+            return [(None, -1.0) for _ in detections]
+        similarities = np.vstack(detections).astype(np.float32) @ self.matrix.T
+        per_student = np.maximum.reduceat(similarities, self.segment_starts, axis=1)
+        best = np.argmax(per_student, axis=1)
+        scores = per_student[np.arange(len(best)), best]
+        return [(self.student_ids[column], float(score)) for column, score in zip(best, scores)]
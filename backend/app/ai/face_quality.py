@@ -0,0 +1,72 @@
+"""Quality scores for face enrollment samples: sharpness, face size, a frontal-pose proxy and outlier rejection.
+
+One blurry, tiny or off-angle sample drags an averaged profile away from the student's real face, so
+enrollment scores each sample, drops the ones below these gates, then drops embeddings that sit far
+from the samples' medoid (the sample closest to all the others) before averaging the rest.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from app.ai.runtime import load_numpy
+
+# Variance of the Laplacian over the face crop (grayscale 0-255); motion blur and defocus land well below this.
+MIN_SHARPNESS = 40.0
+# Shorter side of the detected face box; face_recognition encodes a 150 px crop, smaller faces are upscaled noise.
+MIN_FACE_PIXELS = 80
+# |nose offset from the eye midpoint| / eye distance: ~0 looking at the camera, ~0.5 at a three-quarter turn.
+MAX_YAW = 0.3
+# Cosine distance from the medoid embedding; same-face samples from face_recognition stay well inside this.
+MAX_MEDOID_DISTANCE = 0.2
+# Enrollment fails unless at least this many samples pass every gate.
+MIN_ACCEPTED_SAMPLES = 3
+
+
+def sharpness(pixels, location) -> float:
+    """Variance of the 4-neighbour Laplacian over the face box (``location`` is face_recognition's top, right, bottom, left)."""
+    np = load_numpy()
+    top, right, bottom, left = location
+    crop = pixels[max(top, 0):bottom, max(left, 0):right]
+    if crop.shape[0] < 3 or crop.shape[1] < 3:
+        return 0.0
+    gray = crop[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    laplacian = (
+        gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:] - 4.0 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+
+def face_pixels(location) -> int:
+    top, right, bottom, left = location
+    return int(min(bottom - top, right - left))
+
+
+def yaw_proxy(landmarks: Optional[Dict[str, Sequence]]) -> Optional[float]:
+    """Horizontal nose offset from the eye midpoint over the eye distance, from face_recognition landmarks."""
+    if not landmarks or not all(landmarks.get(part) for part in ("left_eye", "right_eye", "nose_tip")):
+        return None
+    left_x = sum(point[0] for point in landmarks["left_eye"]) / len(landmarks["left_eye"])
+    right_x = sum(point[0] for point in landmarks["right_eye"]) / len(landmarks["right_eye"])
+    nose_x = sum(point[0] for point in landmarks["nose_tip"]) / len(landmarks["nose_tip"])
+    eye_distance = abs(right_x - left_x)
+    if eye_distance < 1e-6:
+        return None
+    return float(abs(nose_x - (left_x + right_x) / 2) / eye_distance)
+
+
+def gate_reason(stats: Dict) -> Optional[str]:
+    """Why a scored sample fails the sharpness/size/pose gates, or None when it passes."""
+    if stats.get("face_pixels") is not None and stats["face_pixels"] < MIN_FACE_PIXELS:
+        return "face too small"
+    if stats.get("sharpness") is not None and stats["sharpness"] < MIN_SHARPNESS:
+        return "too blurry"
+    if stats.get("yaw") is not None and stats["yaw"] > MAX_YAW:
+        return "not facing the camera"
+    return None
+
+
+def medoid_distances(embeddings: List) -> List[float]:
+    """Cosine distance of each (unit-length) embedding from the medoid of the set."""
+    np = load_numpy()
+    stacked = np.vstack(embeddings)
+    distances = 1.0 - stacked @ stacked.T
+    medoid = int(np.argmin(distances.sum(axis=1)))
+    return [float(max(distance, 0.0)) for distance in distances[medoid]]
@@ -1,196 +1,161 @@
-import cv2
-import face_recognition
-import numpy as np
-from typing import List, Dict, Tuple
-from sqlalchemy.orm import Session
-from app.models.student import Student
-from app.models.course import SectionEnrollment
-import json
+"""Path/base64-oriented face recognition helpers on top of the ai_service engine.
+
+Images stay in memory end to end: a path, encoded bytes, a file object or a decoded array all go
+through the configured face backend (and its detection cache) exactly like the capture endpoints.
+"""
 import base64
-from PIL import Image
+import binascii
 import io
+import json
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.ai.runtime import load_numpy
+from app.models.course import SectionEnrollment
+from app.models.student import Student
+from app.services import ai_service
+
+
+def _open_image(image):
+    """Paths are read into memory; bytes, file objects and decoded arrays pass through."""
+    if isinstance(image, str):
+        with open(image, "rb") as file:
+            return file.read()
+    return image
+
 
 class FaceRecognitionService:
     """Service for AI-based face recognition attendance"""
-    
+
     @staticmethod
-    def encode_face_from_image(image_path: str) -> List[float]:
+    def encode_face_from_image(image) -> List[float]:
         """
-        Extract face encoding from an image
-        Returns: List of 128 facial features
+        Extract the face encoding from an image with exactly one face
+        ``image``: a path, encoded bytes, a file object or a decoded RGB array
+        Returns: the unit-length embedding as a list of floats
         """
-        try:
-            # Load image
-            image = face_recognition.load_image_file(image_path)
-            
-            # Detect faces
-            face_locations = face_recognition.face_locations(image)
-            
-            if len(face_locations) == 0:
-                raise ValueError("No face detected in the image")
-            
-            if len(face_locations) > 1:
-                raise ValueError("Multiple faces detected. Please upload image with single face")
-            
-            # Get face encoding
-            face_encodings = face_recognition.face_encodings(image, face_locations)
-            
-            if len(face_encodings) > 0:
-                return face_encodings[0].tolist()
-            else:
-                raise ValueError("Could not encode face")
-                
-        except Exception as e:
-            raise Exception(f"Face encoding error: {str(e)}")
-    
+        backend = ai_service._require_capture_backend()
+        pixels = ai_service._decode_image(_open_image(image))
+
+        face_locations = backend.detect(pixels)
+        if len(face_locations) == 0:
+            raise ValueError("No face detected in the image")
+        if len(face_locations) > 1:
+            raise ValueError("Multiple faces detected. Please upload image with single face")
+
+        face_encodings = backend.encode(pixels, face_locations)
+        if not face_encodings:
+            raise ValueError("Could not encode face")
+        return ai_service._normalize_embedding(face_encodings[0].tolist()).tolist()
+
     @staticmethod
-    def enroll_student_face(db: Session, student_id: str, image_path: str) -> Dict:
+    def enroll_student_face(db: Session, student_id: str, image) -> Dict:
         """
         Enroll a student's face for recognition
         """
-        try:
-            # Get face encoding
-            face_encoding = FaceRecognitionService.encode_face_from_image(image_path)
-            
-            # Store in database
-            student = db.query(Student).filter(Student.student_id == student_id).first()
-            
-            if not student:
-                raise ValueError("Student not found")
-            
-            # Convert encoding to JSON string
-            encoding_json = json.dumps(face_encoding)
-            student.face_encoding = encoding_json
-            
-            db.commit()
-            
-            return {
-                "success": True,
-                "message": "Face enrolled successfully",
-                "student_id": student_id
-            }
-            
-        except Exception as e:
-            raise Exception(f"Enrollment error: {str(e)}")
-    
+        student = db.query(Student).filter(Student.student_id == student_id).first()
+        if not student:
+            raise LookupError("Student not found")
+
+        face_encoding = FaceRecognitionService.encode_face_from_image(image)
+        student.face_encoding = json.dumps(face_encoding)
+        db.commit()
+
+        return {
+            "success": True,
+            "message": "Face enrolled successfully",
+            "student_id": student_id
+        }
+
     @staticmethod
-    def mark_attendance_from_image(db: Session, section_id: str, image_path: str, 
+    def mark_attendance_from_image(db: Session, section_id: str, image,
                                    confidence_threshold: float = 0.6) -> Dict:
         """
         Mark attendance by detecting faces in class photo
-        
+
         Args:
             db: Database session
             section_id: Course section ID
-            image_path: Path to class photo
-            confidence_threshold: Minimum confidence for face match (0-1)
-            
+            image: Class photo (path, encoded bytes, file object or decoded array)
+            confidence_threshold: Minimum confidence (1 - face distance) for a match
+
         Returns:
             Dictionary with attendance results
         """
-        try:
-            # Load class image
-            image = face_recognition.load_image_file(image_path)
-            
-            # Detect all faces in the image
-            face_locations = face_recognition.face_locations(image, model='hog')
-            face_encodings = face_recognition.face_encodings(image, face_locations)
-            
-            print(f"Detected {len(face_locations)} faces in the image")
-            
-            # Get all enrolled students in this section
-            enrollments = db.query(SectionEnrollment).filter(
+        np = load_numpy()
+        detected = ai_service._extract_multi_face_embeddings(_open_image(image))
+
+        # One query for the whole roster instead of one per enrollment.
+        enrolled_students = (
+            db.query(Student)
+            .join(SectionEnrollment, SectionEnrollment.student_id == Student.student_id)
+            .filter(
                 SectionEnrollment.section_id == section_id,
-                SectionEnrollment.status == 'active'
-            ).all()
-            
-            # Get students with face encodings
-            enrolled_students = []
-            known_encodings = []
-            
-            for enrollment in enrollments:
-                student = db.query(Student).filter(
-                    Student.student_id == enrollment.student_id
-                ).first()
-                
-                if student and student.face_encoding:
-                    enrolled_students.append(student)
-                    # Parse JSON encoding
-                    encoding = json.loads(student.face_encoding)
-                    known_encodings.append(np.array(encoding))
-            
-            print(f"Found {len(enrolled_students)} students with face encodings")
-            
-            # Match faces
-            present_students = []
-            unrecognized_faces = 0
-            
-            for face_encoding in face_encodings:
-                # Compare with all known faces
-                if len(known_encodings) == 0:
+                SectionEnrollment.status == "active",
+                Student.face_encoding.isnot(None),
+            )
+            .all()
+        )
+        known_students = []
+        known_encodings = []
+        for student in enrolled_students:
+            try:
+                encoding = ai_service._normalize_embedding(json.loads(student.face_encoding))
+            except (TypeError, ValueError):
+                continue
+            if detected and encoding.shape != detected[0].shape:
+                continue  # enrolled with another embedding model
+            known_students.append(student)
+            known_encodings.append(encoding)
+
+        present_students = []
+        present_ids = set()
+        unrecognized_faces = 0
+        if detected and known_encodings:
+            # Unit vectors: face distance |a - b| = sqrt(2 - 2 a.b), for every face/student pair in one matmul.
+            similarities = np.vstack(detected) @ np.vstack(known_encodings).T
+            distances = np.sqrt(np.maximum(2.0 - 2.0 * similarities, 0.0))
+            best_indexes = np.argmin(distances, axis=1)
+            for face_index, best_match_index in enumerate(best_indexes):
+                confidence = 1 - float(distances[face_index, best_match_index])
+                if confidence < confidence_threshold:
                     unrecognized_faces += 1
                     continue
-                
-                # Calculate face distances
-                face_distances = face_recognition.face_distance(known_encodings, face_encoding)
-                
-                # Find best match
-                best_match_index = np.argmin(face_distances)
-                best_distance = face_distances[best_match_index]
-                
-                # Convert distance to confidence (inverse relationship)
-                confidence = 1 - best_distance
-                
-                print(f"Best match confidence: {confidence:.2f}")
-                
-                if confidence >= confidence_threshold:
-                    matched_student = enrolled_students[best_match_index]
-                    
-                    # Avoid duplicates
-                    if matched_student.student_id not in [s['student_id'] for s in present_students]:
-                        present_students.append({
-                            'student_id': str(matched_student.student_id),
-                            'name': f"{matched_student.first_name} {matched_student.last_name}",
-                            'registration_number': matched_student.registration_number,
-                            'confidence': round(confidence * 100, 2)
-                        })
-                else:
-                    unrecognized_faces += 1
-            
-            return {
-                'success': True,
-                'total_faces_detected': len(face_locations),
-                'students_recognized': len(present_students),
-                'unrecognized_faces': unrecognized_faces,
-                'present_students': present_students,
-                'message': f'Recognized {len(present_students)} out of {len(face_locations)} faces detected'
-            }
-            
-        except Exception as e:
-            raise Exception(f"Face recognition error: {str(e)}")
-    
+                matched_student = known_students[best_match_index]
+                # Avoid duplicates
+                if matched_student.student_id not in present_ids:
+                    present_ids.add(matched_student.student_id)
+                    present_students.append({
+                        'student_id': str(matched_student.student_id),
+                        'name': f"{matched_student.first_name} {matched_student.last_name}",
+                        'registration_number': matched_student.registration_number,
+                        'confidence': round(confidence * 100, 2)
+                    })
+        else:
+            unrecognized_faces = len(detected)
+
+        return {
+            'success': True,
+            'total_faces_detected': len(detected),
+            'students_recognized': len(present_students),
+            'unrecognized_faces': unrecognized_faces,
+            'present_students': present_students,
+            'message': f'Recognized {len(present_students)} out of {len(detected)} faces detected'
+        }
+
     @staticmethod
-    def process_base64_image(base64_string: str) -> str:
+    def process_base64_image(base64_string: str) -> io.BytesIO:
         """
-        Convert base64 image to file and return path
+        Decode a base64 (or data: URL) image into an in-memory buffer the methods above accept
         """
+        # Remove data:image prefix if present
+        if ',' in base64_string:
+            base64_string = base64_string.split(',', 1)[1]
         try:
-            # Remove data:image prefix if present
-            if ',' in base64_string:
-                base64_string = base64_string.split(',')[1]
-            
-            # Decode base64
-            image_data = base64.b64decode(base64_string)
-            
-            # Save to temporary file
-            temp_path = f"/tmp/class_photo_{np.random.randint(1000, 9999)}.jpg"
-            
-            with open(temp_path, 'wb') as f:
-                f.write(image_data)
-            
-            return temp_path
-            
-        except Exception as e:
-            raise Exception(f"Image processing error: {str(e)}")
-
-face_recognition_service = FaceRecognitionService()
\ No newline at end of file
+            return io.BytesIO(base64.b64decode("".join(base64_string.split()), validate=True))
+        except (binascii.Error, ValueError) as exc:
+            raise ValueError("Image is not valid base64") from exc
+
+
+face_recognition_service = FaceRecognitionService()
@@ -0,0 +1,74 @@
+"""Decoding uploaded photos into RGB arrays with a cap on pixel count.
+
+``BackgroundImageDecoder`` decodes a streamed upload on a worker thread while the body is still
+arriving: the decoder reads the spool through a blocking reader, so by the time the last chunk
+lands most of the image is already decoded. The pixel cap is checked as soon as the header is read.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.ai.runtime import load_numpy, load_pil_image
+from app.config import settings
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _decode_executor() -> ThreadPoolExecutor:
+    # Upload slots already bound how many decodes can be in flight; size the pool to match.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.AI_UPLOADS_MAX_CONCURRENT),
+                    thread_name_prefix="image-decode",
+                )
+    return _executor
+
+
+def check_pixels(size, max_pixels: int) -> None:
+    width, height = size
+    if width * height > max_pixels:
+        raise ValueError(f"Image is {width}x{height}; at most {max_pixels} pixels are accepted")
+
+
+def decode_image_file(file, max_pixels: int):
+    """Decode a readable, seekable image file (bytes buffer, spooled upload) to an RGB array."""
+    image_module = load_pil_image()
+    if image_module is None:
+        raise RuntimeError("Pillow is required to decode uploaded images")
+    try:
+        image = image_module.open(file)
+    except Exception as exc:
+        raise ValueError("Uploaded file is not a readable image") from exc
+    check_pixels(image.size, max_pixels)
+    try:
+        rgb = image if image.mode == "RGB" else image.convert("RGB")
+        return load_numpy().asarray(rgb)
+    except OSError as exc:
+        raise ValueError("Uploaded image is truncated or corrupt") from exc
+
+
+def _decode_spool(reader, max_pixels: int):
+    with reader:
+        return decode_image_file(reader, max_pixels)
+
+
+class BackgroundImageDecoder:
+    """Decodes a ``SpooledUpload`` on a worker thread as it fills; see the module docstring."""
+
+    def __init__(self, spool, max_pixels: int):
+        self._future = _decode_executor().submit(_decode_spool, spool.reader(), max_pixels)
+
+    def check(self, _chunk: bytes = b"") -> None:
+        """Raise the decoder's error (too many pixels, not an image) without waiting for the rest of the body."""
+        if self._future.done():
+            error = self._future.exception()
+            if error is not None:
+                raise error
+
+    async def result(self):
+        return await asyncio.wrap_future(self._future)
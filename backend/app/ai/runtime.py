@@ -0,0 +1,61 @@
+"""Lazy loaders for the heavy AI stack (numpy, face_recognition/dlib, OpenCV, Pillow).
+
+Importing these eagerly costs every API worker seconds of startup and hundreds of MB
+of memory, even workers that only serve food and attendance traffic. Modules call the
+loaders below on first use instead of importing at module level.
+"""
+import importlib
+import threading
+
+_MISSING = object()
+_modules = {}
+_lock = threading.Lock()
+
+
+def _load_optional(name: str):
+    module = _modules.get(name, _MISSING)
+    if module is _MISSING:
+        with _lock:
+            module = _modules.get(name, _MISSING)
+            if module is _MISSING:
+                try:
+                    module = importlib.import_module(name)
+                except Exception:  # pragma: no cover - optional dependency
+                    module = None
+                _modules[name] = module
+    return module
+
+
+def load_numpy():
+    np = _load_optional("numpy")
+    if np is None:
+        raise RuntimeError("numpy is required for AI operations")
+    return np
+
+
+def load_face_recognition():
+    return _load_optional("face_recognition")
+
+
+def load_cv2():
+    return _load_optional("cv2")
+
+
+def load_pil_image():
+    return _load_optional("PIL.Image")
+
+
+def load_onnxruntime():
+    return _load_optional("onnxruntime")
+
+
+def preload() -> None:
+    """Warm the AI stack and the configured face backend up front, for workers dedicated to AI traffic."""
+    from app.ai import backends
+
+    load_numpy()
+    load_cv2()
+    try:
+        backends.get_backend()
+    except RuntimeError:
+        pass  # enrollment falls back to hash embeddings; capture reports the missing dependency
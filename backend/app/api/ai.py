@@ -2,13 +2,17 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.ai.image_decoding import BackgroundImageDecoder
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.models.faculty import Faculty
 from app.models.user import User
 from app.schemas.ai import (
+    AIAttendanceBatchCaptureResponse,
     AIAttendanceCaptureResponse,
     AIAttendanceStreamResponse,
     AIAttendanceStreamStartRequest,
@@ -21,9 +25,19 @@ from app.schemas.ai import (
 from app.services import ai_service, attendance_service, food_service
 from app.services.ai_stream_service import ai_stream_manager
 from app.utils.auth import get_current_user
+from app.utils.uploads import (
+    SpooledUpload,
+    UploadSlots,
+    UploadSlotsExhaustedError,
+    UploadTooLargeError,
+    spool_stream,
+)
 
 router = APIRouter()
 
+# Photo uploads in flight in this worker; bounds decode memory during the 9:00 burst.
+upload_slots = UploadSlots(per_key=settings.AI_UPLOADS_PER_USER, total=settings.AI_UPLOADS_MAX_CONCURRENT)
+
 
 def _role_to_str(role: object) -> str:
     return role.value if hasattr(role, "value") else str(role)
@@ -43,6 +57,21 @@ def _resolve_faculty_id(db: Session, current_user: User) -> UUID:
     return faculty.faculty_id
 
 
+def _check_upload_size(upload: UploadFile) -> None:
+    """Multipart files are already spooled to disk by Starlette; reject oversized ones unread."""
+    if upload.size is not None and upload.size > settings.AI_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {settings.AI_UPLOAD_MAX_BYTES} byte limit")
+
+
+def _parse_captured_at(captured_at: Optional[str]) -> Optional[datetime]:
+    if not captured_at:
+        return None
+    try:
+        return datetime.fromisoformat(captured_at)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid captured_at datetime format") from exc
+
+
 @router.post("/attendance/enroll", response_model=FaceEnrollmentResponse)
 async def enroll_face_profile(
     files: List[UploadFile] = File(...),
@@ -66,23 +95,25 @@ async def enroll_face_profile(
         except ValueError as exc:
             raise HTTPException(status_code=400, detail="Invalid student_id format") from exc
 
-    image_samples = []
     for upload in files:
-        content = await upload.read()
-        if content:
-            image_samples.append(content)
+        _check_upload_size(upload)
+    image_samples = [upload.file for upload in files if upload.size != 0]
 
     try:
-        return ai_service.enroll_face_profile(
-            db=db,
-            student_id=target_student_id,
-            image_samples=image_samples,
-            consent_given=consent_given,
-        )
+        with upload_slots.acquire(current_user.user_id):
+            return await run_in_threadpool(
+                ai_service.enroll_face_profile,
+                db=db,
+                student_id=target_student_id,
+                image_samples=image_samples,
+                consent_given=consent_given,
+            )
     except LookupError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except UploadSlotsExhaustedError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
@@ -130,33 +161,157 @@ async def capture_attendance_photo(
     _require_roles(current_user, {"faculty"})
     faculty_id = _resolve_faculty_id(db, current_user)
 
-    image_bytes = await image_file.read()
-    if not image_bytes:
+    _check_upload_size(image_file)
+    if image_file.size == 0:
         raise HTTPException(status_code=400, detail="Image file is empty")
-
-    parsed_capture_time = None
-    if captured_at:
-        try:
-            parsed_capture_time = datetime.fromisoformat(captured_at)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Invalid captured_at datetime format") from exc
+    parsed_capture_time = _parse_captured_at(captured_at)
 
     try:
-        return ai_service.capture_attendance_from_photo(
-            db=db,
-            session_id=session_id,
-            faculty_id=faculty_id,
-            image_bytes=image_bytes,
-            confidence_threshold=confidence_threshold,
-            late_threshold_minutes=late_threshold_minutes,
-            captured_at=parsed_capture_time,
+        with upload_slots.acquire(current_user.user_id):
+            return await run_in_threadpool(
+                ai_service.capture_attendance_from_photo,
+                db=db,
+                session_id=session_id,
+                faculty_id=faculty_id,
+                image=image_file.file,
+                confidence_threshold=confidence_threshold,
+                late_threshold_minutes=late_threshold_minutes,
+                captured_at=parsed_capture_time,
+            )
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except UploadSlotsExhaustedError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+def _batch_item_status(error: Optional[Exception]) -> int:
+    if error is None:
+        return 200
+    if isinstance(error, LookupError):
+        return 404
+    if isinstance(error, PermissionError):
+        return 403
+    if isinstance(error, ValueError):
+        return 400
+    return 503
+
+
+@router.post("/attendance/capture-photo/batch", response_model=AIAttendanceBatchCaptureResponse)
+async def capture_attendance_photo_batch(
+    session_ids: List[UUID] = Form(...),
+    image_files: List[UploadFile] = File(...),
+    confidence_threshold: float = Form(default=0.75),
+    late_threshold_minutes: int = Form(default=10),
+    captured_at: Optional[str] = Form(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Capture several rooms at once: ``session_ids[i]`` is photographed in ``image_files[i]``.
+
+    Each item reports its own status code, so one closed session or unreadable photo does not fail the rest.
+    """
+    _require_roles(current_user, {"faculty"})
+    faculty_id = _resolve_faculty_id(db, current_user)
+
+    if len(session_ids) != len(image_files):
+        raise HTTPException(status_code=400, detail="Send exactly one image file per session_id")
+    if len(image_files) > settings.AI_BATCH_CAPTURE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.AI_BATCH_CAPTURE_MAX_ITEMS} photos can be captured per batch"
         )
+    for upload in image_files:
+        _check_upload_size(upload)
+    parsed_capture_time = _parse_captured_at(captured_at)
+
+    try:
+        with upload_slots.acquire(current_user.user_id):
+            outcomes = await run_in_threadpool(
+                ai_service.capture_attendance_batch,
+                db=db,
+                faculty_id=faculty_id,
+                items=[(session_id, upload.file) for session_id, upload in zip(session_ids, image_files)],
+                confidence_threshold=confidence_threshold,
+                late_threshold_minutes=late_threshold_minutes,
+                captured_at=parsed_capture_time,
+            )
+    except UploadSlotsExhaustedError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    results = [
+        {
+            "index": index,
+            "session_id": outcome["session_id"],
+            "status_code": _batch_item_status(outcome["error"]),
+            "detail": str(outcome["error"]) if outcome["error"] is not None else None,
+            "result": outcome["result"],
+        }
+        for index, outcome in enumerate(outcomes)
+    ]
+    succeeded = sum(1 for item in results if item["status_code"] == 200)
+    return {"succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
+
+
+@router.post("/attendance/sessions/{session_id}/capture-photo/stream", response_model=AIAttendanceCaptureResponse)
+async def stream_attendance_photo(
+    session_id: UUID,
+    request: Request,
+    confidence_threshold: float = Query(default=0.75),
+    late_threshold_minutes: int = Query(default=10),
+    captured_at: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Capture from a raw image request body (``Content-Type: image/jpeg``), decoded while it uploads.
+
+    The body is spooled to a temporary file, never held whole in memory, and capped at AI_UPLOAD_MAX_BYTES;
+    an oversized or unreadable image is rejected as soon as its header arrives.
+    """
+    _require_roles(current_user, {"faculty"})
+    user_id = current_user.user_id
+    faculty_id = _resolve_faculty_id(db, current_user)
+    declared_length = request.headers.get("content-length", "")
+    if declared_length.isdigit() and int(declared_length) > settings.AI_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {settings.AI_UPLOAD_MAX_BYTES} byte limit")
+    parsed_capture_time = _parse_captured_at(captured_at)
+
+    try:
+        ai_service.check_capture_session(db, session_id, faculty_id)
+        # Don't hold a pooled connection while the body arrives; the capture reloads the session.
+        db.rollback()
+        with upload_slots.acquire(user_id), SpooledUpload(settings.AI_UPLOAD_MAX_BYTES) as spool:
+            decoder = BackgroundImageDecoder(spool, settings.AI_UPLOAD_MAX_PIXELS)
+            await spool_stream(request.stream(), spool, on_chunk=decoder.check)
+            if spool.size == 0:
+                raise ValueError("Image file is empty")
+            image = await decoder.result()
+            return await run_in_threadpool(
+                ai_service.capture_attendance_from_photo,
+                db=db,
+                session_id=session_id,
+                faculty_id=faculty_id,
+                image=image,
+                confidence_threshold=confidence_threshold,
+                late_threshold_minutes=late_threshold_minutes,
+                captured_at=parsed_capture_time,
+            )
+    except UploadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
     except LookupError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     except PermissionError as exc:
         raise HTTPException(status_code=403, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except UploadSlotsExhaustedError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
 
@@ -210,7 +365,7 @@ async def get_attendance_stream_status(
 def get_faculty_insights(
     faculty_id: Optional[str] = Query(default=None),
     threshold: float = Query(default=75.0, ge=40.0, le=95.0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     role = _require_roles(current_user, {"faculty", "admin"})
@@ -235,7 +390,7 @@ def get_faculty_insights(
 @router.get("/food/rush", response_model=FoodRushPredictionResponse)
 def get_food_rush_prediction(
     vendor_id: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     role = _require_roles(current_user, {"student", "vendor", "admin"})
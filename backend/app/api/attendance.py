@@ -1,22 +1,27 @@
-from typing import List
+from datetime import date
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.faculty import Faculty
 from app.models.user import User
 from app.schemas.attendance import (
-    AttendanceRecordResponse,
+    AttendanceCubeRefreshResponse,
+    AttendanceCubeResponse,
+    AttendanceHistoryPage,
     AttendanceSectionResponse,
     AttendanceSessionCreate,
     AttendanceSessionResponse,
+    AttendanceSummaryResponse,
     BulkAttendanceMark,
     ClassroomResponse,
     SectionStudentResponse,
+    StudentAttendanceStatsResponse,
 )
-from app.services import attendance_service
+from app.services import attendance_cube, attendance_service, attendance_stats
 from app.utils.auth import get_current_user
 
 router = APIRouter()
@@ -31,6 +36,11 @@ def _require_faculty(current_user: User) -> None:
         raise HTTPException(status_code=403, detail="Only faculty can perform this action")
 
 
+def _require_admin(current_user: User) -> None:
+    if _role_to_str(current_user.role) != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can view campus analytics")
+
+
 def _get_faculty_profile(db: Session, user_id: UUID) -> Faculty:
     faculty = db.query(Faculty).filter(Faculty.user_id == user_id).first()
     if not faculty:
@@ -123,14 +133,7 @@ def mark_attendance(
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
-@router.get("/student/{student_id}", response_model=List[AttendanceRecordResponse])
-def get_student_attendance(
-    student_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Get attendance records for a specific student."""
-
+def _authorize_student_view(db: Session, current_user: User, student_id: UUID) -> None:
     role = _role_to_str(current_user.role)
     if role == "student":
         try:
@@ -142,21 +145,162 @@ def get_student_attendance(
     elif role not in {"faculty", "admin"}:
         raise HTTPException(status_code=403, detail="Not authorized to view attendance data")
 
-    records = attendance_service.get_student_attendance(db, student_id)
-    return records
 
+def _own_student_id(db: Session, current_user: User, detail: str) -> UUID:
+    if _role_to_str(current_user.role) != "student":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+    try:
+        return attendance_service.resolve_student_id_for_user(db, current_user.user_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+def _history_page(db: Session, student_id: UUID, limit, cursor, date_from, date_to, section_id) -> dict:
+    try:
+        items, next_cursor = attendance_service.list_student_attendance(
+            db,
+            student_id,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
+            section_id=section_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _summary(db: Session, student_id: UUID, date_from, date_to, section_id) -> dict:
+    try:
+        return attendance_service.summarize_student_attendance(
+            db, student_id, date_from=date_from, date_to=date_to, section_id=section_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/student/{student_id}", response_model=AttendanceHistoryPage)
+def get_student_attendance(
+    student_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, max_length=200),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get attendance records for a specific student, newest first. Pass ``next_cursor`` back as ``cursor``."""
+
+    _authorize_student_view(db, current_user, student_id)
+    return _history_page(db, student_id, limit, cursor, date_from, date_to, section_id)
+
+
+@router.get("/student/{student_id}/summary", response_model=AttendanceSummaryResponse)
+def get_student_attendance_summary(
+    student_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Per-course present/absent counts for a student over an optional date window."""
+
+    _authorize_student_view(db, current_user, student_id)
+    return _summary(db, student_id, date_from, date_to, section_id)
+
+
+@router.get("/student/{student_id}/stats", response_model=StudentAttendanceStatsResponse)
+def get_student_attendance_stats(
+    student_id: UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Per-section attendance percentages for a student."""
 
-@router.get("/me/history", response_model=List[AttendanceRecordResponse])
+    _authorize_student_view(db, current_user, student_id)
+    return attendance_stats.get_student_stats(db, student_id)
+
+
+@router.get("/me/stats", response_model=StudentAttendanceStatsResponse)
+def get_my_attendance_stats(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    student_id = _own_student_id(db, current_user, "Only students can view their own stats")
+    return attendance_stats.get_student_stats(db, student_id)
+
+
+@router.get("/me/history", response_model=AttendanceHistoryPage)
 def get_my_attendance_history(
-    db: Session = Depends(get_db),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None, max_length=200),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    if _role_to_str(current_user.role) != "student":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only students can view their own history")
+    student_id = _own_student_id(db, current_user, "Only students can view their own history")
+    return _history_page(db, student_id, limit, cursor, date_from, date_to, section_id)
 
+
+@router.get("/me/summary", response_model=AttendanceSummaryResponse)
+def get_my_attendance_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    student_id = _own_student_id(db, current_user, "Only students can view their own history")
+    return _summary(db, student_id, date_from, date_to, section_id)
+
+
+@router.get("/analytics", response_model=AttendanceCubeResponse)
+def get_attendance_analytics(
+    group_by: List[str] = Query(default=["department"]),
+    department: Optional[str] = None,
+    course_id: Optional[UUID] = None,
+    section_id: Optional[UUID] = None,
+    session_type: Optional[str] = None,
+    week_from: Optional[date] = None,
+    week_to: Optional[date] = None,
+    limit: int = Query(default=1000, ge=1, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Campus attendance from the analytics cube, summed over ``group_by`` (department, course_id,
+    section_id, week_start, session_type). ``refreshed_at``/``stale_seconds`` say how current it is."""
+
+    _require_admin(current_user)
     try:
-        student_id = attendance_service.resolve_student_id_for_user(db, current_user.user_id)
-    except LookupError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
+        return attendance_cube.query_cube(
+            db,
+            group_by=group_by,
+            department=department,
+            course_id=course_id,
+            section_id=section_id,
+            session_type=session_type,
+            week_from=week_from,
+            week_to=week_to,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/analytics/refresh", response_model=AttendanceCubeRefreshResponse)
+def refresh_attendance_analytics(
+    full: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Fold sessions closed since the last refresh into the cube now (``full`` rebuilds it)."""
 
-    return attendance_service.get_student_attendance(db, student_id)
+    _require_admin(current_user)
+    run = attendance_cube.refresh(db, full=full)
+    db.commit()
+    return {"refresh_id": run.refresh_id, "full": run.full, "sessions_folded": run.sessions_folded}
@@ -0,0 +1,73 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_read_db
+from app.models.user import User
+from app.schemas.notification import MarkReadResponse, NotificationPage, UnreadCountResponse
+from app.services import notification_inbox
+from app.utils.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=NotificationPage)
+def list_notifications(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=200),
+    unread_only: bool = Query(default=False),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Current user's notifications, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        items, next_cursor = notification_inbox.list_notifications(
+            db=db,
+            user_id=current_user.user_id,
+            limit=limit,
+            cursor=cursor,
+            unread_only=unread_only,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return {
+        "items": [notification_inbox.serialize_notification(item) for item in items],
+        "next_cursor": next_cursor,
+        "unread_count": notification_inbox.get_unread_count(db, current_user.user_id),
+    }
+
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+def get_unread_count(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return {"unread_count": notification_inbox.get_unread_count(db, current_user.user_id)}
+
+
+@router.post("/read-all", response_model=MarkReadResponse)
+def mark_all_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    marked = notification_inbox.mark_all_read(db, current_user.user_id)
+    return {"marked": marked, "unread_count": 0}
+
+
+@router.post("/{notification_id}/read", response_model=MarkReadResponse)
+def mark_read(
+    notification_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        marked = notification_inbox.mark_read(db, current_user.user_id, notification_id)
+    except LookupError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return {
+        "marked": int(marked),
+        "unread_count": notification_inbox.get_unread_count(db, current_user.user_id),
+    }
@@ -7,9 +7,10 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlalchemy import func
 
 from app.config import settings
-from app.database import SessionLocal
+from app.database import SessionLocal, open_read_session
 from app.models.user import User
-from app.services import ai_service, food_service
+from app.services import ai_service, food_service, notification_inbox
+from app.services.notification_hub import hub as notification_hub
 from app.utils import auth as auth_utils
 
 router = APIRouter()
@@ -75,7 +76,7 @@ async def ws_food_rush(websocket: WebSocket):
 
     try:
         while True:
-            with SessionLocal() as db:
+            with open_read_session() as db:
                 payload = ai_service.predict_food_rush(db=db, vendor_id=vendor_id)
 
             payload["timestamp"] = datetime.utcnow().isoformat()
@@ -89,3 +90,69 @@ async def ws_food_rush(websocket: WebSocket):
             await websocket.close(code=1011)
         except Exception:
             return
+
+
+@router.websocket("/ws/notifications")
+async def ws_notifications(websocket: WebSocket):
+    """Pushes ``{"unread_count": n}`` on connect and whenever the count changes."""
+    await websocket.accept()
+
+    token = websocket.query_params.get("token")
+    if not token:
+        await websocket.send_json({"error": "Missing authentication token"})
+        await websocket.close(code=4401)
+        return
+
+    with SessionLocal() as db:
+        user = _resolve_user_from_token(token, db)
+        if not user:
+            await websocket.send_json({"error": "Invalid authentication token"})
+            await websocket.close(code=4401)
+            return
+        user_id = user.user_id
+
+    # Commits in this process wake the socket immediately; the recheck covers other workers.
+    interval = max(3, settings.NOTIFICATION_WS_RECHECK_SECONDS)
+    wakeup = notification_hub.subscribe(user_id)
+    # Nothing is sent while the count is unchanged, so a pending receive() is what notices a closed socket.
+    receiver = asyncio.ensure_future(websocket.receive())
+    waiter = None
+    woken = False
+    last_count = None
+
+    try:
+        while True:
+            # A wakeup means this process just committed the change; a lagging replica could miss it.
+            with (SessionLocal() if woken else open_read_session()) as db:
+                unread_count = notification_inbox.get_unread_count(db, user_id)
+            if unread_count != last_count:
+                await websocket.send_json({
+                    "unread_count": unread_count,
+                    "timestamp": datetime.utcnow().isoformat(),
+                })
+                last_count = unread_count
+            waiter = asyncio.ensure_future(wakeup.wait())
+            done, _pending = await asyncio.wait(
+                {receiver, waiter}, timeout=interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                # Client messages carry nothing; keep listening for the close.
+                receiver = asyncio.ensure_future(websocket.receive())
+            waiter.cancel()
+            woken = wakeup.is_set()
+            wakeup.clear()
+    except WebSocketDisconnect:
+        return
+    except Exception as exc:
+        try:
+            await websocket.send_json({"error": str(exc)})
+            await websocket.close(code=1011)
+        except Exception:
+            return
+    finally:
+        receiver.cancel()
+        if waiter is not None:
+            waiter.cancel()
+        notification_hub.unsubscribe(user_id, wakeup)
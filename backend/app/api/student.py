@@ -4,7 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
 from app.services import student_service
@@ -34,7 +34,7 @@ def list_students(
     semester: Optional[int] = Query(default=None, ge=1, le=12),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     _ensure_management_access(current_user)
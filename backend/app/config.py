@@ -4,6 +4,26 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_ECHO: bool = False
+    # Dev-only convenience: create missing tables on startup. Production schema is managed by Alembic.
+    DB_CREATE_ALL: bool = False
+
+    # Connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Fail fast instead of queueing behind a saturated pool for SQLAlchemy's 30s default.
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # Requests already waiting on a saturated pool before new ones are shed with 503.
+    DB_POOL_MAX_WAITERS: int = 20
+
+    # Read replicas (comma-separated URLs); reads fall back to the primary when unset or lagging.
+    DATABASE_READ_REPLICA_URLS: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+    # After a user's own write, their reads stay on the primary for this long.
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0
 
     # Auth
     AUTH_AUTO_LINK_FIREBASE_UID: bool = True
@@ -12,14 +32,49 @@ class Settings(BaseSettings):
     APP_NAME: str = "Smart Campus Management System"
     DEBUG: bool = True
 
+    # Observability: add a Server-Timing header (app and DB time, query count) to responses
+    METRICS_SERVER_TIMING: bool = False
+
     # Redis
     REDIS_URL: Optional[str] = None
 
+    # Notification outbox: "memory" runs delivery in-process, "celery" hands it to a Celery worker on REDIS_URL
+    NOTIFICATION_BROKER: str = "memory"
+    NOTIFICATION_WORKER_ENABLED: bool = True
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30.0
+    NOTIFICATION_EMAIL_CONCURRENCY: int = 4
+    NOTIFICATION_SMS_CONCURRENCY: int = 8
+    NOTIFICATION_POLL_SECONDS: float = 5.0
+    # Digest mode: absences per recipient within the window go out as one summary message
+    NOTIFICATION_DIGEST_ENABLED: bool = False
+    NOTIFICATION_DIGEST_WINDOW_MINUTES: int = 240
+    NOTIFICATION_WS_RECHECK_SECONDS: int = 30
+
+    # Attendance rollup: full rebuild from raw records on this Celery beat interval (safety net)
+    ATTENDANCE_STATS_REBUILD_SECONDS: float = 86400.0
+    # attendance_records partitions (Postgres): months created ahead, and months kept before archiving (0 = never)
+    ATTENDANCE_PARTITION_MAINTENANCE_SECONDS: float = 86400.0
+    ATTENDANCE_PARTITION_MONTHS_AHEAD: int = 3
+    ATTENDANCE_ARCHIVE_AFTER_MONTHS: int = 0
+    ATTENDANCE_ARCHIVE_DIR: str = "archives/attendance"
+    # Campus analytics cube: incremental refresh from newly closed sessions, plus a periodic full rebuild
+    ATTENDANCE_CUBE_REFRESH_SECONDS: float = 300.0
+    ATTENDANCE_CUBE_FULL_REFRESH_SECONDS: float = 86400.0
+
     # Email / SMTP
     SMTP_HOST: Optional[str] = None
     SMTP_PORT: Optional[int] = None
     SMTP_USER: Optional[str] = None
     SMTP_PASSWORD: Optional[str] = None
+    SMTP_FROM: Optional[str] = None
+    SMTP_USE_TLS: bool = True
+    # Persistent authenticated connections reused across messages (size ~ NOTIFICATION_EMAIL_CONCURRENCY)
+    SMTP_POOL_SIZE: int = 4
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    # Reconnect after this many messages; many providers cap messages per session.
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 500
 
     # Firebase Admin SDK (for ID token verification)
     FIREBASE_PROJECT_ID: Optional[str] = None
@@ -32,6 +87,30 @@ class Settings(BaseSettings):
     # Enable in production after adding an email verification flow.
     FIREBASE_REQUIRE_EMAIL_VERIFIED: bool = False
 
+    # AI runtime: numpy/face_recognition/cv2 load on first use unless this worker is dedicated to AI traffic.
+    AI_PRELOAD_ON_STARTUP: bool = False
+    # Face detection/embedding backend (app/ai/backends.py): dlib-hog, dlib-cnn or onnx-arcface.
+    # Profiles only match the backend family they were enrolled with; switching embedders means re-enrolling.
+    AI_FACE_BACKEND: str = "dlib-hog"
+    AI_ONNX_MODEL_PATH: str = ""
+    AI_ONNX_THREADS: int = 0
+    # Faculty insights dashboard: per-faculty cache lifetime (0 disables); a closing session clears it sooner
+    AI_INSIGHTS_CACHE_SECONDS: float = 30.0
+
+    # AI photo uploads: body and decoded-size caps, and uploads in flight per user and per worker process.
+    # Peak decode memory is about AI_UPLOADS_MAX_CONCURRENT x 3 x AI_UPLOAD_MAX_PIXELS bytes.
+    AI_UPLOAD_MAX_BYTES: int = 15 * 1024 * 1024
+    AI_UPLOAD_MAX_PIXELS: int = 20_000_000
+    AI_UPLOADS_PER_USER: int = 2
+    AI_UPLOADS_MAX_CONCURRENT: int = 16
+    # Batch photo capture: photos per request, and face-detection threads shared by all batches in a worker.
+    AI_BATCH_CAPTURE_MAX_ITEMS: int = 12
+    AI_BATCH_CAPTURE_WORKERS: int = 4
+    # Face detections cached per photo digest, so a retried capture only re-runs matching (0 disables).
+    AI_DETECTION_CACHE_ENTRIES: int = 256
+    # Prototype embeddings kept per face profile (looks such as glasses/no glasses); capture matches the closest.
+    AI_FACE_PROTOTYPES: int = 3
+
     # AI realtime tuning
     FOOD_RUSH_WS_INTERVAL_SECONDS: int = 8
     AI_STREAM_FRAME_TIMEOUT_SECONDS: int = 120
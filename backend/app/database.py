@@ -1,25 +1,223 @@
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from app.config import settings
+from app.utils.db_metrics import InstrumentedQueuePool, attach_pool_listeners
+
+
+def build_engine(database_url: str, **overrides):
+    """Create an engine with the configured pool sizing and statement timeout."""
+    url = make_url(database_url)
+    options = {
+        "pool_pre_ping": True,
+        "echo": settings.DB_ECHO,  # Shows SQL queries in console
+    }
+
+    # SQLite (tests, local scripts) keeps SQLAlchemy's default single-file pooling.
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+    options.update(overrides)
+    new_engine = create_engine(url, **options)
+    attach_pool_listeners(new_engine.pool)
+    return new_engine
+
+
+def probe_replica_lag(replica: Engine) -> float:
+    """Seconds the replica is behind the primary (0 for non-Postgres stand-ins)."""
+    with replica.connect() as conn:
+        if replica.dialect.name != "postgresql":
+            conn.execute(text("SELECT 1"))
+            return 0.0
+        lag = conn.execute(
+            text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )
+        ).scalar()
+        return float(lag or 0.0)
+
+
+class ReplicaRouter:
+    """Picks a healthy read replica, or None to stay on the primary."""
+
+    def __init__(
+        self,
+        replicas: List[Engine],
+        max_lag_seconds: float,
+        lag_check_interval_seconds: float,
+        read_your_writes_seconds: float,
+        lag_probe: Callable[[Engine], float] = probe_replica_lag,
+    ):
+        self.replicas = list(replicas)
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval_seconds = lag_check_interval_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.lag_probe = lag_probe
+        self._cursor = itertools.count()
+        self._lag_cache: Dict[int, tuple] = {}
+        # Every pin has the same TTL, so keeping re-pinned keys at the end keeps expiry times in order.
+        self._pins: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pin(self, key: Optional[str]) -> None:
+        if not key or not self.replicas:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Most keys are never looked up again (tokens rotate, clients leave): drop the expired ones here.
+            while self._pins and next(iter(self._pins.values())) <= now:
+                self._pins.popitem(last=False)
+            self._pins[key] = now + self.read_your_writes_seconds
+            self._pins.move_to_end(key)
+
+    def is_pinned(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            expires_at = self._pins.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                self._pins.pop(key, None)
+                return False
+            return True
+
+    def replica_lag(self, replica: Engine) -> Optional[float]:
+        now = time.monotonic()
+        cached = self._lag_cache.get(id(replica))
+        if cached and now - cached[0] < self.lag_check_interval_seconds:
+            return cached[1]
+
+        try:
+            lag = self.lag_probe(replica)
+        except Exception:
+            lag = None
+        self._lag_cache[id(replica)] = (now, lag)
+        return lag
+
+    def choose(self, pin_key: Optional[str] = None) -> Optional[Engine]:
+        if not self.replicas or self.is_pinned(pin_key):
+            return None
+
+        start = next(self._cursor)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            lag = self.replica_lag(replica)
+            if lag is not None and lag <= self.max_lag_seconds:
+                return replica
+        return None
+
+    def status(self) -> List[Dict]:
+        return [
+            {
+                "replica": replica.url.render_as_string(hide_password=True),
+                "lag_seconds": self._lag_cache.get(id(replica), (None, None))[1],
+            }
+            for replica in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """Session that sends plain reads to ``info["read_bind"]`` and everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        read_bind = self.info.get("read_bind")
+        if read_bind is None or self._flushing or isinstance(clause, UpdateBase):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        return read_bind
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_write(session, _flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_after_write(session):
+    if session.info.pop("has_writes", False):
+        replica_router.pin(session.info.get("pin_key"))
+
+
+def _split_urls(raw: Optional[str]) -> List[str]:
+    return [part.strip() for part in (raw or "").split(",") if part.strip()]
+
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG  # Shows SQL queries in console
+engine = build_engine(settings.DATABASE_URL)
+
+replica_router = ReplicaRouter(
+    replicas=[build_engine(url) for url in _split_urls(settings.DATABASE_READ_REPLICA_URLS)],
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval_seconds=settings.DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factories (reads route to a replica only when one is chosen)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
+
+def read_your_writes_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+
+
+def open_read_session(pin_key: Optional[str] = None) -> Session:
+    db = ReadSessionLocal()
+    db.info["pin_key"] = pin_key
+    db.info["read_bind"] = replica_router.choose(pin_key)
+    return db
+
+
+def upsert_insert(db: Session):
+    """Dialect ``insert`` construct offering ``on_conflict_do_update`` for this session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"INSERT ... ON CONFLICT is not supported on {dialect}")
+
+
 # Dependency to get database session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["pin_key"] = read_your_writes_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only endpoints; may be served by a replica
+def get_read_db(request: Request):
+    db = open_read_session(read_your_writes_key(request))
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, attendance, food, remedial, debug, student, ai, realtime
-from app.database import engine, Base
+from sqlalchemy import exc as sa_exc
+from app.ai import runtime as ai_runtime
+from app.api import auth, attendance, food, remedial, debug, student, ai, realtime, notifications
+from app.database import engine, Base, SessionLocal, replica_router
 from app.config import settings
+from app.utils.db_metrics import build_pool_saturation_guard, pool_snapshot, saturated_response
+from app.utils.instrumentation import build_instrumentation_middleware, registry as metrics_registry
+from app.services import attendance_partitions
+from app.services.notification_dispatcher import InMemoryBroker, get_broker, get_dispatcher, shutdown_dispatcher
+from app.services.smtp_pool import close_smtp_pool
 
 # Import ALL models to ensure they're registered
 from app.models.user import User
@@ -10,43 +20,38 @@ from app.models.student import Student
 from app.models.faculty import Faculty
 from app.models.course import Course, CourseSection, SectionEnrollment
 from app.models.resource import Block, Classroom, ClassSchedule
-from app.models.attendance import AttendanceSession, AttendanceRecord
+from app.models.attendance import AttendanceSession, AttendanceRecord, AttendanceRecordArchive, StudentSectionAttendanceStats, AttendanceCubeCell, AttendanceCubeRefresh, AttendanceCubeSession
 from app.models.remedial import RemedialClass, RemedialAttendance
 from app.models.food import FoodVendor, FoodMenuItem, BreakTimeSlot, FoodOrder, OrderItem
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox, NotificationDigestEvent
 from app.models.ai import StudentFaceProfile
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    description="Smart Campus Management System API",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-app.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
-
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(attendance.router, prefix="/api/attendance", tags=["Attendance"])
-app.include_router(food.router, prefix="/api/food", tags=["Food Ordering"])
-app.include_router(remedial.router, prefix="/api/remedial", tags=["Remedial Classes"])
-app.include_router(student.router, prefix="/api/students", tags=["Student Management"])
-app.include_router(ai.router, prefix="/api/ai", tags=["AI"])
-app.include_router(realtime.router, prefix="/api/realtime", tags=["Realtime"])
-
-@app.get("/")
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Schema is owned by Alembic (`alembic upgrade head`); create_all is a dev-only opt-in.
+    if settings.DB_CREATE_ALL:
+        Base.metadata.create_all(bind=engine)
+        # On Postgres a partitioned attendance_records accepts no rows until its partitions exist.
+        attendance_partitions.run_maintenance(SessionLocal, months_ahead=settings.ATTENDANCE_PARTITION_MONTHS_AHEAD)
+    if settings.AI_PRELOAD_ON_STARTUP:
+        ai_runtime.preload()
+    # With the Celery broker, delivery runs in the Celery worker instead (see app/workers/celery_app.py).
+    if settings.NOTIFICATION_WORKER_ENABLED and isinstance(get_broker(), InMemoryBroker):
+        get_dispatcher().start(get_broker(), poll_seconds=settings.NOTIFICATION_POLL_SECONDS)
+    yield
+    # Drains the channel executors' in-flight sends before the SMTP pool closes under them.
+    shutdown_dispatcher()
+    close_smtp_pool()
+    engine.dispose()
+    for replica in replica_router.replicas:
+        replica.dispose()
+
+
+async def pool_timeout_handler(_request: Request, _exc: sa_exc.TimeoutError):
+    return saturated_response()
+
+
 def root():
     return {
         "message": "Smart Campus Management System API",
@@ -54,6 +59,75 @@ def root():
         "docs": "/docs"
     }
 
-@app.get("/health")
+
 def health_check():
     return {"status": "healthy"}
+
+
+def database_pool_health():
+    return {
+        "status": "healthy",
+        "pool": pool_snapshot(engine.pool),
+        "replicas": replica_router.status(),
+    }
+
+
+def prometheus_metrics():
+    pools = {"primary": engine.pool}
+    for index, replica in enumerate(replica_router.replicas):
+        pools[f"replica-{index}"] = replica.pool
+    return PlainTextResponse(
+        metrics_registry.render_prometheus(pools),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def create_app() -> FastAPI:
+    # Initialize FastAPI app
+    application = FastAPI(
+        title=settings.APP_NAME,
+        description="Smart Campus Management System API",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+
+    # Shed load with 503 once the DB pool is exhausted (registered first so CORS wraps it)
+    application.middleware("http")(
+        build_pool_saturation_guard(lambda: engine.pool, max_waiters=settings.DB_POOL_MAX_WAITERS)
+    )
+
+    # Per-route latency and DB query metrics, exported on /metrics
+    application.middleware("http")(
+        build_instrumentation_middleware(metrics_registry, server_timing=settings.METRICS_SERVER_TIMING)
+    )
+
+    # Configure CORS
+    application.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify exact origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    application.add_exception_handler(sa_exc.TimeoutError, pool_timeout_handler)
+
+    application.include_router(debug.router, prefix="/api/debug", tags=["Debug"])
+
+    # Include routers
+    application.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
+    application.include_router(attendance.router, prefix="/api/attendance", tags=["Attendance"])
+    application.include_router(food.router, prefix="/api/food", tags=["Food Ordering"])
+    application.include_router(remedial.router, prefix="/api/remedial", tags=["Remedial Classes"])
+    application.include_router(student.router, prefix="/api/students", tags=["Student Management"])
+    application.include_router(ai.router, prefix="/api/ai", tags=["AI"])
+    application.include_router(realtime.router, prefix="/api/realtime", tags=["Realtime"])
+    application.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
+
+    application.add_api_route("/", root, methods=["GET"])
+    application.add_api_route("/health", health_check, methods=["GET"])
+    application.add_api_route("/health/db", database_pool_health, methods=["GET"])
+    application.add_api_route("/metrics", prometheus_metrics, methods=["GET"], include_in_schema=False)
+    return application
+
+
+app = create_app()
@@ -1,7 +1,7 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -20,8 +20,14 @@ class StudentFaceProfile(Base):
         index=True,
     )
     embedding_vector = Column(Text, nullable=False)
+    # Up to AI_FACE_PROTOTYPES unit embeddings (packed float32, prototype_count x d) that capture matches against;
+    # embedding_vector stays the overall mean for older readers.
+    prototype_vectors = Column(LargeBinary, nullable=True)
+    prototype_count = Column(Integer, nullable=True)
     model_name = Column(String(64), nullable=False, default="facenet")
     sample_count = Column(Integer, nullable=False, default=0)
+    # JSON list, one entry per uploaded sample: sharpness, face size, yaw, medoid distance, accepted/reason.
+    quality_stats = Column(Text, nullable=True)
     consent_given = Column(Boolean, nullable=False, default=False)
     approval_status = Column(String(20), nullable=False, default="pending", index=True)
     reviewed_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Float, ForeignKey, DateTime, Date, UniqueConstraint
+from sqlalchemy import Column, String, Integer, Boolean, Float, ForeignKey, DateTime, Date, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -14,6 +14,7 @@ class AttendanceSession(Base):
     session_date = Column(Date, nullable=False)
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime)
+    closed_at = Column(DateTime)  # Server clock at close; end_time can be the caller's photo timestamp
     session_type = Column(String(50), default='regular')
     is_closed = Column(Boolean, default=False)
     marked_by = Column(UUID(as_uuid=True), ForeignKey('faculty.faculty_id'))
@@ -26,6 +27,13 @@ class AttendanceSession(Base):
     faculty = relationship("Faculty")
     records = relationship("AttendanceRecord", back_populates="session")
     
+    __table_args__ = (
+        # Open-session checks, section history and insights, newest first
+        Index('ix_attendance_sessions_section_date', 'section_id', 'session_date'),
+        # Incremental analytics cube refresh: sessions closed since the last run
+        Index('ix_attendance_sessions_closed_at', 'closed_at'),
+    )
+    
     def __repr__(self):
         return f"<Session {self.session_date}>"
 
@@ -35,6 +43,8 @@ class AttendanceRecord(Base):
     record_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey('attendance_sessions.session_id'))
     student_id = Column(UUID(as_uuid=True))  # Allow NULL for mock data
+    # Copied from the session on insert and never changed: the partition key on Postgres
+    session_date = Column(Date, primary_key=True, nullable=False)
     status = Column(String(20), nullable=False)
     marked_at = Column(DateTime, default=datetime.utcnow)
     marked_by = Column(String(50))
@@ -44,5 +54,109 @@ class AttendanceRecord(Base):
     # Relationships
     session = relationship("AttendanceSession", back_populates="records")
     
+    __table_args__ = (
+        # One mark per student per session; target of the bulk upsert. Unique keys on a
+        # partitioned table must include the partition key; session_date is fixed per session.
+        UniqueConstraint('session_id', 'student_id', 'session_date', name='uq_attendance_records_session_student'),
+        # Student history, newest first, optionally windowed by date
+        Index('ix_attendance_records_student_marked_at', 'student_id', 'marked_at'),
+        # Monthly range partitions; see app/services/attendance_partitions.py
+        {'postgresql_partition_by': 'RANGE (session_date)'},
+    )
+    # The table key is (record_id, session_date) because of partitioning; rows are still identified by record_id.
+    __mapper_args__ = {'primary_key': [record_id]}
+    
+    def __repr__(self):
+        return f"<Record {self.status}>"
+
+class AttendanceRecordArchive(Base):
+    """A monthly attendance_records partition that was detached and exported to compressed storage."""
+    __tablename__ = "attendance_record_archives"
+
+    partition_name = Column(String(63), primary_key=True)
+    range_start = Column(Date, nullable=False)
+    range_end = Column(Date, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    location = Column(String(500), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RecordArchive {self.partition_name}>"
+
+class StudentSectionAttendanceStats(Base):
+    """Running present/total counts per student and section, updated as sessions close."""
+    __tablename__ = "student_section_attendance_stats"
+
+    student_id = Column(UUID(as_uuid=True), primary_key=True)
+    section_id = Column(UUID(as_uuid=True), primary_key=True)
+    present_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    attendance_percent = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Risk lists: lowest percentages first within a faculty's sections
+        Index('ix_attendance_stats_section_percent', 'section_id', 'attendance_percent'),
+        # Per-student percentages
+        Index('ix_attendance_stats_student', 'student_id'),
+    )
+
+    def __repr__(self):
+        return f"<AttendanceStats {self.present_count}/{self.total_count}>"
+
+class AttendanceCubeCell(Base):
+    """Closed-session attendance per section, week and session type, rolled up for campus analytics."""
+    __tablename__ = "attendance_cube"
+
+    section_id = Column(UUID(as_uuid=True), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # Monday
+    session_type = Column(String(50), primary_key=True)
+    # Copied from the section's course when the cell is first written; a full refresh picks up changes
+    course_id = Column(UUID(as_uuid=True))
+    department = Column(String(100))
+    session_count = Column(Integer, nullable=False, default=0)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
+    enrolled_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Admin slices filter by department or course over a range of weeks
+        Index('ix_attendance_cube_department_week', 'department', 'week_start'),
+        Index('ix_attendance_cube_course_week', 'course_id', 'week_start'),
+        Index('ix_attendance_cube_week', 'week_start'),
+    )
+
+    def __repr__(self):
+        return f"<AttendanceCubeCell {self.week_start} {self.session_type}>"
+
+class AttendanceCubeRefresh(Base):
+    """One run of the analytics cube refresh; the latest finished run dates the cube."""
+    __tablename__ = "attendance_cube_refreshes"
+
+    refresh_id = Column(Integer, primary_key=True, autoincrement=True)
+    full = Column(Boolean, nullable=False, default=False)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    sessions_folded = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_attendance_cube_refreshes_finished_at', 'finished_at'),
+    )
+
+    def __repr__(self):
+        return f"<AttendanceCubeRefresh {self.refresh_id}>"
+
+class AttendanceCubeSession(Base):
+    """Sessions already folded into the cube, so an overlapping refresh never counts one twice."""
+    __tablename__ = "attendance_cube_sessions"
+
+    session_id = Column(UUID(as_uuid=True), primary_key=True)
+    refresh_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('ix_attendance_cube_sessions_refresh', 'refresh_id'),
+    )
+
     def __repr__(self):
-        return f"<Record {self.status}>"
\ No newline at end of file
+        return f"<AttendanceCubeSession {self.session_id}>"
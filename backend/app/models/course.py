@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -40,6 +40,11 @@ class CourseSection(Base):
     faculty = relationship("Faculty")
     enrollments = relationship("SectionEnrollment", back_populates="section")
     
+    __table_args__ = (
+        # Faculty dashboards list their own sections
+        Index('ix_course_sections_faculty', 'faculty_id'),
+    )
+    
     def __repr__(self):
         return f"<Section {self.section_name}>"
 
@@ -58,6 +63,10 @@ class SectionEnrollment(Base):
     
     __table_args__ = (
         UniqueConstraint('section_id', 'student_id', name='unique_enrollment'),
+        # Roster reads filter on status; the unique constraint already leads with section_id
+        Index('ix_section_enrollments_section_status', 'section_id', 'status'),
+        # A student's active enrollments
+        Index('ix_section_enrollments_student_status', 'student_id', 'status'),
     )
     
     def __repr__(self):
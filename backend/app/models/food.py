@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, Numeric, ForeignKey, DateTime, Date, Time, Text
+from sqlalchemy import Column, String, Boolean, Integer, Numeric, ForeignKey, DateTime, Date, Time, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -41,6 +41,11 @@ class FoodMenuItem(Base):
     # Relationships
     vendor = relationship("FoodVendor", back_populates="menu_items")
     
+    __table_args__ = (
+        # Menu listing and per-vendor item lookups
+        Index('ix_food_menu_items_vendor', 'vendor_id'),
+    )
+    
     def __repr__(self):
         return f"<MenuItem {self.item_name}>"
 
@@ -81,6 +86,14 @@ class FoodOrder(Base):
     slot = relationship("BreakTimeSlot", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
     
+    __table_args__ = (
+        # Order history for a student / a vendor, newest first
+        Index('ix_food_orders_student_order_time', 'student_id', 'order_time'),
+        Index('ix_food_orders_vendor_order_time', 'vendor_id', 'order_time'),
+        # Rush prediction: today's orders and the trailing window, optionally per vendor
+        Index('ix_food_orders_order_date_vendor', 'order_date', 'vendor_id'),
+    )
+    
     def __repr__(self):
         return f"<Order {self.pickup_code}>"
 
@@ -98,5 +111,9 @@ class OrderItem(Base):
     order = relationship("FoodOrder", back_populates="items")
     menu_item = relationship("FoodMenuItem")
     
+    __table_args__ = (
+        Index('ix_order_items_order', 'order_id'),
+    )
+    
     def __repr__(self):
         return f"<OrderItem {self.quantity}x>"
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -19,5 +19,71 @@ class Notification(Base):
     # Relationships
     user = relationship("User")
     
+    __table_args__ = (
+        # Inbox listing and unread filtering by user, newest first
+        Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+        # Full inbox listing, newest first, without a sort step
+        Index('ix_notifications_user_created', 'user_id', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f"<Notification {self.title}>"
+
+class NotificationCounter(Base):
+    """Per-user unread notification count, kept in step with writes to ``notifications``."""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_id} {self.unread_count}>"
+
+class NotificationOutbox(Base):
+    """Outbound email/SMS committed with the business transaction and drained by workers."""
+    __tablename__ = "notification_outbox"
+
+    outbox_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    channel = Column(String(20), nullable=False)  # 'email', 'sms'
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255))
+    body = Column(Text, nullable=False)
+    source = Column(String(50))  # 'attendance', ...
+    reference_id = Column(UUID(as_uuid=True))
+    status = Column(String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    sent_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_notification_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.channel} {self.status}>"
+
+class NotificationDigestEvent(Base):
+    """An absence waiting to be coalesced into one digest per recipient and window."""
+    __tablename__ = "notification_digest_events"
+
+    event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    channel = Column(String(20), nullable=False)  # 'email', 'sms'
+    audience = Column(String(20), nullable=False)  # 'student', 'parent'
+    recipient = Column(String(255), nullable=False)
+    student_id = Column(UUID(as_uuid=True), nullable=False)
+    reference_id = Column(UUID(as_uuid=True))  # attendance session
+    payload = Column(Text, nullable=False)  # JSON template context
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    flush_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_notification_digest_events_flush_at', 'flush_at'),
+        Index('ix_notification_digest_events_recipient', 'recipient', 'channel'),
+    )
+
     def __repr__(self):
-        return f"<Notification {self.title}>"
\ No newline at end of file
+        return f"<NotificationDigestEvent {self.channel} {self.recipient}>"
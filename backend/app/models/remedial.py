@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Date, Time, Text, UniqueConstraint
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, Date, Time, Text, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -45,6 +45,8 @@ class RemedialAttendance(Base):
     
     __table_args__ = (
         UniqueConstraint('remedial_id', 'student_id', name='unique_remedial_attendance'),
+        # A student's remedial history, newest first
+        Index('ix_remedial_attendance_student_marked_at', 'student_id', 'marked_at'),
     )
     
     def __repr__(self):
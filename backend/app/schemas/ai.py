@@ -5,6 +5,16 @@ from uuid import UUID
 from pydantic import BaseModel, Field, HttpUrl
 
 
+class FaceSampleQuality(BaseModel):
+    index: int
+    accepted: bool
+    reason: Optional[str] = None
+    face_pixels: Optional[int] = None
+    sharpness: Optional[float] = None
+    yaw: Optional[float] = None
+    medoid_distance: Optional[float] = None
+
+
 class FaceEnrollmentResponse(BaseModel):
     student_id: UUID
     sample_count: int
@@ -12,6 +22,8 @@ class FaceEnrollmentResponse(BaseModel):
     consent_given: bool
     model_name: str
     updated_at: datetime
+    rejected_samples: int = 0
+    quality_stats: List[FaceSampleQuality] = Field(default_factory=list)
 
 
 class PendingFaceEnrollmentItem(BaseModel):
@@ -81,6 +93,20 @@ class AIAttendanceCaptureResponse(BaseModel):
     matched_registration_numbers: List[str] = Field(default_factory=list)
 
 
+class AIAttendanceBatchCaptureItem(BaseModel):
+    index: int
+    session_id: UUID
+    status_code: int
+    detail: Optional[str] = None
+    result: Optional[AIAttendanceCaptureResponse] = None
+
+
+class AIAttendanceBatchCaptureResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[AIAttendanceBatchCaptureItem]
+
+
 class AIAttendanceStreamStartRequest(BaseModel):
     session_id: UUID
     source_url: str = Field(min_length=8, max_length=1024)
@@ -41,6 +41,33 @@ class AttendanceRecordResponse(BaseModel):
         from_attributes = True
 
 
+class AttendanceHistoryPage(BaseModel):
+    items: List[AttendanceRecordResponse]
+    next_cursor: Optional[str] = None
+
+
+class CourseAttendanceSummary(BaseModel):
+    course_id: Optional[UUID] = None
+    course_code: Optional[str] = None
+    course_name: Optional[str] = None
+    present_count: int
+    absent_count: int
+    total_count: int
+    attendance_percent: float
+    last_marked_at: Optional[datetime] = None
+
+
+class AttendanceSummaryResponse(BaseModel):
+    student_id: UUID
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    present_count: int
+    absent_count: int
+    total_count: int
+    attendance_percent: float
+    courses: List[CourseAttendanceSummary]
+
+
 class AttendanceSessionResponse(BaseModel):
     session_id: UUID
     section_id: Optional[UUID] = None
@@ -55,6 +82,25 @@ class AttendanceSessionResponse(BaseModel):
         from_attributes = True
 
 
+class SectionAttendanceStats(BaseModel):
+    section_id: UUID
+    section_name: Optional[str] = None
+    course_code: Optional[str] = None
+    course_name: Optional[str] = None
+    present_count: int
+    total_count: int
+    attendance_percent: float
+
+
+class StudentAttendanceStatsResponse(BaseModel):
+    student_id: UUID
+    present_count: int
+    absent_count: int
+    total_count: int
+    attendance_percent: float
+    sections: List[SectionAttendanceStats]
+
+
 class AttendanceSectionResponse(BaseModel):
     section_id: UUID
     section_name: str
@@ -82,3 +128,30 @@ class ClassroomResponse(BaseModel):
     block_code: Optional[str] = None
     block_name: Optional[str] = None
     capacity: int
+
+
+class AttendanceCubeRow(BaseModel):
+    department: Optional[str] = None
+    course_id: Optional[UUID] = None
+    section_id: Optional[UUID] = None
+    week_start: Optional[date] = None
+    session_type: Optional[str] = None
+    session_count: int
+    present_count: int
+    absent_count: int
+    enrolled_count: int
+    attendance_percent: float
+
+
+class AttendanceCubeResponse(BaseModel):
+    group_by: List[str]
+    # When the cube was last refreshed; sessions closed since then are not counted yet
+    refreshed_at: Optional[datetime] = None
+    stale_seconds: Optional[float] = None
+    rows: List[AttendanceCubeRow]
+
+
+class AttendanceCubeRefreshResponse(BaseModel):
+    refresh_id: int
+    full: bool
+    sessions_folded: int
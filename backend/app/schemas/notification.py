@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+
+class NotificationResponse(BaseModel):
+    notification_id: UUID
+    notification_type: Optional[str] = None
+    title: str
+    message: str
+    is_read: bool
+    created_at: datetime
+
+
+class NotificationPage(BaseModel):
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+    unread_count: int
+
+
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
+
+class MarkReadResponse(BaseModel):
+    marked: int
+    unread_count: int
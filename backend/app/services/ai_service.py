@@ -1,37 +1,52 @@
 import hashlib
 import io
 import json
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import and_, distinct, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.ai import backends, face_matching, face_quality, image_decoding
+from app.ai.runtime import load_numpy
+from app.config import settings
 from app.models.ai import StudentFaceProfile
 from app.models.attendance import AttendanceRecord, AttendanceSession
 from app.models.course import CourseSection, SectionEnrollment
 from app.models.food import FoodOrder
 from app.models.student import Student
+from app.services import attendance_stats, insights_cache
+from app.services.attendance_service import claim_session_close
+from app.utils.lru_cache import LRUCache
 
-try:
-    import numpy as np
-except Exception:  # pragma: no cover - guarded runtime dependency
-    np = None
-
-try:
-    import face_recognition
-except Exception:  # pragma: no cover - optional dependency
-    face_recognition = None
+# Bound on first AI call; numpy and the face backend are imported lazily (see app.ai.runtime, app.ai.backends).
+np = None
 
 
 ACTIVE_ORDER_STATUSES = {"pending", "confirmed", "ready"}
+# Matches below this confidence count as possible proxy attendance on the insights dashboard.
+PROXY_CONFIDENCE_THRESHOLD = 0.65
+TREND_POINTS = 7
+
+HASH_FALLBACK_MODEL = "hash-fallback"
+
+# Keyed by (SHA-256 of the photo, backend name): face boxes and embeddings, which never go stale.
+face_detections = LRUCache(settings.AI_DETECTION_CACHE_ENTRIES)
+
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_batch_executor_lock = threading.Lock()
 
 
 def _ensure_numpy():
+    global np
     if np is None:
-        raise RuntimeError("numpy is required for AI operations")
+        np = load_numpy()
+    return np
 
 
 def _normalize_embedding(vector: List[float]):
@@ -45,53 +60,109 @@ def _normalize_embedding(vector: List[float]):
     return arr / norm
 
 
-def _cosine_similarity(vec_a, vec_b) -> float:
-    return float(np.dot(vec_a, vec_b))
+def _image_digest(image) -> bytes:
+    if hasattr(image, "shape"):
+        _ensure_numpy()
+        digest = hashlib.sha256(f"{image.shape}:{image.dtype}".encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.digest()
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(image).digest()
+    image.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: image.read(1 << 16), b""):
+        digest.update(chunk)
+    return digest.digest()
 
 
-def _hash_fallback_embedding(image_bytes: bytes):
+def _hash_fallback_embedding(image):
     _ensure_numpy()
-    digest = hashlib.sha256(image_bytes).digest()
+    digest = _image_digest(image)
     raw = np.frombuffer(digest * 8, dtype=np.uint8)[:128].astype(np.float32)
     normalized = (raw - 127.5) / 127.5
-    return _normalize_embedding(normalized.tolist()), "hash-fallback"
+    return _normalize_embedding(normalized.tolist()), HASH_FALLBACK_MODEL
+
 
+def _decode_image(image):
+    """``image`` is encoded bytes, a readable file (spooled upload, mmap) or an already-decoded RGB array."""
+    if hasattr(image, "shape"):
+        return image
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(image)
+    image.seek(0)
+    return image_decoding.decode_image_file(image, settings.AI_UPLOAD_MAX_PIXELS)
 
-def _extract_single_face_embedding(image_bytes: bytes):
-    if not face_recognition:
-        return _hash_fallback_embedding(image_bytes)
 
-    image = face_recognition.load_image_file(io.BytesIO(image_bytes))
-    face_locations = face_recognition.face_locations(image, model="hog")
+def get_face_backend() -> Optional[backends.FaceBackend]:
+    """The configured face backend (``AI_FACE_BACKEND``), or None when its dependencies are not installed."""
+    try:
+        return backends.get_backend()
+    except RuntimeError:
+        return None
+
+
+def _require_capture_backend() -> backends.FaceBackend:
+    backend = get_face_backend()
+    if backend is None:
+        raise RuntimeError(
+            f"Photo-based multi-face capture requires the {settings.AI_FACE_BACKEND} face backend's dependencies"
+        )
+    return backend
+
 
-    if len(face_locations) == 0:
-        raise ValueError("No face detected in one of the uploaded images")
-    if len(face_locations) > 1:
-        raise ValueError("Multiple faces detected in one of the uploaded images")
+def _score_enrollment_sample(image) -> Dict:
+    """Embedding plus quality stats for one enrollment photo; ``stats["reason"]`` is set when it fails a gate."""
+    backend = get_face_backend()
+    if backend is None:
+        embedding, model_name = _hash_fallback_embedding(image)
+        return {"embedding": embedding, "model_name": model_name, "stats": {}}
 
-    encodings = face_recognition.face_encodings(image, face_locations)
+    pixels = _decode_image(image)
+    face_locations = backend.detect(pixels)
+    if len(face_locations) != 1:
+        reason = "no face detected" if not face_locations else "multiple faces detected"
+        return {"embedding": None, "model_name": backend.embedding_model, "stats": {"reason": reason}}
+
+    encodings = backend.encode(pixels, face_locations)
     if not encodings:
-        raise ValueError("Could not extract face embedding from uploaded image")
+        reason = "could not extract face embedding"
+        return {"embedding": None, "model_name": backend.embedding_model, "stats": {"reason": reason}}
+
+    found = backend.landmarks(pixels, face_locations)
+    yaw = face_quality.yaw_proxy(found[0] if found else None)
+    stats = {
+        "face_pixels": face_quality.face_pixels(face_locations[0]),
+        "sharpness": round(face_quality.sharpness(pixels, face_locations[0]), 1),
+        "yaw": round(yaw, 3) if yaw is not None else None,
+    }
+    reason = face_quality.gate_reason(stats)
+    if reason:
+        stats["reason"] = reason
+    return {"embedding": _normalize_embedding(encodings[0].tolist()), "model_name": backend.embedding_model, "stats": stats}
 
-    return _normalize_embedding(encodings[0].tolist()), "face-recognition"
 
+def _detect_faces(backend: backends.FaceBackend, image):
+    ((face_locations, encodings),) = backend.embed([_decode_image(image)])
+    embeddings = []
+    for encoding in encodings:
+        embedding = _normalize_embedding(encoding.tolist())
+        embedding.setflags(write=False)  # shared by every capture that hits the cache
+        embeddings.append(embedding)
+    return tuple(tuple(location) for location in face_locations), tuple(embeddings)
 
-def _extract_multi_face_embeddings(image_bytes: bytes):
-    if not face_recognition:
-        raise RuntimeError(
-            "Photo-based multi-face capture requires face_recognition dependency in backend environment"
-        )
 
-    image = face_recognition.load_image_file(io.BytesIO(image_bytes))
-    face_locations = face_recognition.face_locations(image, model="hog")
-    encodings = face_recognition.face_encodings(image, face_locations)
-    return [_normalize_embedding(encoding.tolist()) for encoding in encodings]
+def _extract_multi_face_embeddings(image, backend: Optional[backends.FaceBackend] = None):
+    backend = backend or _require_capture_backend()
+    # A retried photo (new threshold, client timeout, resubmitted stream frame) skips detection entirely.
+    key = (_image_digest(image), backend.name)
+    _face_locations, embeddings = face_detections.get_or_compute(key, lambda: _detect_faces(backend, image))
+    return list(embeddings)
 
 
 def enroll_face_profile(
     db: Session,
     student_id: UUID,
-    image_samples: List[bytes],
+    image_samples: List,
     consent_given: bool,
 ) -> Dict:
     if not consent_given:
@@ -103,25 +174,60 @@ def enroll_face_profile(
     if not student:
         raise LookupError("Student not found")
 
-    embeddings = []
-    model_name = "hash-fallback"
-    for image_bytes in image_samples:
-        embedding, used_model = _extract_single_face_embedding(image_bytes)
-        embeddings.append(embedding)
-        model_name = used_model
+    # Samples are scored in parallel; each worker decodes one photo (a spooled upload) and drops the pixels.
+    futures = [_detection_executor().submit(_score_enrollment_sample, image) for image in image_samples]
+    samples = []
+    for index, future in enumerate(futures):
+        try:
+            sample = future.result()
+        except ValueError as exc:
+            sample = {"embedding": None, "model_name": None, "stats": {"reason": str(exc)}}
+        sample["stats"] = {"index": index, **sample["stats"]}
+        samples.append(sample)
+
+    candidates = [sample for sample in samples if sample["embedding"] is not None and not sample["stats"].get("reason")]
+    if len(candidates) > 1 and candidates[0]["model_name"] != HASH_FALLBACK_MODEL:
+        distances = face_quality.medoid_distances([sample["embedding"] for sample in candidates])
+        for sample, distance in zip(candidates, distances):
+            sample["stats"]["medoid_distance"] = round(distance, 4)
+            if distance > face_quality.MAX_MEDOID_DISTANCE:
+                sample["stats"]["reason"] = "does not match the other samples"
+
+    accepted = [sample for sample in candidates if not sample["stats"].get("reason")]
+    quality_stats = []
+    for sample in samples:
+        sample["stats"]["accepted"] = not sample["stats"].get("reason")
+        quality_stats.append(sample["stats"])
+    if len(accepted) < face_quality.MIN_ACCEPTED_SAMPLES:
+        rejected = "; ".join(
+            f"image {stats['index'] + 1}: {stats['reason']}" for stats in quality_stats if not stats["accepted"]
+        )
+        raise ValueError(
+            f"Only {len(accepted)} of {len(samples)} images passed quality checks "
+            f"(need {face_quality.MIN_ACCEPTED_SAMPLES}): {rejected}"
+        )
 
-    stacked = np.vstack(embeddings)
+    _ensure_numpy()
+    model_name = accepted[0]["model_name"]
+    stacked = np.vstack([sample["embedding"] for sample in accepted])
     averaged = np.mean(stacked, axis=0)
     normalized = _normalize_embedding(averaged.tolist())
     embedding_json = json.dumps(normalized.tolist())
+    # build_prototypes merges any cluster of fewer than two samples, so a single odd photo never becomes one.
+    prototypes = face_matching.build_prototypes(
+        [sample["embedding"] for sample in accepted], min(settings.AI_FACE_PROTOTYPES, len(accepted) // 2)
+    )
 
     profile = db.query(StudentFaceProfile).filter(StudentFaceProfile.student_id == student_id).first()
     if profile is None:
         profile = StudentFaceProfile(student_id=student_id)
 
     profile.embedding_vector = embedding_json
+    profile.prototype_vectors = face_matching.pack_prototypes(prototypes)
+    profile.prototype_count = len(prototypes)
     profile.model_name = model_name
-    profile.sample_count = len(image_samples)
+    profile.sample_count = len(accepted)
+    profile.quality_stats = json.dumps(quality_stats)
     profile.consent_given = True
     profile.approval_status = "pending"
     profile.reviewed_by = None
@@ -142,6 +248,8 @@ def enroll_face_profile(
         "consent_given": profile.consent_given,
         "model_name": profile.model_name,
         "updated_at": profile.updated_at,
+        "rejected_samples": len(samples) - len(accepted),
+        "quality_stats": quality_stats,
     }
 
 
@@ -209,26 +317,37 @@ def review_face_enrollment(
     }
 
 
-def _resolve_profile_embeddings_for_section(
-    db: Session, section_id: UUID
-) -> Tuple[Dict[UUID, object], Dict[UUID, Student]]:
+def _resolve_profile_embeddings_for_sections(
+    db: Session, section_ids: Iterable[UUID], embedding_model: str
+) -> Dict[UUID, Tuple[Dict[UUID, object], Dict[UUID, Student]]]:
+    """Approved prototypes (K x d per student) and students per section, in three queries for any number of sections.
+
+    Only profiles enrolled in ``embedding_model``'s space are returned; others cannot be compared.
+    """
+    rosters: Dict[UUID, Tuple[Dict[UUID, object], Dict[UUID, Student]]] = {
+        section_id: ({}, {}) for section_id in section_ids
+    }
+    if not rosters:
+        return rosters
+
     enrollments = (
-        db.query(SectionEnrollment)
+        db.query(SectionEnrollment.section_id, SectionEnrollment.student_id)
         .filter(
-            SectionEnrollment.section_id == section_id,
+            SectionEnrollment.section_id.in_(list(rosters)),
             SectionEnrollment.status == "active",
         )
         .all()
     )
-    student_ids = [enrollment.student_id for enrollment in enrollments]
+    student_ids = {student_id for _section_id, student_id in enrollments}
     if not student_ids:
-        return {}, {}
+        return rosters
 
     profiles = (
         db.query(StudentFaceProfile)
         .filter(
             StudentFaceProfile.student_id.in_(student_ids),
             StudentFaceProfile.approval_status == "approved",
+            StudentFaceProfile.model_name == embedding_model,
         )
         .all()
     )
@@ -238,23 +357,46 @@ def _resolve_profile_embeddings_for_section(
     embeddings = {}
     for profile in profiles:
         try:
-            embeddings[profile.student_id] = _normalize_embedding(json.loads(profile.embedding_vector))
+            if profile.prototype_vectors and profile.prototype_count:
+                embeddings[profile.student_id] = face_matching.unpack_prototypes(
+                    profile.prototype_vectors, profile.prototype_count
+                )
+            else:
+                # Profiles enrolled before prototypes existed match on their single averaged vector.
+                embeddings[profile.student_id] = _normalize_embedding(json.loads(profile.embedding_vector))[None, :]
         except Exception:
             continue
 
-    return embeddings, student_map
+    for section_id, student_id in enrollments:
+        section_embeddings, section_students = rosters[section_id]
+        if student_id in student_map:
+            section_students[student_id] = student_map[student_id]
+        if student_id in embeddings:
+            section_embeddings[student_id] = embeddings[student_id]
+    return rosters
 
 
-def capture_attendance_from_photo(
-    db: Session,
-    session_id: UUID,
-    faculty_id: UUID,
-    image_bytes: bytes,
-    confidence_threshold: float = 0.75,
-    late_threshold_minutes: int = 10,
-    captured_at: Optional[datetime] = None,
-) -> Dict:
+def _resolve_profile_embeddings_for_section(
+    db: Session, section_id: UUID, embedding_model: str
+) -> Tuple[Dict[UUID, object], Dict[UUID, Student]]:
+    return _resolve_profile_embeddings_for_sections(db, [section_id], embedding_model)[section_id]
+
+
+def _check_capture_roster(profile_embeddings: Dict, student_map: Dict) -> None:
+    if not student_map:
+        raise ValueError("No active students enrolled in this section")
+    if not profile_embeddings:
+        raise ValueError("No approved face profiles found for enrolled students")
+
+
+def check_capture_session(db: Session, session_id: UUID, faculty_id: UUID) -> AttendanceSession:
+    """The open session ``faculty_id`` may run AI capture on; raises LookupError/PermissionError/ValueError."""
     session = db.query(AttendanceSession).filter(AttendanceSession.session_id == session_id).first()
+    _check_capture_session_state(session, faculty_id)
+    return session
+
+
+def _check_capture_session_state(session: Optional[AttendanceSession], faculty_id: UUID) -> None:
     if not session:
         raise LookupError("Attendance session not found")
     if session.marked_by != faculty_id:
@@ -262,27 +404,13 @@ def capture_attendance_from_photo(
     if session.is_closed:
         raise ValueError("Attendance session is already closed")
 
-    detected_embeddings = _extract_multi_face_embeddings(image_bytes)
-    profile_embeddings, student_map = _resolve_profile_embeddings_for_section(db, session.section_id)
-
-    if not student_map:
-        raise ValueError("No active students enrolled in this section")
-    if not profile_embeddings:
-        raise ValueError("No approved face profiles found for enrolled students")
 
+def _match_detected_faces(detected_embeddings, profile_embeddings: Dict, confidence_threshold: float):
     best_match_for_student: Dict[UUID, Dict] = {}
     proxy_alerts = 0
 
-    for detected in detected_embeddings:
-        best_student_id = None
-        best_similarity = -1.0
-
-        for student_id, profile_embedding in profile_embeddings.items():
-            similarity = _cosine_similarity(detected, profile_embedding)
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_student_id = student_id
-
+    gallery = face_matching.PrototypeGallery(profile_embeddings)
+    for best_student_id, best_similarity in gallery.best_matches(detected_embeddings):
         if best_student_id is None or best_similarity < confidence_threshold:
             continue
 
@@ -295,16 +423,35 @@ def capture_attendance_from_photo(
 
         best_match_for_student[best_student_id] = {"similarity": best_similarity}
 
+    return best_match_for_student, proxy_alerts
+
+
+def _apply_capture(
+    db: Session,
+    session: AttendanceSession,
+    faculty_id: UUID,
+    detected_embeddings,
+    profile_embeddings: Dict,
+    student_map: Dict,
+    existing_records: List[AttendanceRecord],
+    confidence_threshold: float,
+    late_threshold_minutes: int,
+    captured_at: Optional[datetime],
+) -> Dict:
+    """Write one capture's records and close its session, without committing; returns the capture summary.
+
+    Raises ValueError, before writing anything, when another request has closed the session meanwhile.
+    """
+    claim_session_close(db, session)
+    best_match_for_student, proxy_alerts = _match_detected_faces(
+        detected_embeddings, profile_embeddings, confidence_threshold
+    )
+
     now = captured_at or datetime.utcnow()
     late_cutoff = session.start_time + timedelta(minutes=late_threshold_minutes)
     late_detections = len(best_match_for_student) if now > late_cutoff else 0
 
     enrolled_ids = list(student_map.keys())
-    existing_records = (
-        db.query(AttendanceRecord)
-        .filter(AttendanceRecord.session_id == session_id)
-        .all()
-    )
     records_by_student = {record.student_id: record for record in existing_records}
 
     present_count = 0
@@ -336,8 +483,9 @@ def capture_attendance_from_photo(
         else:
             db.add(
                 AttendanceRecord(
-                    session_id=session_id,
+                    session_id=session.session_id,
                     student_id=student_id,
+                    session_date=session.session_date,
                     status=status,
                     marked_at=now,
                     marked_by=f"{faculty_id}:ai_face",
@@ -352,7 +500,9 @@ def capture_attendance_from_photo(
     session.is_closed = True
     session.end_time = now
     db.add(session)
-    db.commit()
+    db.flush()
+    attendance_stats.record_session(db, session)
+    insights_cache.session_closed(db, session.marked_by)
 
     ai_accuracy = 0.0
     if confidence_values:
@@ -371,17 +521,179 @@ def capture_attendance_from_photo(
     }
 
 
+def capture_attendance_from_photo(
+    db: Session,
+    session_id: UUID,
+    faculty_id: UUID,
+    image,
+    confidence_threshold: float = 0.75,
+    late_threshold_minutes: int = 10,
+    captured_at: Optional[datetime] = None,
+) -> Dict:
+    """``image`` is encoded bytes, a readable file or a decoded RGB array (see ``_decode_image``)."""
+    session = check_capture_session(db, session_id, faculty_id)
+
+    backend = _require_capture_backend()
+    detected_embeddings = _extract_multi_face_embeddings(image, backend)
+    profile_embeddings, student_map = _resolve_profile_embeddings_for_section(
+        db, session.section_id, backend.embedding_model
+    )
+    _check_capture_roster(profile_embeddings, student_map)
+
+    existing_records = (
+        db.query(AttendanceRecord)
+        .filter(AttendanceRecord.session_id == session_id, AttendanceRecord.session_date == session.session_date)
+        .all()
+    )
+    result = _apply_capture(
+        db,
+        session,
+        faculty_id,
+        detected_embeddings,
+        profile_embeddings,
+        student_map,
+        existing_records,
+        confidence_threshold,
+        late_threshold_minutes,
+        captured_at,
+    )
+    db.commit()
+    return result
+
+
+def _detection_executor() -> ThreadPoolExecutor:
+    # Shared by every batch in this process, so concurrent batches queue instead of multiplying decode memory.
+    global _batch_executor
+    if _batch_executor is None:
+        with _batch_executor_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.AI_BATCH_CAPTURE_WORKERS),
+                    thread_name_prefix="face-detect",
+                )
+    return _batch_executor
+
+
+def capture_attendance_batch(
+    db: Session,
+    faculty_id: UUID,
+    items: Sequence[Tuple[UUID, object]],
+    confidence_threshold: float = 0.75,
+    late_threshold_minutes: int = 10,
+    captured_at: Optional[datetime] = None,
+) -> List[Dict]:
+    """Capture several ``(session_id, image)`` pairs, e.g. every room of an exam sitting at once.
+
+    Sessions are loaded in one query and rosters once per distinct section; face detection runs on a
+    shared worker pool. Each section's sessions are committed together, so one bad item only fails
+    itself (or, on a database error, its section). Returns one ``{"session_id", "result", "error"}``
+    dict per item in input order; ``error`` holds the LookupError/PermissionError/ValueError/RuntimeError.
+    A missing face backend raises RuntimeError for the whole batch.
+    """
+    backend = _require_capture_backend()
+    outcomes: List[Dict] = [{"session_id": session_id, "result": None, "error": None} for session_id, _image in items]
+    session_ids = {session_id for session_id, _image in items}
+    sessions = {
+        session.session_id: session
+        for session in db.query(AttendanceSession).filter(AttendanceSession.session_id.in_(session_ids)).all()
+    }
+
+    pending: List[int] = []
+    seen = set()
+    for index, (session_id, _image) in enumerate(items):
+        try:
+            if session_id in seen:
+                raise ValueError("Attendance session appears more than once in this batch")
+            seen.add(session_id)
+            _check_capture_session_state(sessions.get(session_id), faculty_id)
+        except (LookupError, PermissionError, ValueError) as exc:
+            outcomes[index]["error"] = exc
+            continue
+        pending.append(index)
+
+    rosters = _resolve_profile_embeddings_for_sections(
+        db, {sessions[items[index][0]].section_id for index in pending}, backend.embedding_model
+    )
+    detections = {}
+    for index in pending:
+        try:
+            _check_capture_roster(*rosters[sessions[items[index][0]].section_id])
+        except ValueError as exc:
+            outcomes[index]["error"] = exc
+            continue
+        detections[index] = _detection_executor().submit(_extract_multi_face_embeddings, items[index][1], backend)
+
+    existing_records: Dict[UUID, List[AttendanceRecord]] = {}
+    if detections:
+        capture_sessions = [sessions[items[index][0]] for index in detections]
+        records = (
+            db.query(AttendanceRecord)
+            .filter(
+                AttendanceRecord.session_id.in_([session.session_id for session in capture_sessions]),
+                AttendanceRecord.session_date.in_({session.session_date for session in capture_sessions}),
+            )
+            .all()
+        )
+        for record in records:
+            existing_records.setdefault(record.session_id, []).append(record)
+
+    by_section: Dict[UUID, List[int]] = {}
+    for index in detections:
+        by_section.setdefault(sessions[items[index][0]].section_id, []).append(index)
+
+    for section_id, indexes in by_section.items():
+        profile_embeddings, student_map = rosters[section_id]
+        written = {}
+        try:
+            for index in indexes:
+                session = sessions[items[index][0]]
+                try:
+                    written[index] = _apply_capture(
+                        db,
+                        session,
+                        faculty_id,
+                        detections[index].result(),
+                        profile_embeddings,
+                        student_map,
+                        existing_records.get(session.session_id, []),
+                        confidence_threshold,
+                        late_threshold_minutes,
+                        captured_at,
+                    )
+                except (ValueError, RuntimeError) as exc:
+                    outcomes[index]["error"] = exc
+                    continue
+            if written:
+                db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            for index in written:
+                outcomes[index]["error"] = RuntimeError("Could not save attendance for this section; retry the capture")
+            continue
+        for index, result in written.items():
+            outcomes[index]["result"] = result
+
+    return outcomes
+
+
 def get_faculty_attendance_ai_insights(
     db: Session,
     faculty_id: UUID,
     low_attendance_threshold: float = 75.0,
 ) -> Dict:
-    sections = (
-        db.query(CourseSection)
-        .filter(CourseSection.faculty_id == faculty_id)
-        .all()
+    """Dashboard numbers for a faculty's sections, cached until one of their sessions closes (or the TTL ends)."""
+    return insights_cache.faculty_insights.get_or_compute(
+        (faculty_id, low_attendance_threshold),
+        lambda: _compute_faculty_insights(db, faculty_id, low_attendance_threshold),
     )
-    section_ids = [section.section_id for section in sections]
+
+
+def _compute_faculty_insights(db: Session, faculty_id: UUID, low_attendance_threshold: float) -> Dict:
+    """Four aggregate queries regardless of section, session or record counts."""
+    section_ids = [
+        section_id
+        for (section_id,) in db.query(CourseSection.section_id).filter(CourseSection.faculty_id == faculty_id).all()
+    ]
     if not section_ids:
         return {
             "ai_attendance_accuracy_percent": 0.0,
@@ -391,118 +703,62 @@ def get_faculty_attendance_ai_insights(
             "risk_students": [],
         }
 
-    ai_sessions = (
-        db.query(AttendanceSession)
+    # Joining on session_date as well lets Postgres prune record partitions per session.
+    ai_sessions_count, average_confidence, proxy_alerts = (
+        db.query(
+            func.count(distinct(AttendanceSession.session_id)),
+            func.avg(AttendanceRecord.confidence_score),
+            func.count(AttendanceRecord.record_id).filter(AttendanceRecord.confidence_score < PROXY_CONFIDENCE_THRESHOLD),
+        )
+        .select_from(AttendanceSession)
+        .outerjoin(
+            AttendanceRecord,
+            and_(
+                AttendanceRecord.session_id == AttendanceSession.session_id,
+                AttendanceRecord.session_date == AttendanceSession.session_date,
+                AttendanceRecord.confidence_score.isnot(None),
+            ),
+        )
         .filter(
             AttendanceSession.section_id.in_(section_ids),
             AttendanceSession.session_type == "ai_face",
         )
-        .order_by(AttendanceSession.session_date.desc())
-        .all()
+        .one()
     )
-    ai_session_ids = [session.session_id for session in ai_sessions]
-
-    ai_records = []
-    if ai_session_ids:
-        ai_records = (
-            db.query(AttendanceRecord)
-            .filter(
-                AttendanceRecord.session_id.in_(ai_session_ids),
-                AttendanceRecord.confidence_score.isnot(None),
-            )
-            .all()
-        )
-
-    confidence_values = [record.confidence_score for record in ai_records if record.confidence_score is not None]
-    ai_accuracy = round(float(sum(confidence_values) / len(confidence_values) * 100), 2) if confidence_values else 0.0
-    proxy_alerts = len([value for value in confidence_values if value < 0.65])
+    ai_accuracy = round(float(average_confidence) * 100, 2) if average_confidence is not None else 0.0
 
     recent_sessions = (
-        db.query(AttendanceSession)
+        db.query(AttendanceSession.session_date, AttendanceSession.present_count, AttendanceSession.total_students)
         .filter(AttendanceSession.section_id.in_(section_ids))
         .order_by(AttendanceSession.session_date.desc())
-        .limit(14)
+        .limit(TREND_POINTS)
         .all()
     )
     trend_graph = []
-    for session in recent_sessions[:7]:
-        total_students = session.total_students or 0
-        present_rate = round((session.present_count / total_students) * 100, 2) if total_students else 0.0
+    for session_date, present_count, total_students in reversed(recent_sessions):
+        total_students = total_students or 0
+        present_rate = round(((present_count or 0) / total_students) * 100, 2) if total_students else 0.0
         trend_graph.append(
             {
-                "date": session.session_date.isoformat(),
+                "date": session_date.isoformat(),
                 "present_rate": present_rate,
                 "total_students": total_students,
             }
         )
-    trend_graph.reverse()
-
-    enrollments = (
-        db.query(SectionEnrollment)
-        .filter(
-            SectionEnrollment.section_id.in_(section_ids),
-            SectionEnrollment.status == "active",
-        )
-        .all()
-    )
-    student_ids = sorted({enrollment.student_id for enrollment in enrollments})
 
+    # Section-to-date percentages come from the rollup maintained as sessions close.
     risk_students = []
-    if student_ids:
-        recent_window = datetime.utcnow() - timedelta(days=60)
-        records = (
-            db.query(AttendanceRecord)
-            .join(AttendanceSession, AttendanceRecord.session_id == AttendanceSession.session_id)
-            .filter(
-                AttendanceSession.section_id.in_(section_ids),
-                AttendanceRecord.student_id.in_(student_ids),
-                AttendanceRecord.marked_at >= recent_window,
-            )
-            .all()
-        )
-
-        totals = defaultdict(int)
-        presents = defaultdict(int)
-        for record in records:
-            totals[record.student_id] += 1
-            if record.status == "present":
-                presents[record.student_id] += 1
-
-        students = db.query(Student).filter(Student.student_id.in_(student_ids)).all()
-        by_student = {student.student_id: student for student in students}
-
-        for student_id in student_ids:
-            total = totals.get(student_id, 0)
-            if total == 0:
-                continue
-
-            attendance_percent = round((presents.get(student_id, 0) / total) * 100, 2)
-            if attendance_percent >= low_attendance_threshold:
-                continue
-
-            gap = max(0.0, low_attendance_threshold - attendance_percent)
-            dropout_risk = round(min(99.0, gap * 1.8 + 10), 2)
-            student = by_student.get(student_id)
-            if not student:
-                continue
-            risk_students.append(
-                {
-                    "student_id": student_id,
-                    "registration_number": student.registration_number,
-                    "name": f"{student.first_name} {student.last_name}",
-                    "attendance_percent": attendance_percent,
-                    "dropout_risk_percent": dropout_risk,
-                }
-            )
-
-    risk_students.sort(key=lambda item: item["attendance_percent"])
+    for item in attendance_stats.list_risk_students(db, section_ids, low_attendance_threshold, limit=8):
+        gap = max(0.0, low_attendance_threshold - item["attendance_percent"])
+        item["dropout_risk_percent"] = round(min(99.0, gap * 1.8 + 10), 2)
+        risk_students.append(item)
 
     return {
         "ai_attendance_accuracy_percent": ai_accuracy,
         "proxy_detection_alerts": proxy_alerts,
-        "ai_sessions_count": len(ai_sessions),
+        "ai_sessions_count": ai_sessions_count,
         "trend_graph": trend_graph,
-        "risk_students": risk_students[:8],
+        "risk_students": risk_students,
     }
 
 
@@ -4,15 +4,11 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional
 from uuid import UUID, uuid4
 
+from app.ai.runtime import load_cv2
 from app.config import settings
 from app.database import SessionLocal
 from app.services import ai_service
 
-try:
-    import cv2
-except Exception:  # pragma: no cover - optional dependency
-    cv2 = None
-
 
 @dataclass
 class AIAttendanceStreamRuntime:
@@ -104,6 +100,7 @@ class AIAttendanceStreamManager:
         runtime.status = "running"
         runtime.updated_at = datetime.utcnow()
 
+        cv2 = load_cv2()
         if cv2 is None:
             runtime.status = "failed"
             runtime.last_error = "opencv-python dependency is unavailable for RTSP capture"
@@ -149,7 +146,7 @@ class AIAttendanceStreamManager:
                             db=db,
                             session_id=runtime.session_id,
                             faculty_id=runtime.faculty_id,
-                            image_bytes=image_bytes,
+                            image=image_bytes,
                             confidence_threshold=runtime.confidence_threshold,
                             late_threshold_minutes=runtime.late_threshold_minutes,
                         )
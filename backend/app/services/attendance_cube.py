@@ -0,0 +1,214 @@
+"""Campus attendance analytics cube: closed sessions by department x course x section x week x session type.
+
+Cells hold session-level counts (present, absent, enrolled), so a refresh never touches attendance_records.
+Each refresh folds in sessions closed since the previous run; ``attendance_cube_sessions`` records which
+sessions are already counted, so overlapping or concurrent runs cannot count a session twice.
+"""
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Date, and_, cast, func, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.database import upsert_insert
+from app.models.attendance import (
+    AttendanceCubeCell as Cell,
+    AttendanceCubeRefresh,
+    AttendanceCubeSession,
+    AttendanceSession,
+)
+from app.models.course import Course, CourseSection
+
+DIMENSIONS = {
+    "department": Cell.department,
+    "course_id": Cell.course_id,
+    "section_id": Cell.section_id,
+    "week_start": Cell.week_start,
+    "session_type": Cell.session_type,
+}
+CELL_COLUMNS = (
+    "section_id",
+    "week_start",
+    "session_type",
+    "course_id",
+    "department",
+    "session_count",
+    "present_count",
+    "absent_count",
+    "enrolled_count",
+    "updated_at",
+)
+# Sessions are found by closed_at; the overlap covers transactions that commit a while after closing.
+CLOSE_LAG = timedelta(minutes=10)
+
+
+def week_start(day: date) -> date:
+    """Monday of ``day``'s week."""
+    return day - timedelta(days=day.weekday())
+
+
+def _week_of(db: Session, column):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return cast(func.date_trunc(literal_column("'week'"), column), Date)
+    if dialect == "sqlite":
+        # Forward to Sunday (a Sunday stays put), then back to that week's Monday.
+        return func.date(column, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+    raise RuntimeError(f"Week bucketing is not supported on {dialect}")
+
+
+def latest_refresh(db: Session) -> Optional[AttendanceCubeRefresh]:
+    return (
+        db.query(AttendanceCubeRefresh)
+        .filter(AttendanceCubeRefresh.finished_at.isnot(None))
+        .order_by(AttendanceCubeRefresh.finished_at.desc())
+        .first()
+    )
+
+
+def refresh(db: Session, full: bool = False, now: Optional[datetime] = None) -> AttendanceCubeRefresh:
+    """Fold sessions closed since the last run into the cube. Does not commit.
+
+    The first run, and ``full=True``, rebuild every cell from all closed sessions.
+    """
+    now = now or datetime.utcnow()
+    previous = latest_refresh(db)
+    full = full or previous is None
+    if full:
+        db.query(Cell).delete(synchronize_session=False)
+        db.query(AttendanceCubeSession).delete(synchronize_session=False)
+
+    run = AttendanceCubeRefresh(full=full, started_at=now)
+    db.add(run)
+    db.flush()
+
+    # Claim the sessions this run counts; ones already claimed by another run are skipped.
+    candidates = select(
+        AttendanceSession.session_id,
+        literal(run.refresh_id, type_=AttendanceCubeSession.refresh_id.type),
+    ).where(
+        AttendanceSession.is_closed.is_(True),
+        AttendanceSession.section_id.isnot(None),
+    )
+    if not full:
+        candidates = candidates.where(AttendanceSession.closed_at >= previous.started_at - CLOSE_LAG)
+    claim = (
+        upsert_insert(db)(AttendanceCubeSession)
+        .from_select(["session_id", "refresh_id"], candidates)
+        .on_conflict_do_nothing(index_elements=[AttendanceCubeSession.session_id])
+    )
+    run.sessions_folded = db.execute(claim).rowcount or 0
+
+    if run.sessions_folded:
+        week = _week_of(db, AttendanceSession.session_date)
+        session_type = func.coalesce(AttendanceSession.session_type, "regular")
+        selection = (
+            select(
+                AttendanceSession.section_id,
+                week,
+                session_type,
+                CourseSection.course_id,
+                Course.department,
+                func.count(),
+                func.sum(func.coalesce(AttendanceSession.present_count, 0)),
+                func.sum(func.coalesce(AttendanceSession.absent_count, 0)),
+                func.sum(func.coalesce(AttendanceSession.total_students, 0)),
+                literal(now, type_=Cell.updated_at.type),
+            )
+            .join(
+                AttendanceCubeSession,
+                and_(
+                    AttendanceCubeSession.session_id == AttendanceSession.session_id,
+                    AttendanceCubeSession.refresh_id == run.refresh_id,
+                ),
+            )
+            .outerjoin(CourseSection, CourseSection.section_id == AttendanceSession.section_id)
+            .outerjoin(Course, Course.course_id == CourseSection.course_id)
+            .group_by(AttendanceSession.section_id, week, session_type, CourseSection.course_id, Course.department)
+        )
+        statement = upsert_insert(db)(Cell).from_select(CELL_COLUMNS, selection)
+        excluded = statement.excluded
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Cell.section_id, Cell.week_start, Cell.session_type],
+                set_={
+                    "session_count": Cell.session_count + excluded.session_count,
+                    "present_count": Cell.present_count + excluded.present_count,
+                    "absent_count": Cell.absent_count + excluded.absent_count,
+                    "enrolled_count": Cell.enrolled_count + excluded.enrolled_count,
+                    "updated_at": excluded.updated_at,
+                },
+            )
+        )
+
+    run.finished_at = datetime.utcnow()
+    db.flush()
+    return run
+
+
+def run_refresh(session_factory: Callable[[], Session], full: bool = False) -> Dict:
+    with session_factory() as db:
+        run = refresh(db, full=full)
+        db.commit()
+        return {"refresh_id": run.refresh_id, "full": run.full, "sessions_folded": run.sessions_folded}
+
+
+def freshness(db: Session, now: Optional[datetime] = None) -> Dict:
+    """When the cube was last refreshed and how many seconds ago (None before the first refresh)."""
+    refreshed_at = db.query(func.max(AttendanceCubeRefresh.finished_at)).scalar()
+    if refreshed_at is None:
+        return {"refreshed_at": None, "stale_seconds": None}
+    now = now or datetime.utcnow()
+    return {"refreshed_at": refreshed_at, "stale_seconds": round(max(0.0, (now - refreshed_at).total_seconds()), 1)}
+
+
+def query_cube(
+    db: Session,
+    group_by: Sequence[str] = ("department",),
+    department: Optional[str] = None,
+    course_id: Optional[UUID] = None,
+    section_id: Optional[UUID] = None,
+    session_type: Optional[str] = None,
+    week_from: Optional[date] = None,
+    week_to: Optional[date] = None,
+    limit: int = 1000,
+) -> Dict:
+    """Sum cube cells over the requested dimensions; an empty ``group_by`` gives one campus-wide row."""
+    dimensions = list(dict.fromkeys(group_by))
+    unknown = [name for name in dimensions if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}. Use {', '.join(DIMENSIONS)}")
+    if week_from and week_to and week_from > week_to:
+        raise ValueError("week_from must be on or before week_to")
+
+    group_columns = [DIMENSIONS[name] for name in dimensions]
+    query = db.query(
+        *(column.label(name) for name, column in zip(dimensions, group_columns)),
+        func.coalesce(func.sum(Cell.session_count), 0).label("session_count"),
+        func.coalesce(func.sum(Cell.present_count), 0).label("present_count"),
+        func.coalesce(func.sum(Cell.absent_count), 0).label("absent_count"),
+        func.coalesce(func.sum(Cell.enrolled_count), 0).label("enrolled_count"),
+    )
+    if department is not None:
+        query = query.filter(Cell.department == department)
+    if course_id is not None:
+        query = query.filter(Cell.course_id == course_id)
+    if section_id is not None:
+        query = query.filter(Cell.section_id == section_id)
+    if session_type is not None:
+        query = query.filter(Cell.session_type == session_type)
+    if week_from is not None:
+        query = query.filter(Cell.week_start >= week_start(week_from))
+    if week_to is not None:
+        query = query.filter(Cell.week_start <= week_to)
+    if group_columns:
+        query = query.group_by(*group_columns).order_by(*group_columns)
+
+    rows = []
+    for row in query.limit(limit).all():
+        item = row._asdict()
+        marked = item["present_count"] + item["absent_count"]
+        item["attendance_percent"] = round(100.0 * item["present_count"] / marked, 2) if marked else 0.0
+        rows.append(item)
+    return {"group_by": dimensions, "rows": rows, **freshness(db)}
@@ -0,0 +1,216 @@
+"""Monthly range partitions of attendance_records (Postgres only).
+
+Rows are routed by ``session_date`` into ``attendance_records_pYYYYMM``. Months with no partition yet
+land in ``attendance_records_default``; creating the month's partition later moves them out.
+Old months can be detached, exported as gzipped CSV and dropped, and restored from that file.
+"""
+import gzip
+import os
+import re
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.models.attendance import AttendanceRecord, AttendanceRecordArchive
+
+PARENT = AttendanceRecord.__tablename__
+DEFAULT_PARTITION = f"{PARENT}_default"
+_MONTH_PARTITION = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def partition_range(name: str) -> Optional[Tuple[date, date]]:
+    """``[start, end)`` of a monthly partition, or None for the default partition."""
+    match = _MONTH_PARTITION.match(name)
+    if not match:
+        return None
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return start, add_months(start, 1)
+
+
+def is_partitioned(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def list_partitions(db: Session) -> List[str]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:parent AS regclass) "
+            "ORDER BY child.relname"
+        ),
+        {"parent": PARENT},
+    )
+    return [name for (name,) in rows]
+
+
+def create_partition(db: Session, month: date) -> str:
+    """Create and attach one month, moving any rows the default partition holds for it. Does not commit.
+
+    ATTACH validates the new table and the default partition instead of taking an exclusive lock on the
+    parent, so writes to other months carry on.
+    """
+    name = partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE session_date >= :start AND session_date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    db.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return name
+
+
+def ensure_partitions(
+    db: Session,
+    months_ahead: int = 3,
+    today: Optional[date] = None,
+    months_back: int = 0,
+) -> List[str]:
+    """Create any missing partitions from ``months_back`` before this month to ``months_ahead`` after it.
+
+    Also creates the default partition if it is missing. Returns the partitions created. Does not commit.
+    A no-op on databases without partitioning.
+    """
+    if not is_partitioned(db):
+        return []
+    existing = set(list_partitions(db))
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    this_month = month_start(today or date.today())
+    for offset in range(-months_back, months_ahead + 1):
+        month = add_months(this_month, offset)
+        if partition_name(month) not in existing:
+            created.append(create_partition(db, month))
+    return created
+
+
+# How long the final DETACH waits for the parent's exclusive lock before giving up until the next run.
+DETACH_LOCK_TIMEOUT = "5s"
+
+
+def archive_partition(db: Session, name: str, archive_dir: str) -> AttendanceRecordArchive:
+    """Export one monthly partition to ``<archive_dir>/<name>.csv.gz``, then detach and drop it. Does not commit.
+
+    The export runs while the partition is still attached, holding only a SHARE lock on that month's
+    table: reads everywhere and writes to other months carry on, and the month cannot change under the
+    COPY. DETACH (not CONCURRENTLY, which a default partition rules out) takes the parent's ACCESS
+    EXCLUSIVE lock only from that point to commit, which is just the DROP and the archive row.
+    The file is complete on disk before the table is dropped; if the transaction then fails the
+    partition stays attached and the next run rewrites the same file.
+    """
+    bounds = partition_range(name)
+    if bounds is None:
+        raise ValueError(f"{name} is not a monthly attendance partition")
+    os.makedirs(archive_dir, exist_ok=True)
+    location = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{location}.partial"
+
+    db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+    cursor = db.connection().connection.cursor()
+    try:
+        with gzip.open(partial, "wt", encoding="utf-8") as stream:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", stream)
+        row_count = cursor.rowcount
+    finally:
+        cursor.close()
+    os.replace(partial, location)
+
+    db.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+    db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+
+    archive = AttendanceRecordArchive(
+        partition_name=name,
+        range_start=bounds[0],
+        range_end=bounds[1],
+        row_count=row_count,
+        location=location,
+        archived_at=datetime.utcnow(),
+    )
+    return db.merge(archive)
+
+
+def months_ending_by(db: Session, cutoff: date) -> List[str]:
+    """Attached monthly partitions whose range ends on or before ``cutoff``."""
+    return [name for name in list_partitions(db) if (partition_range(name) or (None, date.max))[1] <= cutoff]
+
+
+def restore_partition(db: Session, name: str) -> int:
+    """Load an archived month back from its file and re-attach it; returns rows restored. Does not commit."""
+    archive = db.get(AttendanceRecordArchive, name) if partition_range(name) else None
+    if archive is None:
+        raise LookupError(f"No archive recorded for {name}")
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    cursor = db.connection().connection.cursor()
+    try:
+        with gzip.open(archive.location, "rt", encoding="utf-8") as stream:
+            cursor.copy_expert(f"COPY {name} FROM STDIN WITH (FORMAT csv, HEADER)", stream)
+        row_count = cursor.rowcount
+    finally:
+        cursor.close()
+    db.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{archive.range_start.isoformat()}') TO ('{archive.range_end.isoformat()}')"
+        )
+    )
+    db.delete(archive)
+    return row_count
+
+
+def archived_through(db: Session) -> Optional[date]:
+    """End of the newest archived month: records before this date are no longer in the table."""
+    return db.query(func.max(AttendanceRecordArchive.range_end)).scalar()
+
+
+def run_maintenance(
+    session_factory: Callable[[], Session],
+    months_ahead: int = 3,
+    archive_after_months: int = 0,
+    archive_dir: Optional[str] = None,
+    today: Optional[date] = None,
+) -> Dict[str, List[str]]:
+    """Create upcoming partitions, then archive months older than ``archive_after_months`` (0 disables).
+
+    Each partition is archived in its own transaction so one failure does not undo the others.
+    """
+    today = today or date.today()
+    with session_factory() as db:
+        if not is_partitioned(db):
+            return {"created": [], "archived": []}
+        created = ensure_partitions(db, months_ahead=months_ahead, today=today)
+        db.commit()
+
+    archived = []
+    if archive_after_months > 0 and archive_dir:
+        cutoff = add_months(month_start(today), -archive_after_months)
+        with session_factory() as db:
+            names = months_ending_by(db, cutoff)
+        for name in names:
+            with session_factory() as db:
+                archive_partition(db, name, archive_dir)
+                db.commit()
+            archived.append(name)
+    return {"created": created, "archived": archived}
@@ -1,14 +1,20 @@
-from datetime import datetime
-from typing import Dict, List, Optional
-from uuid import UUID
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
 
+from sqlalchemy import and_, case, func, or_, update
 from sqlalchemy.orm import Session
 
+from app.database import upsert_insert
 from app.models.attendance import AttendanceRecord, AttendanceSession
-from app.models.course import CourseSection, SectionEnrollment
+from app.models.course import Course, CourseSection, SectionEnrollment
 from app.models.resource import Classroom
 from app.models.student import Student
 from app.schemas.attendance import AttendanceRecordCreate, AttendanceSessionCreate
+from app.services import attendance_stats, insights_cache
+from app.services.notification_dispatcher import notify_outbox
+from app.services.notification_service import NotificationService
+from app.utils.pagination import decode_cursor, encode_cursor
 
 
 def _get_section(db: Session, section_id: UUID) -> CourseSection:
@@ -159,6 +165,58 @@ def _validate_session_access(session: AttendanceSession, faculty_id: UUID):
         raise PermissionError("Faculty can mark only their own sessions")
 
 
+def claim_session_close(db: Session, session: AttendanceSession) -> None:
+    """Flip ``is_closed`` and stamp ``closed_at`` with a conditional UPDATE before any records are written. Does not commit.
+
+    The UPDATE holds the row lock until commit, so a concurrent close of the same session waits and then
+    matches nothing: exactly one transaction gets to fold the session into the running counts.
+    """
+    claimed = db.execute(
+        update(AttendanceSession)
+        .where(AttendanceSession.session_id == session.session_id, AttendanceSession.is_closed.isnot(True))
+        .values(is_closed=True, closed_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        raise ValueError("Attendance session is already closed")
+
+
+def upsert_attendance_records(
+    db: Session,
+    session: AttendanceSession,
+    statuses: Dict[UUID, str],
+    marked_by: str,
+    marked_at: Optional[datetime] = None,
+) -> list:
+    """Write every mark with one INSERT ... ON CONFLICT DO UPDATE; returns (student_id, status) rows. Does not commit."""
+    if not statuses:
+        return []
+    marked_at = marked_at or datetime.utcnow()
+    statement = upsert_insert(db)(AttendanceRecord)
+    statement = statement.on_conflict_do_update(
+        index_elements=[AttendanceRecord.session_id, AttendanceRecord.student_id, AttendanceRecord.session_date],
+        set_={
+            "status": statement.excluded.status,
+            "marked_at": statement.excluded.marked_at,
+            "marked_by": statement.excluded.marked_by,
+        },
+    ).returning(AttendanceRecord.student_id, AttendanceRecord.status)
+    return db.execute(
+        statement,
+        [
+            {
+                "record_id": uuid4(),
+                "session_id": session.session_id,
+                "student_id": student_id,
+                "session_date": session.session_date,
+                "status": status,
+                "marked_at": marked_at,
+                "marked_by": marked_by,
+            }
+            for student_id, status in statuses.items()
+        ],
+    ).all()
+
+
 def mark_bulk_attendance(
     db: Session,
     session_id: UUID,
@@ -174,8 +232,8 @@ def mark_bulk_attendance(
         raise ValueError("Attendance session is already closed")
 
     enrolled_student_ids = {
-        enrollment.student_id
-        for enrollment in db.query(SectionEnrollment)
+        student_id
+        for (student_id,) in db.query(SectionEnrollment.student_id)
         .filter(
             SectionEnrollment.section_id == session.section_id,
             SectionEnrollment.status == "active",
@@ -190,40 +248,14 @@ def mark_bulk_attendance(
     if invalid_student_ids:
         raise ValueError("Attendance payload includes students not enrolled in this section")
 
-    existing_records = (
-        db.query(AttendanceRecord)
-        .filter(AttendanceRecord.session_id == session_id)
-        .all()
-    )
-    existing_by_student = {record.student_id: record for record in existing_records}
-
-    present_count = 0
-    absent_count = 0
-    absent_student_ids = []
+    # Last mark wins when a student appears twice; ON CONFLICT cannot touch a row twice.
+    statuses = {record.student_id: record.status for record in attendance_data}
 
     try:
-        for record_data in attendance_data:
-            existing_record = existing_by_student.get(record_data.student_id)
-            if existing_record:
-                existing_record.status = record_data.status
-                existing_record.marked_at = datetime.utcnow()
-                existing_record.marked_by = str(faculty_id)
-                target_record = existing_record
-            else:
-                target_record = AttendanceRecord(
-                    session_id=session_id,
-                    student_id=record_data.student_id,
-                    status=record_data.status,
-                    marked_at=datetime.utcnow(),
-                    marked_by=str(faculty_id),
-                )
-                db.add(target_record)
-
-            if target_record.status == "present":
-                present_count += 1
-            else:
-                absent_count += 1
-                absent_student_ids.append(record_data.student_id)
+        claim_session_close(db, session)
+        marked_records = upsert_attendance_records(db, session, statuses, marked_by=str(faculty_id))
+        present_count = sum(1 for record in marked_records if record.status == "present")
+        absent_count = len(marked_records) - present_count
 
         session.present_count = present_count
         session.absent_count = absent_count
@@ -231,29 +263,16 @@ def mark_bulk_attendance(
         session.is_closed = True
         session.end_time = datetime.utcnow()
         db.add(session)
+        attendance_stats.record_session(db, session)
+        insights_cache.session_closed(db, session.marked_by)
+        # Outbox rows commit with the attendance; delivery happens off the request path.
+        notification_result = NotificationService.queue_attendance_notifications(db, session_id, marked_records)
         db.commit()
     except Exception:
         db.rollback()
         raise
 
-    absent_students = []
-    if absent_student_ids:
-        students = db.query(Student).filter(Student.student_id.in_(absent_student_ids)).all()
-        absent_students = [
-            {
-                "name": f"{student.first_name} {student.last_name}",
-                "reg_no": student.registration_number,
-            }
-            for student in students
-        ]
-
-    notification_result = {
-        "student_sms": absent_count,
-        "parent_sms": absent_count,
-        "student_emails": absent_count,
-        "parent_emails": absent_count,
-        "absentees": absent_students,
-    }
+    notify_outbox()
 
     return {
         "message": "Attendance marked successfully",
@@ -263,13 +282,122 @@ def mark_bulk_attendance(
     }
 
 
-def get_student_attendance(db: Session, student_id: UUID) -> List[AttendanceRecord]:
-    return (
-        db.query(AttendanceRecord)
-        .filter(AttendanceRecord.student_id == student_id)
-        .order_by(AttendanceRecord.marked_at.desc())
+def _student_records_query(
+    db: Session,
+    query,
+    student_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+):
+    query = query.filter(AttendanceRecord.student_id == student_id)
+    # The window is on the class date, the partition key, so Postgres only visits the months it covers.
+    if date_from:
+        query = query.filter(AttendanceRecord.session_date >= date_from)
+    if date_to:
+        query = query.filter(AttendanceRecord.session_date <= date_to)
+    if section_id:
+        query = query.filter(
+            AttendanceRecord.session_id.in_(
+                db.query(AttendanceSession.session_id).filter(AttendanceSession.section_id == section_id)
+            )
+        )
+    return query
+
+
+def list_student_attendance(
+    db: Session,
+    student_id: UUID,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+) -> Tuple[List[AttendanceRecord], Optional[str]]:
+    """Newest first, keyset-paginated on (marked_at, record_id)."""
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("date_from must be on or before date_to")
+
+    query = _student_records_query(db, db.query(AttendanceRecord), student_id, date_from, date_to, section_id)
+    if cursor:
+        marked_at, record_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                AttendanceRecord.marked_at < marked_at,
+                and_(AttendanceRecord.marked_at == marked_at, AttendanceRecord.record_id < record_id),
+            )
+        )
+
+    rows = (
+        query.order_by(AttendanceRecord.marked_at.desc(), AttendanceRecord.record_id.desc())
+        .limit(limit + 1)
         .all()
     )
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(rows[limit - 1].marked_at, rows[limit - 1].record_id)
+    return rows[:limit], next_cursor
+
+
+def summarize_student_attendance(
+    db: Session,
+    student_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    section_id: Optional[UUID] = None,
+) -> Dict:
+    """Present/absent counts per course over the window, aggregated in SQL."""
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("date_from must be on or before date_to")
+
+    present = func.sum(case((AttendanceRecord.status == "present", 1), else_=0))
+    query = (
+        db.query(
+            Course.course_id,
+            Course.course_code,
+            Course.course_name,
+            present.label("present_count"),
+            func.count(AttendanceRecord.record_id).label("total_count"),
+            func.max(AttendanceRecord.marked_at).label("last_marked_at"),
+        )
+        .select_from(AttendanceRecord)
+        .join(AttendanceSession, AttendanceSession.session_id == AttendanceRecord.session_id)
+        .outerjoin(CourseSection, CourseSection.section_id == AttendanceSession.section_id)
+        .outerjoin(Course, Course.course_id == CourseSection.course_id)
+    )
+    rows = (
+        _student_records_query(db, query, student_id, date_from, date_to, section_id)
+        .group_by(Course.course_id, Course.course_code, Course.course_name)
+        .order_by(Course.course_code.asc())
+        .all()
+    )
+
+    courses = []
+    for course_id, course_code, course_name, present_count, total_count, last_marked_at in rows:
+        present_count = int(present_count or 0)
+        courses.append({
+            "course_id": course_id,
+            "course_code": course_code,
+            "course_name": course_name,
+            "present_count": present_count,
+            "absent_count": total_count - present_count,
+            "total_count": total_count,
+            "attendance_percent": round(present_count / total_count * 100, 2) if total_count else 0.0,
+            "last_marked_at": last_marked_at,
+        })
+
+    present_total = sum(course["present_count"] for course in courses)
+    total = sum(course["total_count"] for course in courses)
+    return {
+        "student_id": student_id,
+        "date_from": date_from,
+        "date_to": date_to,
+        "present_count": present_total,
+        "absent_count": total - present_total,
+        "total_count": total,
+        "attendance_percent": round(present_total / total * 100, 2) if total else 0.0,
+        "courses": courses,
+    }
 
 
 def resolve_student_id_for_user(db: Session, user_id: UUID) -> UUID:
@@ -0,0 +1,201 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.database import upsert_insert
+from app.models.attendance import AttendanceRecord, AttendanceSession, StudentSectionAttendanceStats as Stats
+from app.models.course import Course, CourseSection, SectionEnrollment
+from app.models.student import Student
+from app.services import attendance_partitions
+
+STATS_COLUMNS = ("student_id", "section_id", "present_count", "total_count", "attendance_percent", "updated_at")
+
+
+def _percent(present, total):
+    return 100.0 * present / total
+
+
+def _present_count():
+    return func.sum(case((AttendanceRecord.status == "present", 1), else_=0))
+
+
+def record_session(db: Session, session: AttendanceSession) -> None:
+    """Fold a closing session's records into the running counts with one upsert. Does not commit.
+
+    Must run once per session, after its records are written, in the transaction that won
+    ``attendance_service.claim_session_close``.
+    """
+    section_id = session.section_id
+    if section_id is None:
+        return
+    present = _present_count()
+    total = func.count()
+    selection = (
+        select(
+            AttendanceRecord.student_id,
+            literal(section_id, type_=Stats.section_id.type),
+            present,
+            total,
+            _percent(present, total),
+            literal(datetime.utcnow(), type_=Stats.updated_at.type),
+        )
+        .where(
+            AttendanceRecord.session_id == session.session_id,
+            AttendanceRecord.session_date == session.session_date,
+            AttendanceRecord.student_id.isnot(None),
+        )
+        .group_by(AttendanceRecord.student_id)
+    )
+    statement = upsert_insert(db)(Stats).from_select(STATS_COLUMNS, selection)
+    excluded = statement.excluded
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[Stats.student_id, Stats.section_id],
+            set_={
+                "present_count": Stats.present_count + excluded.present_count,
+                "total_count": Stats.total_count + excluded.total_count,
+                "attendance_percent": _percent(
+                    Stats.present_count + excluded.present_count,
+                    Stats.total_count + excluded.total_count,
+                ),
+                "updated_at": excluded.updated_at,
+            },
+        )
+    )
+
+
+def rebuild(db: Session, section_ids: Optional[Sequence[UUID]] = None) -> int:
+    """Recompute counts from every closed session (optionally only some sections). Does not commit.
+
+    Sections with sessions in archived months keep their counts: their raw records are gone.
+    """
+    archived_through = attendance_partitions.archived_through(db)
+    frozen_sections = None
+    if archived_through is not None:
+        frozen_sections = select(AttendanceSession.section_id).where(
+            AttendanceSession.session_date < archived_through,
+            AttendanceSession.section_id.isnot(None),
+        )
+
+    delete_query = db.query(Stats)
+    if section_ids is not None:
+        delete_query = delete_query.filter(Stats.section_id.in_(section_ids))
+    if frozen_sections is not None:
+        delete_query = delete_query.filter(Stats.section_id.notin_(frozen_sections))
+    delete_query.delete(synchronize_session=False)
+
+    present = _present_count()
+    total = func.count()
+    selection = (
+        select(
+            AttendanceRecord.student_id,
+            AttendanceSession.section_id,
+            present,
+            total,
+            _percent(present, total),
+            literal(datetime.utcnow(), type_=Stats.updated_at.type),
+        )
+        .join(AttendanceSession, AttendanceSession.session_id == AttendanceRecord.session_id)
+        .where(
+            AttendanceSession.is_closed.is_(True),
+            AttendanceSession.section_id.isnot(None),
+            AttendanceRecord.student_id.isnot(None),
+        )
+        .group_by(AttendanceRecord.student_id, AttendanceSession.section_id)
+    )
+    if section_ids is not None:
+        selection = selection.where(AttendanceSession.section_id.in_(section_ids))
+    if frozen_sections is not None:
+        selection = selection.where(AttendanceSession.section_id.notin_(frozen_sections))
+    return db.execute(Stats.__table__.insert().from_select(STATS_COLUMNS, selection)).rowcount
+
+
+def run_rebuild(session_factory: Callable[[], Session], section_ids: Optional[Sequence[UUID]] = None) -> int:
+    with session_factory() as db:
+        rows = rebuild(db, section_ids)
+        db.commit()
+    return rows
+
+
+def get_student_stats(db: Session, student_id: UUID) -> Dict:
+    """Per-section and overall attendance for one student, read from the rollup."""
+    rows = (
+        db.query(Stats, CourseSection.section_name, Course.course_code, Course.course_name)
+        .outerjoin(CourseSection, CourseSection.section_id == Stats.section_id)
+        .outerjoin(Course, Course.course_id == CourseSection.course_id)
+        .filter(Stats.student_id == student_id)
+        .order_by(Course.course_code.asc(), CourseSection.section_name.asc())
+        .all()
+    )
+    sections = [
+        {
+            "section_id": stats.section_id,
+            "section_name": section_name,
+            "course_code": course_code,
+            "course_name": course_name,
+            "present_count": stats.present_count,
+            "total_count": stats.total_count,
+            "attendance_percent": round(stats.attendance_percent, 2),
+        }
+        for stats, section_name, course_code, course_name in rows
+    ]
+    present = sum(item["present_count"] for item in sections)
+    total = sum(item["total_count"] for item in sections)
+    return {
+        "student_id": student_id,
+        "present_count": present,
+        "absent_count": total - present,
+        "total_count": total,
+        "attendance_percent": round(_percent(present, total), 2) if total else 0.0,
+        "sections": sections,
+    }
+
+
+def list_risk_students(
+    db: Session,
+    section_ids: Sequence[UUID],
+    threshold: float,
+    limit: int = 8,
+) -> List[Dict]:
+    """Actively enrolled students below ``threshold`` across ``section_ids``, lowest first."""
+    if not section_ids:
+        return []
+    present = func.sum(Stats.present_count)
+    total = func.sum(Stats.total_count)
+    percent = _percent(present, total)
+    rows = (
+        db.query(
+            Stats.student_id,
+            Student.registration_number,
+            Student.first_name,
+            Student.last_name,
+            percent.label("attendance_percent"),
+        )
+        .join(
+            SectionEnrollment,
+            and_(
+                SectionEnrollment.section_id == Stats.section_id,
+                SectionEnrollment.student_id == Stats.student_id,
+                SectionEnrollment.status == "active",
+            ),
+        )
+        .join(Student, Student.student_id == Stats.student_id)
+        .filter(Stats.section_id.in_(section_ids), Stats.total_count > 0)
+        .group_by(Stats.student_id, Student.registration_number, Student.first_name, Student.last_name)
+        .having(percent < threshold)
+        .order_by(percent.asc(), Stats.student_id.asc())
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "student_id": student_id,
+            "registration_number": registration_number,
+            "name": f"{first_name} {last_name}",
+            "attendance_percent": round(float(attendance_percent), 2),
+        }
+        for student_id, registration_number, first_name, last_name, attendance_percent in rows
+    ]
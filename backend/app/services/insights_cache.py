@@ -0,0 +1,30 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.utils.ttl_cache import TTLCache
+
+SESSIONS_CLOSED_KEY = "closed_session_faculty_ids"
+
+# Keyed by (faculty_id, threshold). Other processes see a close only when their entry expires.
+faculty_insights = TTLCache(settings.AI_INSIGHTS_CACHE_SECONDS)
+
+
+def session_closed(db: Session, faculty_id: Optional[UUID]) -> None:
+    """Drop the faculty's cached insights once the transaction closing their session commits."""
+    if faculty_id is not None:
+        db.info.setdefault(SESSIONS_CLOSED_KEY, set()).add(faculty_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_closed_sessions(session):
+    for faculty_id in session.info.pop(SESSIONS_CLOSED_KEY, ()):
+        faculty_insights.invalidate(faculty_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_closed_sessions(session):
+    session.info.pop(SESSIONS_CLOSED_KEY, None)
@@ -0,0 +1,166 @@
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.attendance import AttendanceSession
+from app.models.course import Course, CourseSection
+from app.models.notification import NotificationDigestEvent, NotificationOutbox
+from app.services import notification_templates as templates
+from app.services.notification_dispatcher import notify_outbox
+
+# (audience, channel) -> (single body, single subject, digest body, digest subject).
+# A window holding one absence still goes out as the regular alert.
+DIGEST_TEMPLATES = {
+    ("student", "sms"): (templates.ATTENDANCE_STUDENT_SMS, None, templates.DIGEST_STUDENT_SMS, None),
+    ("parent", "sms"): (templates.ATTENDANCE_PARENT_SMS, None, templates.DIGEST_PARENT_SMS, None),
+    ("student", "email"): (
+        templates.ATTENDANCE_STUDENT_EMAIL,
+        templates.ATTENDANCE_STUDENT_EMAIL_SUBJECT,
+        templates.DIGEST_STUDENT_EMAIL,
+        templates.DIGEST_STUDENT_EMAIL_SUBJECT,
+    ),
+    ("parent", "email"): (
+        templates.ATTENDANCE_PARENT_EMAIL,
+        templates.ATTENDANCE_PARENT_EMAIL_SUBJECT,
+        templates.DIGEST_PARENT_EMAIL,
+        templates.DIGEST_PARENT_EMAIL_SUBJECT,
+    ),
+}
+
+# (audience, channel, recipient, student_id, template context)
+DigestTarget = Tuple[str, str, str, UUID, dict]
+
+
+def session_label(db: Session, session_id) -> str:
+    """Short description of the class, e.g. ``CSE101 09:00``, listed in digests."""
+    row = (
+        db.query(Course.course_code, AttendanceSession.start_time)
+        .select_from(AttendanceSession)
+        .outerjoin(CourseSection, CourseSection.section_id == AttendanceSession.section_id)
+        .outerjoin(Course, Course.course_id == CourseSection.course_id)
+        .filter(AttendanceSession.session_id == session_id)
+        .first()
+    )
+    if not row:
+        return "class"
+    course_code, start_time = row
+    label = course_code or "class"
+    return f"{label} {start_time:%H:%M}" if start_time else label
+
+
+def stage_absence_events(
+    db: Session,
+    session_id,
+    targets: Sequence[DigestTarget],
+    label: str,
+    window_minutes: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """Record absences for coalescing; joins any window already open for the recipient. Does not commit."""
+    if not targets:
+        return 0
+    now = now or datetime.utcnow()
+    window = timedelta(minutes=window_minutes or settings.NOTIFICATION_DIGEST_WINDOW_MINUTES)
+
+    recipients = sorted({target[2] for target in targets})
+    open_windows = {
+        (channel, audience, recipient, student_id): flush_at
+        for channel, audience, recipient, student_id, flush_at in (
+            db.query(
+                NotificationDigestEvent.channel,
+                NotificationDigestEvent.audience,
+                NotificationDigestEvent.recipient,
+                NotificationDigestEvent.student_id,
+                func.max(NotificationDigestEvent.flush_at),
+            )
+            .filter(
+                NotificationDigestEvent.recipient.in_(recipients),
+                NotificationDigestEvent.flush_at > now,
+            )
+            .group_by(
+                NotificationDigestEvent.channel,
+                NotificationDigestEvent.audience,
+                NotificationDigestEvent.recipient,
+                NotificationDigestEvent.student_id,
+            )
+            .all()
+        )
+    }
+
+    rows = []
+    for audience, channel, recipient, student_id, context in targets:
+        rows.append({
+            "channel": channel,
+            "audience": audience,
+            "recipient": recipient,
+            "student_id": student_id,
+            "reference_id": session_id,
+            "payload": json.dumps({**context, "label": label}),
+            "occurred_at": now,
+            "flush_at": open_windows.get((channel, audience, recipient, student_id), now + window),
+        })
+    db.execute(insert(NotificationDigestEvent), rows)
+    return len(rows)
+
+
+def flush_due_digests(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Turn every closed window into one outbox message per recipient. Does not commit."""
+    from app.services.notification_service import NotificationService
+
+    now = now or datetime.utcnow()
+    events = (
+        db.query(NotificationDigestEvent)
+        .filter(NotificationDigestEvent.flush_at <= now)
+        .order_by(NotificationDigestEvent.flush_at.asc(), NotificationDigestEvent.occurred_at.asc())
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not events:
+        return {"events": 0, "digests": 0}
+
+    groups: Dict[tuple, List[NotificationDigestEvent]] = {}
+    for event in events:
+        key = (event.channel, event.audience, event.recipient, event.student_id, event.flush_at)
+        groups.setdefault(key, []).append(event)
+
+    outbox_rows = []
+    for (channel, audience, recipient, _student_id, _flush_at), group in groups.items():
+        single_body, single_subject, digest_body, digest_subject = DIGEST_TEMPLATES[(audience, channel)]
+        contexts = [json.loads(event.payload) for event in group]
+        if len(group) == 1:
+            context, body_template, subject_template = contexts[0], single_body, single_subject
+        else:
+            context = {
+                **contexts[0],
+                "count": len(group),
+                "classes": ", ".join(item.get("label", "class") for item in contexts),
+            }
+            body_template, subject_template = digest_body, digest_subject
+        outbox_rows.append(NotificationService.outbox_row(
+            channel,
+            recipient,
+            body_template.render(context),
+            subject=subject_template.render(context) if subject_template else None,
+            source="attendance_digest",
+            reference_id=group[-1].reference_id,
+        ))
+
+    db.execute(insert(NotificationOutbox).execution_options(render_nulls=True), outbox_rows)
+    db.query(NotificationDigestEvent).filter(
+        NotificationDigestEvent.event_id.in_([event.event_id for event in events])
+    ).delete(synchronize_session=False)
+    return {"events": len(events), "digests": len(outbox_rows)}
+
+
+def run_digest_flush(session_factory: Callable[[], Session], now: Optional[datetime] = None) -> Dict[str, int]:
+    with session_factory() as db:
+        result = flush_due_digests(db, now=now)
+        db.commit()
+    if result["digests"]:
+        notify_outbox()
+    return result
@@ -0,0 +1,402 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.notification import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TASK_NAME = "notifications.drain_outbox"
+
+# A 'sending' row whose worker died is handed out again after this long.
+SENDING_LEASE_SECONDS = 300
+
+
+@dataclass
+class OutboxMessage:
+    outbox_id: UUID
+    channel: str
+    recipient: str
+    subject: Optional[str]
+    body: str
+    attempts: int
+
+
+# A sender returns False (or raises) when delivery failed and should be retried. Senders may
+# also expose ``send_batch(messages) -> [error or None, ...]`` to deliver a chunk per call.
+Sender = Callable[[OutboxMessage], bool]
+
+
+def _send_one(sender: Sender, message: OutboxMessage) -> List[Optional[str]]:
+    return [None if sender(message) else "Sender reported failure"]
+
+
+class InMemoryBroker:
+    """Wakes the in-process worker as soon as outbox rows are committed."""
+
+    def __init__(self):
+        self._wakeups: "queue.Queue[None]" = queue.Queue()
+        self.published = 0
+
+    def publish(self) -> None:
+        self.published += 1
+        self._wakeups.put(None)
+
+    def wait(self, timeout: float) -> bool:
+        try:
+            self._wakeups.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        # Collapse a burst of commits into a single drain.
+        while True:
+            try:
+                self._wakeups.get_nowait()
+            except queue.Empty:
+                return True
+
+
+class CeleryBroker:
+    """Enqueues a drain task on Celery; the worker process owns delivery."""
+
+    def __init__(self, celery_app):
+        self._celery_app = celery_app
+
+    def publish(self) -> None:
+        self._celery_app.send_task(DRAIN_TASK_NAME)
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(timeout)
+        return False
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        senders: Dict[str, Sender],
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 30.0,
+        concurrency: Optional[Dict[str, int]] = None,
+        lease_seconds: float = SENDING_LEASE_SECONDS,
+        periodic_jobs: Optional[List[Callable[[], object]]] = None,
+    ):
+        self.session_factory = session_factory
+        self.senders = senders
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        # Run before every drain, e.g. flushing notification digests into the outbox.
+        self.periodic_jobs = list(periodic_jobs or [])
+        self.concurrency = {channel: max(1, (concurrency or {}).get(channel, 1)) for channel in senders}
+        self._executors = {
+            channel: ThreadPoolExecutor(
+                max_workers=self.concurrency[channel],
+                thread_name_prefix=f"outbox-{channel}",
+            )
+            for channel in senders
+        }
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._broker = None
+
+    def claim_batch(self) -> List[OutboxMessage]:
+        now = datetime.utcnow()
+        stale_lock = now - timedelta(seconds=self.lease_seconds)
+        with self.session_factory() as db:
+            rows = (
+                db.query(NotificationOutbox)
+                .filter(
+                    or_(
+                        (NotificationOutbox.status == "pending") & (NotificationOutbox.next_attempt_at <= now),
+                        (NotificationOutbox.status == "sending") & (NotificationOutbox.locked_at < stale_lock),
+                    )
+                )
+                .order_by(NotificationOutbox.next_attempt_at.asc())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            messages = []
+            for row in rows:
+                if row.status == "sending" and (row.attempts or 0) >= self.max_attempts:
+                    # Its worker died on every attempt; handing it out again would just repeat that forever.
+                    row.status = "failed"
+                    row.locked_at = None
+                    row.last_error = (
+                        f"Delivery did not finish within the {self.lease_seconds:g}s lease after {row.attempts} attempts"
+                    )
+                    continue
+                row.status = "sending"
+                row.locked_at = now
+                row.attempts = (row.attempts or 0) + 1
+                messages.append(
+                    OutboxMessage(
+                        outbox_id=row.outbox_id,
+                        channel=row.channel,
+                        recipient=row.recipient,
+                        subject=row.subject,
+                        body=row.body,
+                        attempts=row.attempts,
+                    )
+                )
+            db.commit()
+            return messages
+
+    def dispatch(self, messages: List[OutboxMessage]) -> Dict[str, int]:
+        by_channel: Dict[str, List[OutboxMessage]] = {}
+        errors: Dict[UUID, str] = {}
+        for message in messages:
+            if message.channel not in self.senders:
+                errors[message.outbox_id] = f"No sender for channel '{message.channel}'"
+                continue
+            by_channel.setdefault(message.channel, []).append(message)
+
+        futures = []
+        for channel, channel_messages in by_channel.items():
+            sender = self.senders[channel]
+            executor = self._executors[channel]
+            if hasattr(sender, "send_batch"):
+                # One chunk per worker so each chunk reuses a single transport connection.
+                workers = self.concurrency[channel]
+                for offset in range(workers):
+                    chunk = channel_messages[offset::workers]
+                    if chunk:
+                        futures.append((chunk, executor.submit(sender.send_batch, chunk)))
+            else:
+                for message in channel_messages:
+                    futures.append(([message], executor.submit(_send_one, sender, message)))
+
+        sent_ids = []
+        for chunk, future in futures:
+            try:
+                chunk_errors = future.result()
+            except Exception as exc:
+                chunk_errors = [f"{type(exc).__name__}: {exc}"] * len(chunk)
+            for message, error in zip(chunk, chunk_errors):
+                if error is None:
+                    sent_ids.append(message.outbox_id)
+                else:
+                    errors[message.outbox_id] = error
+
+        return self._record_results(messages, sent_ids, errors)
+
+    def _record_results(self, messages: List[OutboxMessage], sent_ids: List[UUID], errors: Dict[UUID, str]) -> Dict[str, int]:
+        now = datetime.utcnow()
+        result = {"sent": len(sent_ids), "retried": 0, "failed": 0}
+        with self.session_factory() as db:
+            if sent_ids:
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.outbox_id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, locked_at=None, last_error=None)
+                )
+            for message in messages:
+                error = errors.get(message.outbox_id)
+                if error is None:
+                    continue
+                values = {"locked_at": None, "last_error": error[:1000]}
+                if message.attempts >= self.max_attempts or message.channel not in self.senders:
+                    values["status"] = "failed"
+                    result["failed"] += 1
+                else:
+                    values["status"] = "pending"
+                    values["next_attempt_at"] = now + timedelta(seconds=self.backoff_seconds(message.attempts))
+                    result["retried"] += 1
+                db.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.outbox_id == message.outbox_id)
+                    .values(**values)
+                )
+            db.commit()
+        return result
+
+    def backoff_seconds(self, attempts: int) -> float:
+        return self.retry_base_seconds * (2 ** max(0, attempts - 1))
+
+    def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Deliver due messages batch by batch until none are left."""
+        totals = {"sent": 0, "retried": 0, "failed": 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            messages = self.claim_batch()
+            if not messages:
+                break
+            for key, value in self.dispatch(messages).items():
+                totals[key] += value
+            batches += 1
+        return totals
+
+    def run_periodic_jobs(self) -> None:
+        for job in self.periodic_jobs:
+            try:
+                job()
+            except Exception:
+                logger.exception("Notification job %r failed", job)
+
+    def start(self, broker, poll_seconds: float) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._broker = broker
+        self._thread = threading.Thread(
+            target=self._run, args=(broker, poll_seconds), name="notification-outbox", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if isinstance(self._broker, InMemoryBroker):
+            self._broker.publish()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def shutdown(self) -> None:
+        self.stop()
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def _run(self, broker, poll_seconds: float) -> None:
+        while not self._stop.is_set():
+            self.run_periodic_jobs()
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Notification outbox drain failed")
+            # Wake on new commits; the poll picks up retries whose backoff has elapsed.
+            broker.wait(poll_seconds)
+
+
+def _build_broker():
+    if settings.NOTIFICATION_BROKER == "celery":
+        from app.workers.celery_app import celery_app
+
+        return CeleryBroker(celery_app)
+    return InMemoryBroker()
+
+
+_broker = None
+_dispatcher: Optional[OutboxDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _dispatcher_lock:
+        if _broker is None:
+            _broker = _build_broker()
+        return _broker
+
+
+def get_dispatcher() -> OutboxDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            from app.database import SessionLocal
+            from app.services.notification_service import NotificationService
+
+            _dispatcher = OutboxDispatcher(
+                session_factory=SessionLocal,
+                senders={
+                    "email": _email_sender(),
+                    "sms": lambda message: NotificationService.send_sms(message.recipient, message.body),
+                },
+                batch_size=settings.NOTIFICATION_BATCH_SIZE,
+                max_attempts=settings.NOTIFICATION_MAX_ATTEMPTS,
+                retry_base_seconds=settings.NOTIFICATION_RETRY_BASE_SECONDS,
+                concurrency={
+                    "email": settings.NOTIFICATION_EMAIL_CONCURRENCY,
+                    "sms": settings.NOTIFICATION_SMS_CONCURRENCY,
+                },
+                periodic_jobs=_periodic_jobs(SessionLocal),
+            )
+        return _dispatcher
+
+
+def shutdown_dispatcher() -> None:
+    """Stop the outbox thread and wait for in-flight sends; a later ``get_dispatcher`` builds a fresh one."""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.shutdown()
+
+
+def _every(interval_seconds: float, job: Callable[[], object], delay_first: bool = False) -> Callable[[], None]:
+    """Run ``job`` at most once per ``interval_seconds``, failures included.
+
+    The first call runs it, or with ``delay_first`` the first call after one interval.
+    """
+    next_run = [time.monotonic() + interval_seconds if delay_first else 0.0]
+
+    def _throttled() -> None:
+        now = time.monotonic()
+        if now < next_run[0]:
+            return
+        next_run[0] = now + interval_seconds
+        job()
+
+    return _throttled
+
+
+def _periodic_jobs(session_factory) -> List[Callable[[], object]]:
+    jobs = []
+    if settings.NOTIFICATION_DIGEST_ENABLED:
+        from app.services.notification_digest import run_digest_flush
+
+        jobs.append(lambda: run_digest_flush(session_factory))
+    if settings.NOTIFICATION_BROKER != "celery":
+        # Without Celery beat (app/workers/celery_app.py) the in-process worker keeps the schedule.
+        from app.services import attendance_cube, attendance_partitions
+
+        jobs.append(_every(
+            settings.ATTENDANCE_PARTITION_MAINTENANCE_SECONDS,
+            lambda: attendance_partitions.run_maintenance(
+                session_factory,
+                months_ahead=settings.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+                archive_after_months=settings.ATTENDANCE_ARCHIVE_AFTER_MONTHS,
+                archive_dir=settings.ATTENDANCE_ARCHIVE_DIR,
+            ),
+        ))
+        jobs.append(_every(
+            settings.ATTENDANCE_CUBE_REFRESH_SECONDS,
+            lambda: attendance_cube.run_refresh(session_factory),
+        ))
+        # The first incremental run already rebuilds an empty cube; the full rebuild waits its interval.
+        jobs.append(_every(
+            settings.ATTENDANCE_CUBE_FULL_REFRESH_SECONDS,
+            lambda: attendance_cube.run_refresh(session_factory, full=True),
+            delay_first=True,
+        ))
+    return jobs
+
+
+def _email_sender() -> Sender:
+    from app.services.notification_service import NotificationService
+    from app.services.smtp_pool import EmailOutboxSender, get_smtp_pool
+
+    smtp_pool = get_smtp_pool()
+    if smtp_pool is None:
+        # SMTP not configured (local dev): fall back to the console transport.
+        return lambda message: NotificationService.send_email(message.recipient, message.subject, message.body)
+    return EmailOutboxSender(smtp_pool, settings.SMTP_FROM or settings.SMTP_USER or "no-reply@localhost")
+
+
+def notify_outbox() -> None:
+    """Call after committing outbox rows. Delivery still happens on the next poll if this fails."""
+    try:
+        get_broker().publish()
+    except Exception:
+        logger.exception("Could not publish outbox wakeup")
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from typing import Dict, Iterable, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.services.notification_inbox import UNREAD_CHANGED_KEY
+
+
+class NotificationHub:
+    """Wakes websocket subscribers in this process when a user's unread count changes.
+
+    Changes committed by other processes are picked up by the websocket's periodic recheck.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[UUID, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: UUID) -> asyncio.Event:
+        wakeup = asyncio.Event()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), wakeup))
+        return wakeup
+
+    def unsubscribe(self, user_id: UUID, wakeup: asyncio.Event) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is wakeup})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def notify(self, user_ids: Iterable[UUID]) -> None:
+        """Safe to call from worker threads."""
+        with self._lock:
+            targets = [entry for user_id in user_ids for entry in self._subscribers.get(user_id, ())]
+        for loop, wakeup in targets:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # Loop already closed; the subscriber is going away.
+                pass
+
+
+hub = NotificationHub()
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_unread_changes(session):
+    user_ids = session.info.pop(UNREAD_CHANGED_KEY, None)
+    if user_ids:
+        hub.notify(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_unread_changes(session):
+    session.info.pop(UNREAD_CHANGED_KEY, None)
@@ -0,0 +1,149 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, or_, update
+from sqlalchemy.orm import Session
+
+from app.database import upsert_insert
+from app.models.notification import Notification, NotificationCounter
+from app.utils.pagination import decode_cursor, encode_cursor
+
+# Session.info key collecting users whose unread count changed; published after commit.
+UNREAD_CHANGED_KEY = "unread_changed_user_ids"
+
+
+def _mark_unread_changed(db: Session, user_ids: Iterable[UUID]) -> None:
+    db.info.setdefault(UNREAD_CHANGED_KEY, set()).update(user_ids)
+
+
+def list_notifications(
+    db: Session,
+    user_id: UUID,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+) -> Tuple[List[Notification], Optional[str]]:
+    """Newest first, keyset-paginated on (created_at, notification_id)."""
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.is_read.is_(False))
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Notification.created_at < created_at,
+                and_(Notification.created_at == created_at, Notification.notification_id < notification_id),
+            )
+        )
+
+    rows = (
+        query.order_by(Notification.created_at.desc(), Notification.notification_id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].notification_id)
+    return rows[:limit], next_cursor
+
+
+def get_unread_count(db: Session, user_id: UUID) -> int:
+    count = (
+        db.query(NotificationCounter.unread_count)
+        .filter(NotificationCounter.user_id == user_id)
+        .scalar()
+    )
+    return max(count or 0, 0)
+
+
+def increment_unread(db: Session, user_ids: Iterable[UUID]) -> None:
+    """Add one unread per occurrence in ``user_ids`` with a single upsert. Does not commit."""
+    counts: Dict[UUID, int] = Counter(user_id for user_id in user_ids if user_id is not None)
+    if not counts:
+        return
+    statement = upsert_insert(db)(NotificationCounter)
+    statement = statement.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "unread_count": NotificationCounter.unread_count + statement.excluded.unread_count,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    now = datetime.utcnow()
+    db.execute(
+        statement,
+        [{"user_id": user_id, "unread_count": count, "updated_at": now} for user_id, count in counts.items()],
+    )
+    _mark_unread_changed(db, counts)
+
+
+def mark_read(db: Session, user_id: UUID, notification_id: UUID) -> bool:
+    """Returns False when the notification was already read."""
+    result = db.execute(
+        update(Notification)
+        .where(
+            Notification.notification_id == notification_id,
+            Notification.user_id == user_id,
+            Notification.is_read.is_(False),
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        exists = (
+            db.query(Notification.notification_id)
+            .filter(Notification.notification_id == notification_id, Notification.user_id == user_id)
+            .first()
+        )
+        if not exists:
+            raise LookupError("Notification not found")
+        return False
+
+    db.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id, NotificationCounter.unread_count > 0)
+        .values(unread_count=NotificationCounter.unread_count - 1, updated_at=datetime.utcnow())
+    )
+    _mark_unread_changed(db, [user_id])
+    db.commit()
+    return True
+
+
+def mark_all_read(db: Session, user_id: UUID) -> int:
+    """One set-based UPDATE over the user's unread rows (served by the inbox index)."""
+    marked = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if marked:
+        # Subtract what was marked rather than zeroing: a notification committed between the two
+        # statements is still unread and its increment must survive.
+        db.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id == user_id)
+            .values(
+                unread_count=case(
+                    (NotificationCounter.unread_count > marked, NotificationCounter.unread_count - marked),
+                    else_=0,
+                ),
+                updated_at=datetime.utcnow(),
+            )
+        )
+        _mark_unread_changed(db, [user_id])
+    db.commit()
+    return marked
+
+
+def serialize_notification(notification: Notification) -> dict:
+    return {
+        "notification_id": notification.notification_id,
+        "notification_type": notification.notification_type,
+        "title": notification.title,
+        "message": notification.message,
+        "is_read": bool(notification.is_read),
+        "created_at": notification.created_at,
+    }
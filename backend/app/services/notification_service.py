@@ -1,19 +1,50 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload
 from typing import List
+from datetime import datetime
+import uuid
 from app.models.student import Student
 from app.models.attendance import AttendanceRecord
-from app.models.notification import Notification
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from app.models.notification import Notification, NotificationOutbox
 from app.config import settings
+from app.services import notification_digest, notification_inbox, notification_templates as templates
+from app.services.notification_hub import hub as _notification_hub  # noqa: F401  (registers after-commit push)
+from app.services.notification_dispatcher import notify_outbox
+from app.services.smtp_pool import build_message, get_smtp_pool
 
 class NotificationService:
-    """Service for sending notifications via Email and SMS"""
+    """Service for sending notifications via Email and SMS.
+
+    Outbound messages go through the ``notification_outbox`` table and are delivered by
+    ``app.services.notification_dispatcher``; ``send_email``/``send_sms`` are the channel transports.
+    """
     
     @staticmethod
-    def send_attendance_notifications(db: Session, session_id: str, attendance_records: List[AttendanceRecord]):
-        """Send notifications to students and parents after attendance is marked"""
+    def outbox_row(channel: str, recipient: str, body: str, subject: str = None,
+                   source: str = None, reference_id=None) -> dict:
+        """Values for one ``notification_outbox`` row, for bulk inserts."""
+        return {
+            'outbox_id': uuid.uuid4(),
+            'channel': channel,
+            'recipient': recipient,
+            'subject': subject,
+            'body': body,
+            'source': source,
+            'reference_id': reference_id,
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': datetime.utcnow(),
+            'created_at': datetime.utcnow(),
+        }
+
+    @staticmethod
+    def queue_attendance_notifications(db: Session, session_id, attendance_records: List[AttendanceRecord]) -> dict:
+        """Stage absence SMS/emails and in-app notifications without committing.
+
+        One query loads every absentee with their user; bodies are batch-rendered from the
+        precompiled templates, outbox and in-app rows go out as two bulk inserts and unread
+        counters are bumped with one upsert.
+        """
         
         notifications_sent = {
             'student_emails': 0,
@@ -23,103 +54,109 @@ class NotificationService:
             'absentees': []
         }
         
-        for record in attendance_records:
-            # Get student details
-            student = db.query(Student).filter(Student.student_id == record.student_id).first()
-            
-            if not student:
-                continue
-            
-            # Check if absent
-            if record.status == 'absent':
-                notifications_sent['absentees'].append({
-                    'name': f"{student.first_name} {student.last_name}",
-                    'reg_no': student.registration_number
-                })
-                
-                # Send SMS to student
-                student_sms_sent = NotificationService.send_sms(
-                    student.phone,
-                    f"Attendance Alert: You were marked ABSENT today. Please contact your faculty if this is incorrect. - LPU Smart Campus"
-                )
-                if student_sms_sent:
-                    notifications_sent['student_sms'] += 1
-                
-                # Send SMS to parent
-                if student.parent_phone:
-                    parent_sms_sent = NotificationService.send_sms(
-                        student.parent_phone,
-                        f"Dear Parent, Your ward {student.first_name} {student.last_name} (Reg: {student.registration_number}) was marked ABSENT today. - LPU"
-                    )
-                    if parent_sms_sent:
-                        notifications_sent['parent_sms'] += 1
-                
-                # Send Email to student
-                student_email_sent = NotificationService.send_email(
-                    student.user.email,
-                    "Attendance Alert - Marked Absent",
-                    f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif;">
-                        <h2 style="color: #dc2626;">Attendance Alert</h2>
-                        <p>Dear {student.first_name},</p>
-                        <p>You were marked <strong style="color: #dc2626;">ABSENT</strong> in today's class.</p>
-                        <p><strong>Registration Number:</strong> {student.registration_number}</p>
-                        <p>If you believe this is an error, please contact your faculty immediately.</p>
-                        <br>
-                        <p>Best regards,<br>LPU Smart Campus System</p>
-                    </body>
-                    </html>
-                    """
-                )
-                if student_email_sent:
-                    notifications_sent['student_emails'] += 1
-                
-                # Send Email to parent
-                if student.parent_email:
-                    parent_email_sent = NotificationService.send_email(
-                        student.parent_email,
-                        f"Student Attendance Alert - {student.first_name} {student.last_name}",
-                        f"""
-                        <html>
-                        <body style="font-family: Arial, sans-serif;">
-                            <h2 style="color: #dc2626;">Student Attendance Alert</h2>
-                            <p>Dear Parent/Guardian,</p>
-                            <p>This is to inform you that your ward has been marked <strong style="color: #dc2626;">ABSENT</strong> today.</p>
-                            <p><strong>Student Name:</strong> {student.first_name} {student.last_name}</p>
-                            <p><strong>Registration Number:</strong> {student.registration_number}</p>
-                            <p><strong>Program:</strong> {student.program}</p>
-                            <p><strong>Semester:</strong> {student.semester}</p>
-                            <br>
-                            <p>Please ensure your ward maintains regular attendance.</p>
-                            <p>For any queries, please contact the university.</p>
-                            <br>
-                            <p>Best regards,<br>Lovely Professional University<br>Smart Campus System</p>
-                        </body>
-                        </html>
-                        """
-                    )
-                    if parent_email_sent:
-                        notifications_sent['parent_emails'] += 1
-                
-                # Create in-app notification
-                notification = Notification(
-                    user_id=student.user_id,
-                    notification_type='attendance',
-                    title='Attendance Alert - Marked Absent',
-                    message=f'You were marked absent in today\'s class. If this is incorrect, please contact your faculty.'
+        absent_student_ids = [record.student_id for record in attendance_records if record.status == 'absent']
+        if not absent_student_ids:
+            return notifications_sent
+        students = (
+            db.query(Student)
+            .options(joinedload(Student.user))
+            .filter(Student.student_id.in_(absent_student_ids))
+            .all()
+        )
+        
+        contexts = [
+            {
+                'first_name': student.first_name,
+                'last_name': student.last_name,
+                'registration_number': student.registration_number,
+                'program': student.program,
+                'semester': student.semester,
+            }
+            for student in students
+        ]
+        channels = (
+            # (counter, audience, channel, recipient, body template, subject template)
+            ('student_sms', 'student', 'sms', lambda student: student.phone, templates.ATTENDANCE_STUDENT_SMS, None),
+            ('parent_sms', 'parent', 'sms', lambda student: student.parent_phone, templates.ATTENDANCE_PARENT_SMS, None),
+            ('student_emails', 'student', 'email', lambda student: student.user.email if student.user else None,
+             templates.ATTENDANCE_STUDENT_EMAIL, templates.ATTENDANCE_STUDENT_EMAIL_SUBJECT),
+            ('parent_emails', 'parent', 'email', lambda student: student.parent_email,
+             templates.ATTENDANCE_PARENT_EMAIL, templates.ATTENDANCE_PARENT_EMAIL_SUBJECT),
+        )
+        
+        outbox_rows = []
+        digest_targets = []
+        for counter, audience, channel, recipient_of, body_template, subject_template in channels:
+            targets = [(recipient_of(student), student, context) for student, context in zip(students, contexts)]
+            targets = [target for target in targets if target[0]]
+            notifications_sent[counter] = len(targets)
+            if settings.NOTIFICATION_DIGEST_ENABLED:
+                # Coalesced per recipient; notification_digest sends one summary when the window closes.
+                digest_targets.extend(
+                    (audience, channel, recipient, student.student_id, context)
+                    for recipient, student, context in targets
                 )
-                db.add(notification)
+                continue
+            target_contexts = [context for _recipient, _student, context in targets]
+            bodies = body_template.render_many(target_contexts)
+            subjects = subject_template.render_many(target_contexts) if subject_template else [None] * len(targets)
+            for (recipient, _student, _context), body, subject in zip(targets, bodies, subjects):
+                outbox_rows.append(NotificationService.outbox_row(
+                    channel, recipient, body, subject=subject,
+                    source='attendance', reference_id=session_id,
+                ))
+        
+        if digest_targets:
+            notification_digest.stage_absence_events(
+                db, session_id, digest_targets, notification_digest.session_label(db, session_id)
+            )
         
+        notifications_sent['absentees'] = [
+            {'name': f"{student.first_name} {student.last_name}", 'reg_no': student.registration_number}
+            for student in students
+        ]
+        notification_rows = [
+            {
+                'notification_id': uuid.uuid4(),
+                'user_id': student.user_id,
+                'notification_type': 'attendance',
+                'title': 'Attendance Alert - Marked Absent',
+                'message': 'You were marked absent in today\'s class. If this is incorrect, please contact your faculty.',
+                'is_read': False,
+                'created_at': datetime.utcnow(),
+            }
+            for student in students
+        ]
+        
+        # render_nulls keeps rows with and without a subject in one executemany batch.
+        if outbox_rows:
+            db.execute(insert(NotificationOutbox).execution_options(render_nulls=True), outbox_rows)
+        if notification_rows:
+            db.execute(insert(Notification).execution_options(render_nulls=True), notification_rows)
+            notification_inbox.increment_unread(db, [row['user_id'] for row in notification_rows])
+        return notifications_sent
+    
+    @staticmethod
+    def send_attendance_notifications(db: Session, session_id: str, attendance_records: List[AttendanceRecord]):
+        """Queue notifications to students and parents after attendance is marked"""
+        notifications_sent = NotificationService.queue_attendance_notifications(db, session_id, attendance_records)
         db.commit()
+        notify_outbox()
         return notifications_sent
     
     @staticmethod
     def send_email(to_email: str, subject: str, html_content: str) -> bool:
-        """Send email notification"""
+        """Send email notification over the pooled SMTP connections (printed when SMTP is not configured)"""
         try:
-            # For demo purposes, we'll just print the email
-            # In production, use actual SMTP settings
+            smtp_pool = get_smtp_pool()
+            if smtp_pool is not None:
+                sender = settings.SMTP_FROM or settings.SMTP_USER
+                error = smtp_pool.send(build_message(sender, to_email, subject, html_content))
+                if error:
+                    print(f"Email send error: {error}")
+                return error is None
+            
+            # For local development without SMTP settings, just print the email
             print(f"\n{'='*60}")
             print(f"📧 EMAIL SENT")
             print(f"{'='*60}")
@@ -127,21 +164,6 @@ class NotificationService:
             print(f"Subject: {subject}")
             print(f"Content: {html_content[:100]}...")
             print(f"{'='*60}\n")
-            
-            # Uncomment below for actual email sending
-            # msg = MIMEMultipart('alternative')
-            # msg['Subject'] = subject
-            # msg['From'] = settings.SMTP_USER
-            # msg['To'] = to_email
-            # 
-            # html_part = MIMEText(html_content, 'html')
-            # msg.attach(html_part)
-            # 
-            # with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            #     server.starttls()
-            #     server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            #     server.send_message(msg)
-            
             return True
         except Exception as e:
             print(f"Email send error: {e}")
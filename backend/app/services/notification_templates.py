@@ -0,0 +1,260 @@
+import html
+import operator
+import re
+import string
+import textwrap
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+_formatter = string.Formatter()
+_html_special = re.compile(r"[&<>\"']").search
+
+
+def _plain(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _escape_html(value) -> str:
+    if value is None:
+        return ""
+    value = str(value)
+    return html.escape(value) if _html_special(value) else value
+
+
+class NotificationTemplate:
+    """A ``{field}`` template compiled once into a Python render function.
+
+    Rendered bodies are cached by their field values, so recipients that produce the
+    same text share one string object (e.g. every student absence SMS, or parent emails
+    for students with the same details). HTML templates escape every value.
+    """
+
+    def __init__(self, name: str, source: str, is_html: bool = False, cache_size: int = 4096):
+        self.name = name
+        self.is_html = is_html
+        self.cache_size = cache_size
+        if is_html:
+            source = textwrap.dedent(source).strip()
+
+        fields: List[str] = []
+        parts: List[str] = []
+        literals: Dict[str, str] = {}
+        for literal, field_name, format_spec, conversion in _formatter.parse(source):
+            if literal:
+                literal_name = f"_l{len(literals)}"
+                literals[literal_name] = literal
+                parts.append(f"{{{literal_name}}}")
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                raise ValueError(f"Template '{name}': unsupported placeholder '{{{field_name}}}'")
+            if field_name not in fields:
+                fields.append(field_name)
+            parts.append(f"{{_value(values[{fields.index(field_name)}])}}")
+        self.fields: Tuple[str, ...] = tuple(fields)
+
+        # Compile to one f-string so rendering is a single BUILD_STRING instead of
+        # str.format re-parsing a kilobyte of HTML per recipient.
+        namespace = dict(literals, _value=_escape_html if is_html else _plain)
+        exec(f'def _build(values):\n    return f"""{"".join(parts)}"""\n', namespace)
+        self._build = namespace["_build"]
+
+        # Templates without placeholders render to one shared constant.
+        self._constant = self._build(()) if not fields else None
+        if len(fields) == 1:
+            field = fields[0]
+            self._getter = lambda context: (context[field],)
+        elif fields:
+            self._getter = operator.itemgetter(*fields)
+        # Keyed by the raw context values, so a hit skips str()/escaping entirely.
+        self._cache: Dict[tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, context: Mapping) -> str:
+        if self._constant is not None:
+            return self._constant
+        return self.render_many((context,))[0]
+
+    def render_many(self, contexts: Iterable[Mapping]) -> List[str]:
+        if self._constant is not None:
+            return [self._constant for _context in contexts]
+
+        cache = self._cache
+        getter = self._getter
+        build = self._build
+        cache_size = self.cache_size
+        rendered: List[str] = []
+        append = rendered.append
+        misses = 0
+        for context in contexts:
+            values = getter(context)
+            body = cache.get(values)
+            if body is None:
+                misses += 1
+                body = build(values)
+                if len(cache) >= cache_size:
+                    # Start a fresh generation rather than paying for per-entry LRU bookkeeping.
+                    cache = self._cache = {}
+                cache[values] = body
+            append(body)
+        self.misses += misses
+        self.hits += len(rendered) - misses
+        return rendered
+
+    def clear_cache(self) -> None:
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+
+ATTENDANCE_STUDENT_SMS = NotificationTemplate(
+    "attendance.student_sms",
+    "Attendance Alert: You were marked ABSENT today. Please contact your faculty if this is incorrect. - LPU Smart Campus",
+)
+
+ATTENDANCE_PARENT_SMS = NotificationTemplate(
+    "attendance.parent_sms",
+    "Dear Parent, Your ward {first_name} {last_name} (Reg: {registration_number}) was marked ABSENT today. - LPU",
+)
+
+ATTENDANCE_STUDENT_EMAIL_SUBJECT = NotificationTemplate(
+    "attendance.student_email_subject",
+    "Attendance Alert - Marked Absent",
+)
+
+ATTENDANCE_STUDENT_EMAIL = NotificationTemplate(
+    "attendance.student_email",
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2 style="color: #dc2626;">Attendance Alert</h2>
+        <p>Dear {first_name},</p>
+        <p>You were marked <strong style="color: #dc2626;">ABSENT</strong> in today's class.</p>
+        <p><strong>Registration Number:</strong> {registration_number}</p>
+        <p>If you believe this is an error, please contact your faculty immediately.</p>
+        <br>
+        <p>Best regards,<br>LPU Smart Campus System</p>
+    </body>
+    </html>
+    """,
+    is_html=True,
+)
+
+ATTENDANCE_PARENT_EMAIL_SUBJECT = NotificationTemplate(
+    "attendance.parent_email_subject",
+    "Student Attendance Alert - {first_name} {last_name}",
+)
+
+ATTENDANCE_PARENT_EMAIL = NotificationTemplate(
+    "attendance.parent_email",
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2 style="color: #dc2626;">Student Attendance Alert</h2>
+        <p>Dear Parent/Guardian,</p>
+        <p>This is to inform you that your ward has been marked <strong style="color: #dc2626;">ABSENT</strong> today.</p>
+        <p><strong>Student Name:</strong> {first_name} {last_name}</p>
+        <p><strong>Registration Number:</strong> {registration_number}</p>
+        <p><strong>Program:</strong> {program}</p>
+        <p><strong>Semester:</strong> {semester}</p>
+        <br>
+        <p>Please ensure your ward maintains regular attendance.</p>
+        <p>For any queries, please contact the university.</p>
+        <br>
+        <p>Best regards,<br>Lovely Professional University<br>Smart Campus System</p>
+    </body>
+    </html>
+    """,
+    is_html=True,
+)
+
+# Digests: one message per recipient for every absence in a coalescing window.
+DIGEST_STUDENT_SMS = NotificationTemplate(
+    "attendance_digest.student_sms",
+    "Attendance Alert: You were marked ABSENT in {count} classes ({classes}). Please contact your faculty if this is incorrect. - LPU Smart Campus",
+)
+
+DIGEST_PARENT_SMS = NotificationTemplate(
+    "attendance_digest.parent_sms",
+    "Dear Parent, Your ward {first_name} {last_name} (Reg: {registration_number}) was marked ABSENT in {count} classes ({classes}). - LPU",
+)
+
+DIGEST_STUDENT_EMAIL_SUBJECT = NotificationTemplate(
+    "attendance_digest.student_email_subject",
+    "Attendance Alert - Absent in {count} classes",
+)
+
+DIGEST_STUDENT_EMAIL = NotificationTemplate(
+    "attendance_digest.student_email",
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2 style="color: #dc2626;">Attendance Alert</h2>
+        <p>Dear {first_name},</p>
+        <p>You were marked <strong style="color: #dc2626;">ABSENT</strong> in {count} classes: {classes}.</p>
+        <p><strong>Registration Number:</strong> {registration_number}</p>
+        <p>If you believe this is an error, please contact your faculty immediately.</p>
+        <br>
+        <p>Best regards,<br>LPU Smart Campus System</p>
+    </body>
+    </html>
+    """,
+    is_html=True,
+)
+
+DIGEST_PARENT_EMAIL_SUBJECT = NotificationTemplate(
+    "attendance_digest.parent_email_subject",
+    "Student Attendance Alert - {first_name} {last_name} absent in {count} classes",
+)
+
+DIGEST_PARENT_EMAIL = NotificationTemplate(
+    "attendance_digest.parent_email",
+    """
+    <html>
+    <body style="font-family: Arial, sans-serif;">
+        <h2 style="color: #dc2626;">Student Attendance Alert</h2>
+        <p>Dear Parent/Guardian,</p>
+        <p>This is to inform you that your ward has been marked <strong style="color: #dc2626;">ABSENT</strong> in {count} classes: {classes}.</p>
+        <p><strong>Student Name:</strong> {first_name} {last_name}</p>
+        <p><strong>Registration Number:</strong> {registration_number}</p>
+        <p><strong>Program:</strong> {program}</p>
+        <p><strong>Semester:</strong> {semester}</p>
+        <br>
+        <p>Please ensure your ward maintains regular attendance.</p>
+        <p>For any queries, please contact the university.</p>
+        <br>
+        <p>Best regards,<br>Lovely Professional University<br>Smart Campus System</p>
+    </body>
+    </html>
+    """,
+    is_html=True,
+)
+
+TEMPLATES: Dict[str, NotificationTemplate] = {
+    template.name: template
+    for template in (
+        ATTENDANCE_STUDENT_SMS,
+        ATTENDANCE_PARENT_SMS,
+        ATTENDANCE_STUDENT_EMAIL_SUBJECT,
+        ATTENDANCE_STUDENT_EMAIL,
+        ATTENDANCE_PARENT_EMAIL_SUBJECT,
+        ATTENDANCE_PARENT_EMAIL,
+        DIGEST_STUDENT_SMS,
+        DIGEST_PARENT_SMS,
+        DIGEST_STUDENT_EMAIL_SUBJECT,
+        DIGEST_STUDENT_EMAIL,
+        DIGEST_PARENT_EMAIL_SUBJECT,
+        DIGEST_PARENT_EMAIL,
+    )
+}
+
+
+def get_template(name: str) -> NotificationTemplate:
+    try:
+        return TEMPLATES[name]
+    except KeyError:
+        raise LookupError(f"Unknown notification template '{name}'") from None
+
+
+def render(name: str, context: Mapping) -> str:
+    return get_template(name).render(context)
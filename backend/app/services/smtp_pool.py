@@ -0,0 +1,232 @@
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Iterable, List, Optional, Sequence
+
+from app.config import settings
+
+# A dropped or stalled connection: discard it and retry the send once on a fresh one. Every other
+# SMTPException (itself an OSError) is a protocol or server answer a reconnect will not change.
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPUnavailableError(Exception):
+    """A new connection could not be opened, upgraded to TLS or logged in; ``__cause__`` holds why."""
+
+
+def build_message(sender: str, to_email: str, subject: Optional[str], html_content: str) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject or ""
+    message["From"] = sender
+    message["To"] = to_email
+    message.attach(MIMEText(html_content, "html"))
+    return message
+
+
+class _PooledConnection:
+    def __init__(self, client: smtplib.SMTP):
+        self.client = client
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Persistent, authenticated SMTP connections shared by sender threads.
+
+    Each connection does the TCP/TLS handshake and login once and then carries many
+    messages. A connection is used by one thread at a time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        size: int = 4,
+        timeout: float = 10.0,
+        max_messages_per_connection: int = 500,
+        idle_check_seconds: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_check_seconds = idle_check_seconds
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self) -> _PooledConnection:
+        client = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            client.ehlo()
+            if self.use_tls:
+                client.starttls()
+                client.ehlo()
+            if self.username:
+                client.login(self.username, self.password or "")
+        except Exception:
+            _close_quietly(client)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return _PooledConnection(client)
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if connection.messages_sent >= self.max_messages_per_connection:
+                _close_quietly(connection.client)
+                continue
+            # Servers drop idle sessions; probe before reusing one that sat for a while.
+            if time.monotonic() - connection.last_used > self.idle_check_seconds:
+                try:
+                    if connection.client.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except (smtplib.SMTPException, OSError):
+                    _close_quietly(connection.client)
+                    continue
+            return connection
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        connection = None
+        try:
+            try:
+                connection = self._checkout()
+            except (smtplib.SMTPException, OSError) as exc:
+                raise SMTPUnavailableError(str(exc)) from exc
+            yield connection
+        except Exception:
+            # Whatever broke mid-conversation, the session state is unknown: never hand it out again.
+            if connection is not None:
+                _close_quietly(connection.client)
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                connection.last_used = time.monotonic()
+                self._idle.put(connection)
+            self._slots.release()
+
+    def send(self, message) -> Optional[str]:
+        return self.send_batch([message])[0]
+
+    def send_batch(self, messages: Sequence) -> List[Optional[str]]:
+        """Send ``messages`` back to back over pooled connections; returns an error (or None) per message.
+
+        A dropped connection is retried once on a fresh one. If no connection can be opened or logged in,
+        the fresh one drops as well, or the server gives a permanent error, every remaining message fails
+        at once and goes back to the outbox's retry/backoff instead of paying its own connect attempts.
+        """
+        results: List[Optional[str]] = [None] * len(messages)
+        index = 0
+        retrying = False
+        while index < len(messages):
+            try:
+                with self.connection() as connection:
+                    while index < len(messages) and connection.messages_sent < self.max_messages_per_connection:
+                        try:
+                            connection.client.send_message(messages[index])
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                            # Rejected by the server (smtplib already RSET the transaction); the connection stays usable.
+                            results[index] = f"{type(exc).__name__}: {exc}"
+                        connection.messages_sent += 1
+                        index += 1
+                        retrying = False
+                continue
+            except SMTPUnavailableError as exc:
+                error = exc.__cause__ or exc
+            except RECONNECT_ERRORS as exc:
+                if not retrying:
+                    retrying = True
+                    continue
+                error = exc
+            except (smtplib.SMTPException, OSError) as exc:
+                error = exc
+            for remaining in range(index, len(messages)):
+                results[remaining] = f"{type(error).__name__}: {error}"
+            break
+        return results
+
+    def close(self) -> None:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                connection.client.quit()
+            except Exception:
+                _close_quietly(connection.client)
+
+
+def _close_quietly(client: smtplib.SMTP) -> None:
+    try:
+        client.close()
+    except Exception:
+        pass
+
+
+class EmailOutboxSender:
+    """Outbox sender for the 'email' channel backed by an ``SMTPConnectionPool``."""
+
+    def __init__(self, pool: SMTPConnectionPool, sender: str):
+        self.pool = pool
+        self.sender = sender
+
+    def _build(self, message) -> MIMEMultipart:
+        return build_message(self.sender, message.recipient, message.subject, message.body)
+
+    def __call__(self, message) -> bool:
+        return self.send_batch([message])[0] is None
+
+    def send_batch(self, messages: Iterable) -> List[Optional[str]]:
+        return self.pool.send_batch([self._build(message) for message in messages])
+
+
+_pool: Optional[SMTPConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> Optional[SMTPConnectionPool]:
+    """Process-wide pool built from settings, or None when SMTP is not configured."""
+    global _pool
+    if not settings.SMTP_HOST:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPConnectionPool(
+                host=settings.SMTP_HOST,
+                port=settings.SMTP_PORT or 587,
+                username=settings.SMTP_USER,
+                password=settings.SMTP_PASSWORD,
+                use_tls=settings.SMTP_USE_TLS,
+                size=settings.SMTP_POOL_SIZE,
+                timeout=settings.SMTP_TIMEOUT_SECONDS,
+                max_messages_per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            )
+        return _pool
+
+
+def close_smtp_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
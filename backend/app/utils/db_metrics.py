@@ -0,0 +1,179 @@
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Paths that must keep answering while the pool is saturated.
+SHED_EXEMPT_PATHS = {"/", "/health", "/health/db", "/metrics"}
+
+
+class Histogram:
+    """Cumulative-bucket histogram matching the Prometheus exposition model."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for index, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self._counts[index] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "buckets": {str(upper): count for upper, count in zip(self.buckets, self._counts)},
+                "count": self._count,
+                "sum": round(self._sum, 6),
+            }
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.wait_seconds = Histogram(POOL_WAIT_BUCKETS)
+        self.pre_ping_failures = 0
+        self.checkout_timeouts = 0
+        self.shed_requests = 0
+        self._waiters = 0
+        self._lock = threading.Lock()
+
+    @property
+    def waiters(self) -> int:
+        return self._waiters
+
+    def checkout_started(self) -> None:
+        with self._lock:
+            self._waiters += 1
+
+    def checkout_finished(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._waiters -= 1
+            if timed_out:
+                self.checkout_timeouts += 1
+        self.wait_seconds.observe(elapsed)
+
+    def record_pre_ping_failure(self) -> None:
+        with self._lock:
+            self.pre_ping_failures += 1
+
+    def record_shed(self) -> None:
+        with self._lock:
+            self.shed_requests += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time and how many callers are waiting."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        metrics = self.metrics
+        metrics.checkout_started()
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics.checkout_finished(time.perf_counter() - started, timed_out=timed_out)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # Engine.dispose() swaps in a fresh pool; keep counters continuous across it.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def attach_pool_listeners(pool: Pool) -> None:
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(_dbapi_connection, _connection_record, exception):
+        # A failed pre-ping surfaces as a DisconnectionError raised during checkout.
+        if isinstance(exception, exc.DisconnectionError):
+            metrics = getattr(pool, "metrics", None)
+            if metrics is not None:
+                metrics.record_pre_ping_failure()
+
+
+def _max_connections(pool: Pool) -> Optional[int]:
+    if not isinstance(pool, QueuePool):
+        return None
+    max_overflow = pool._max_overflow
+    if max_overflow < 0:
+        return None
+    return pool.size() + max_overflow
+
+
+def pool_snapshot(pool: Pool) -> Dict:
+    snapshot = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        snapshot.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "max_connections": _max_connections(pool),
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        snapshot.update(
+            {
+                "waiting": metrics.waiters,
+                "wait_seconds": metrics.wait_seconds.snapshot(),
+                "pre_ping_failures": metrics.pre_ping_failures,
+                "checkout_timeouts": metrics.checkout_timeouts,
+                "shed_requests": metrics.shed_requests,
+            }
+        )
+    return snapshot
+
+
+def is_pool_saturated(pool: Pool, max_waiters: int) -> bool:
+    metrics = getattr(pool, "metrics", None)
+    max_connections = _max_connections(pool)
+    if metrics is None or max_connections is None:
+        return False
+    return pool.checkedout() >= max_connections and metrics.waiters >= max_waiters
+
+
+def saturated_response(retry_after_seconds: int = 1) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is at capacity, please retry shortly"},
+        headers={"Retry-After": str(retry_after_seconds)},
+    )
+
+
+def build_pool_saturation_guard(pool_getter, max_waiters: int):
+    """Middleware that sheds requests while every connection is busy and the wait queue is full."""
+
+    async def pool_saturation_guard(request: Request, call_next):
+        if request.url.path not in SHED_EXEMPT_PATHS:
+            pool = pool_getter()
+            if is_pool_saturated(pool, max_waiters):
+                metrics = getattr(pool, "metrics", None)
+                if metrics is not None:
+                    metrics.record_shed()
+                return saturated_response()
+        return await call_next(request)
+
+    return pool_saturation_guard
@@ -0,0 +1,205 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.utils.db_metrics import Histogram, pool_snapshot
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+# Requests that matched no route share one label so 404 scans cannot blow up cardinality.
+UNMATCHED_ROUTE = "<unmatched>"
+UNINSTRUMENTED_PATHS = {"/metrics"}
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    statements: List[str] = field(default_factory=list)
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, _cursor, _statement, _parameters, _context, _executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, _statement, _parameters, context, _executemany):
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        stats.db_seconds += time.perf_counter() - started.pop()
+    stats.queries += 1
+    # psycopg2 reports fetched rows for SELECTs; SQLite reports -1.
+    is_dml = context is not None and (context.isinsert or context.isupdate or context.isdelete)
+    if not is_dml and cursor.rowcount and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.query_counts = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, status_code: int, elapsed: float, stats: QueryStats) -> None:
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+            metrics.queries += stats.queries
+            metrics.db_seconds += stats.db_seconds
+            metrics.rows += stats.rows
+        metrics.latency.observe(elapsed)
+        metrics.query_counts.observe(stats.queries)
+
+    def routes(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        with self._lock:
+            return dict(self._routes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render_prometheus(self, pools: Optional[Dict[str, Pool]] = None) -> str:
+        lines: List[str] = []
+        routes = sorted(self.routes().items())
+
+        lines += ["# HELP http_requests_total Requests served, by route template and status.", "# TYPE http_requests_total counter"]
+        for (method, route), metrics in routes:
+            for status_code, count in sorted(metrics.statuses.items()):
+                lines.append(f'http_requests_total{{{_labels(method, route)},status="{status_code}"}} {count}')
+
+        lines += ["# HELP http_request_duration_seconds Request latency by route template.", "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines("http_request_duration_seconds", _labels(method, route), metrics.latency)
+
+        lines += ["# HELP http_request_db_queries DB queries issued per request.", "# TYPE http_request_db_queries histogram"]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines("http_request_db_queries", _labels(method, route), metrics.query_counts)
+
+        for name, attribute, help_text in (
+            ("http_request_db_queries_total", "queries", "DB queries issued."),
+            ("http_request_db_seconds_total", "db_seconds", "Time spent executing DB queries."),
+            ("http_request_db_rows_total", "rows", "Rows fetched from the DB (where the driver reports it)."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, route), metrics in routes:
+                lines.append(f"{name}{{{_labels(method, route)}}} {_number(getattr(metrics, attribute))}")
+
+        for pool_name, pool in (pools or {}).items():
+            lines += _pool_lines(pool_name, pool)
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _number(value) -> str:
+    return f"{value:.6f}" if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    snapshot = histogram.snapshot()
+    lines = [f'{name}_bucket{{{labels},le="{upper}"}} {count}' for upper, count in snapshot["buckets"].items()]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {snapshot["count"]}')
+    lines.append(f"{name}_sum{{{labels}}} {_number(float(snapshot['sum']))}")
+    lines.append(f"{name}_count{{{labels}}} {snapshot['count']}")
+    return lines
+
+
+def _pool_lines(pool_name: str, pool: Pool) -> List[str]:
+    snapshot = pool_snapshot(pool)
+    labels = f'pool="{_escape(pool_name)}"'
+    lines = []
+    for key in ("checked_out", "checked_in", "overflow", "waiting"):
+        if key in snapshot:
+            lines.append(f"db_pool_{key}{{{labels}}} {snapshot[key]}")
+    for key in ("pre_ping_failures", "checkout_timeouts", "shed_requests"):
+        if key in snapshot:
+            lines.append(f"db_pool_{key}_total{{{labels}}} {snapshot[key]}")
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        lines += _histogram_lines("db_pool_wait_seconds", labels, metrics.wait_seconds)
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+def build_instrumentation_middleware(metrics_registry: MetricsRegistry, server_timing: bool = False):
+    """Middleware recording latency and DB usage per route template."""
+
+    async def request_instrumentation(request: Request, call_next):
+        if request.url.path in UNINSTRUMENTED_PATHS:
+            return await call_next(request)
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _request_stats.reset(token)
+        elapsed = time.perf_counter() - started
+
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        metrics_registry.observe(request.method, route_path, response.status_code, elapsed, stats)
+
+        if server_timing:
+            response.headers["Server-Timing"] = (
+                f"app;dur={elapsed * 1000:.1f}, "
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+            )
+        return response
+
+    return request_instrumentation
+
+
+@contextmanager
+def count_queries(target=Engine):
+    """Count every statement executed on ``target`` (all engines by default) inside the block."""
+    stats = QueryStats()
+
+    def _count(_conn, _cursor, statement, _parameters, _context, _executemany):
+        stats.queries += 1
+        stats.statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", _count)
+    try:
+        yield stats
+    finally:
+        event.remove(target, "before_cursor_execute", _count)
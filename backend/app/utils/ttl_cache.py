@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process cache for ``(group, ...)`` tuple keys; entries expire after ``ttl_seconds``.
+
+    ``invalidate(group)`` drops the group's entries and bumps its generation, so a value computed
+    from rows read before the invalidation is not stored after it. ``ttl_seconds <= 0`` disables caching.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        if self.ttl_seconds <= 0:
+            return compute()
+        group = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                return entry[1]
+            generation = self._generations.get(group, 0)
+
+        value = compute()
+
+        with self._lock:
+            if self._generations.get(group, 0) == generation:
+                now = self._clock()
+                if len(self._entries) >= self.max_entries:
+                    self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                    if len(self._entries) >= self.max_entries:
+                        self._entries.clear()
+                self._entries[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, group: Hashable) -> None:
+        with self._lock:
+            self._generations[group] = self._generations.get(group, 0) + 1
+            for key in [key for key in self._entries if key[0] == group]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
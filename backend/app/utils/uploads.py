@@ -0,0 +1,169 @@
+"""Bounded ingestion for large uploads: size caps, disk spooling and per-user concurrency slots."""
+import io
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class UploadSlotsExhaustedError(RuntimeError):
+    pass
+
+
+class UploadSlots:
+    """Caps in-flight uploads per user and per process; a slot is held for the duration of ``acquire``."""
+
+    def __init__(self, per_key: int, total: int):
+        self.per_key = per_key
+        self.total = total
+        self._counts: Dict[Hashable, int] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, key: Hashable):
+        with self._lock:
+            if self._in_flight >= self.total:
+                raise UploadSlotsExhaustedError("Too many uploads in progress; retry shortly")
+            if self._counts.get(key, 0) >= self.per_key:
+                raise UploadSlotsExhaustedError(
+                    f"At most {self.per_key} uploads per user can be in progress; wait for one to finish"
+                )
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                remaining = self._counts[key] - 1
+                if remaining:
+                    self._counts[key] = remaining
+                else:
+                    del self._counts[key]
+
+    def in_flight(self, key: Optional[Hashable] = None) -> int:
+        with self._lock:
+            return self._in_flight if key is None else self._counts.get(key, 0)
+
+
+class SpooledUpload:
+    """An upload body written to an anonymous temporary file as it arrives.
+
+    Memory use stays at one chunk whatever the body size; writing past ``max_bytes`` raises
+    UploadTooLargeError. ``reader()`` returns file objects that another thread can consume while
+    the body is still arriving: reads past the bytes written so far wait for more (or for ``finish``).
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.complete = False
+        self._closed = False
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._changed = threading.Condition()
+
+    def write(self, chunk: bytes) -> None:
+        with self._changed:
+            if self.size + len(chunk) > self.max_bytes:
+                raise UploadTooLargeError(f"Upload exceeds the {self.max_bytes} byte limit")
+            self._file.seek(self.size)
+            self._file.write(chunk)
+            self.size += len(chunk)
+            self._changed.notify_all()
+
+    def finish(self) -> None:
+        """No more bytes are coming; waiting readers see end of file."""
+        with self._changed:
+            self.complete = True
+            self._changed.notify_all()
+
+    def read_at(self, offset: int, size: int = -1) -> bytes:
+        """Up to ``size`` bytes (all, if negative) from ``offset``, waiting until they arrive or the body ends."""
+        with self._changed:
+            while not (self._closed or self.complete) and (size < 0 or offset + size > self.size):
+                self._changed.wait()
+            if self._closed:
+                return b""
+            end = self.size if size < 0 else min(self.size, offset + size)
+            if offset >= end:
+                return b""
+            self._file.seek(offset)
+            return self._file.read(end - offset)
+
+    def wait_for_size(self) -> int:
+        with self._changed:
+            while not (self._closed or self.complete):
+                self._changed.wait()
+            return self.size
+
+    def reader(self) -> "SpoolReader":
+        return SpoolReader(self)
+
+    def close(self) -> None:
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+            self._file.close()
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+
+class SpoolReader(io.RawIOBase):
+    """Seekable, blocking file view of a SpooledUpload, for decoders running on another thread."""
+
+    def __init__(self, spool: SpooledUpload):
+        super().__init__()
+        self._spool = spool
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._spool.read_at(self._position, -1 if size is None else size)
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._spool.wait_for_size()
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+async def spool_stream(
+    chunks: AsyncIterator[bytes],
+    spool: SpooledUpload,
+    on_chunk: Optional[Callable[[bytes], None]] = None,
+) -> SpooledUpload:
+    """Write ``chunks`` into ``spool`` as they arrive, calling ``on_chunk`` after each, then mark it complete."""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        spool.write(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk)
+    spool.finish()
+    return spool
@@ -0,0 +1,72 @@
+"""Celery worker for the notification outbox and periodic maintenance jobs.
+
+Run with ``celery -A app.workers.celery_app worker --beat`` and ``NOTIFICATION_BROKER=celery``.
+"""
+from celery import Celery
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import attendance_cube, attendance_partitions, attendance_stats
+from app.services.notification_dispatcher import DRAIN_TASK_NAME, get_dispatcher
+
+REBUILD_STATS_TASK_NAME = "attendance.rebuild_stats"
+MAINTAIN_PARTITIONS_TASK_NAME = "attendance.maintain_partitions"
+REFRESH_CUBE_TASK_NAME = "attendance.refresh_cube"
+
+celery_app = Celery("smart_campus", broker=settings.REDIS_URL, backend=None)
+celery_app.conf.task_ignore_result = True
+celery_app.conf.beat_schedule = {
+    # Picks up retries whose backoff has elapsed, lost wakeups and closed digest windows.
+    "drain-notification-outbox": {
+        "task": DRAIN_TASK_NAME,
+        "schedule": settings.NOTIFICATION_POLL_SECONDS,
+    },
+    # Incremental updates keep the rollup current; this corrects any drift from manual edits.
+    "rebuild-attendance-stats": {
+        "task": REBUILD_STATS_TASK_NAME,
+        "schedule": settings.ATTENDANCE_STATS_REBUILD_SECONDS,
+    },
+    # Keeps next months' attendance partitions in place and archives old ones when configured.
+    "maintain-attendance-partitions": {
+        "task": MAINTAIN_PARTITIONS_TASK_NAME,
+        "schedule": settings.ATTENDANCE_PARTITION_MAINTENANCE_SECONDS,
+    },
+    # Folds newly closed sessions into the campus analytics cube; responses report its age.
+    "refresh-attendance-cube": {
+        "task": REFRESH_CUBE_TASK_NAME,
+        "schedule": settings.ATTENDANCE_CUBE_REFRESH_SECONDS,
+    },
+    # Picks up course/department changes and anything the incremental runs missed.
+    "rebuild-attendance-cube": {
+        "task": REFRESH_CUBE_TASK_NAME,
+        "schedule": settings.ATTENDANCE_CUBE_FULL_REFRESH_SECONDS,
+        "kwargs": {"full": True},
+    },
+}
+
+
+@celery_app.task(name=DRAIN_TASK_NAME)
+def drain_notification_outbox():
+    dispatcher = get_dispatcher()
+    dispatcher.run_periodic_jobs()
+    return dispatcher.drain()
+
+
+@celery_app.task(name=REBUILD_STATS_TASK_NAME)
+def rebuild_attendance_stats():
+    return attendance_stats.run_rebuild(SessionLocal)
+
+
+@celery_app.task(name=MAINTAIN_PARTITIONS_TASK_NAME)
+def maintain_attendance_partitions():
+    return attendance_partitions.run_maintenance(
+        SessionLocal,
+        months_ahead=settings.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+        archive_after_months=settings.ATTENDANCE_ARCHIVE_AFTER_MONTHS,
+        archive_dir=settings.ATTENDANCE_ARCHIVE_DIR,
+    )
+
+
+@celery_app.task(name=REFRESH_CUBE_TASK_NAME)
+def refresh_attendance_cube(full=False):
+    return attendance_cube.run_refresh(SessionLocal, full=full)
@@ -0,0 +1,148 @@
+"""Campus attendance analytics: looping faculty insights vs the precomputed cube.
+
+Seeds --departments x --courses x --sections-per-course sections with --weeks of closed sessions, then times:
+  * "per-faculty loop": what a campus view costs without the cube, one insights call per faculty member;
+  * the cube's full build, an incremental refresh after one more day of sessions closes, and a no-op refresh;
+  * admin slices over the cube (campus by department, department by week, course by section).
+
+Run from backend/ (defaults to a temporary SQLite file):
+
+    python benchmarks/bench_attendance_cube.py --departments 8 --courses 10 --weeks 16
+    python benchmarks/bench_attendance_cube.py --database-url postgresql+psycopg2://.../bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.database import Base, build_engine  # noqa: E402
+from app.models import Course, CourseSection, Faculty, User  # noqa: E402
+from app.models.attendance import AttendanceSession  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services import ai_service, attendance_cube  # noqa: E402
+from app.services.insights_cache import faculty_insights  # noqa: E402
+from app.utils.instrumentation import count_queries  # noqa: E402
+
+CLASS_SIZE = 60
+SESSION_TYPES = ("regular", "regular", "regular", "ai_face", "lab")
+
+
+def _sessions(section_ids, days, rng):
+    rows = []
+    for day in days:
+        closed_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=17)
+        for section_id in section_ids:
+            present = rng.randint(CLASS_SIZE // 2, CLASS_SIZE)
+            rows.append({
+                "session_id": uuid.uuid4(), "section_id": section_id, "session_date": day,
+                "start_time": closed_at - timedelta(hours=8), "end_time": closed_at, "closed_at": closed_at,
+                "session_type": rng.choice(SESSION_TYPES), "is_closed": True, "total_students": CLASS_SIZE,
+                "present_count": present, "absent_count": CLASS_SIZE - present,
+            })
+    return rows
+
+
+def seed(factory, args):
+    rng = random.Random(11)
+    first_day = date.today() - timedelta(weeks=args.weeks)
+    days = [first_day + timedelta(days=offset) for offset in range(args.weeks * 7) if (first_day + timedelta(days=offset)).weekday() < 5]
+    with factory() as db:
+        faculty_ids, section_ids = [], []
+        for department in range(args.departments):
+            for course_number in range(args.courses):
+                user = User(email=f"{uuid.uuid4().hex}@example.com", role=UserRole.FACULTY)
+                db.add(user)
+                db.flush()
+                faculty = Faculty(user_id=user.user_id, employee_id=user.user_id.hex[:12], first_name="F", last_name=str(course_number))
+                course = Course(
+                    course_code=f"D{department}-{course_number}-{user.user_id.hex[:4]}",
+                    course_name="Course", credits=3, department=f"DEPT-{department}",
+                )
+                db.add_all([faculty, course])
+                db.flush()
+                faculty_ids.append(faculty.faculty_id)
+                for number in range(args.sections_per_course):
+                    section = CourseSection(course_id=course.course_id, faculty_id=faculty.faculty_id, section_name=f"S{number}")
+                    db.add(section)
+                    db.flush()
+                    section_ids.append(section.section_id)
+        rows = _sessions(section_ids, days, rng)
+        for low in range(0, len(rows), 20_000):
+            db.execute(insert(AttendanceSession), rows[low:low + 20_000])
+        db.commit()
+    print(f"seeded {len(section_ids)} sections, {len(faculty_ids)} faculty, {len(rows):,} closed sessions over {args.weeks} weeks")
+    return faculty_ids, section_ids
+
+
+def _timed(factory, work):
+    with factory() as db, count_queries() as stats:
+        started = time.perf_counter()
+        result = work(db)
+        db.commit()
+        elapsed = time.perf_counter() - started
+    return elapsed, stats.queries, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (tables are created in it)")
+    parser.add_argument("--departments", type=int, default=8)
+    parser.add_argument("--courses", type=int, default=10, help="courses (one faculty member each) per department")
+    parser.add_argument("--sections-per-course", type=int, default=4)
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=20, help="timed runs per slice")
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = build_engine(url)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    faculty_ids, section_ids = seed(factory, args)
+
+    faculty_insights.clear()
+    elapsed, queries, _ = _timed(
+        factory, lambda db: [ai_service.get_faculty_attendance_ai_insights(db, faculty_id) for faculty_id in faculty_ids]
+    )
+    print(f"\nper-faculty loop        {elapsed * 1000:10.1f} ms  {queries:>5} queries")
+
+    print("\nrefresh")
+    elapsed, queries, run = _timed(factory, lambda db: attendance_cube.refresh(db, full=True))
+    print(f"  full build            {elapsed * 1000:10.1f} ms  {queries:>5} queries  {run.sessions_folded:>8,} sessions")
+    with factory() as db:
+        db.execute(insert(AttendanceSession), _sessions(section_ids, [date.today()], random.Random(3)))
+        db.commit()
+    for label in ("one more day", "nothing new"):
+        elapsed, queries, run = _timed(factory, attendance_cube.refresh)
+        print(f"  {label:<20}  {elapsed * 1000:10.1f} ms  {queries:>5} queries  {run.sessions_folded:>8,} sessions")
+
+    slices = {
+        "campus by department": {"group_by": ["department"]},
+        "department by week": {"group_by": ["week_start"], "department": "DEPT-0"},
+        "department x type": {"group_by": ["department", "session_type"]},
+        "week x section": {"group_by": ["week_start", "section_id"], "week_from": date.today() - timedelta(weeks=4)},
+    }
+    print(f"\nslices (median of {args.repeats})")
+    for label, params in slices.items():
+        timings = []
+        for _ in range(args.repeats):
+            elapsed, queries, result = _timed(factory, lambda db: attendance_cube.query_cube(db, **params))
+            timings.append(elapsed)
+        print(f"  {label:<20}  {statistics.median(timings) * 1000:10.2f} ms  {queries:>5} queries  {len(result['rows']):>6} rows")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Student history queries: one flat attendance_records table vs monthly partitions.
+
+Seeds --rows attendance records (default 50M: 40k students x 6 classes a day) into the partitioned
+attendance_records table, copies them into a flat table with the pre-partitioning indexes, and times the
+history/summary queries each one is served by. "flat" runs the old marked_at-windowed query;
+"partitioned" runs the current session_date-windowed one, which lets Postgres prune months.
+
+Needs a scratch Postgres database (tables are created in it; seeding 50M rows takes a while and ~10 GB):
+
+    python benchmarks/bench_attendance_partitions.py --database-url postgresql+psycopg2://.../bench
+    python benchmarks/bench_attendance_partitions.py --database-url ... --skip-seed --samples 200
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import MetaData, func, select, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.database import Base, build_engine  # noqa: E402
+from app.models.attendance import AttendanceRecord  # noqa: E402
+from app.services import attendance_partitions  # noqa: E402
+
+FLAT = "bench_attendance_flat"
+ROWS_PER_BATCH = 2_000_000
+
+
+def _student_id(number):
+    return uuid.UUID(hashlib.md5(f"st{number}".encode()).hexdigest())
+
+
+def _layout(args):
+    sections = max(1, args.students * 6 // args.class_size)
+    sessions = args.rows // args.class_size
+    days = -(-sessions // sections)
+    return sections, sessions, days
+
+
+def seed(engine, factory, args):
+    sections, sessions, days = _layout(args)
+    start = date.today() - timedelta(days=days - 1)
+    params = {"start": start, "sections": sections, "class_size": args.class_size, "students": args.students}
+    print(f"seeding {sessions * args.class_size:,} records: {sessions:,} sessions over {days} days from {start}")
+
+    with factory() as db:
+        months_back = (date.today().year - start.year) * 12 + date.today().month - start.month
+        attendance_partitions.ensure_partitions(db, months_ahead=1, months_back=months_back)
+        db.commit()
+
+    batch = max(1, ROWS_PER_BATCH // args.class_size)
+    started = time.perf_counter()
+    for low in range(0, sessions, batch):
+        bounds = {**params, "low": low, "high": min(low + batch, sessions)}
+        with factory() as db:
+            db.execute(
+                text(
+                    "INSERT INTO attendance_sessions (session_id, section_id, session_date, start_time, "
+                    "session_type, is_closed, total_students, present_count, absent_count, created_at) "
+                    "SELECT md5('s' || g)::uuid, md5('sec' || (g % :sections))::uuid, "
+                    "CAST(:start AS date) + g / :sections, (CAST(:start AS date) + g / :sections) + time '09:00', "
+                    "'regular', true, :class_size, 0, 0, now() "
+                    "FROM generate_series(:low, :high - 1) g"
+                ),
+                bounds,
+            )
+            db.execute(
+                text(
+                    "INSERT INTO attendance_records (record_id, session_id, student_id, session_date, status, "
+                    "marked_at, marked_by) "
+                    "SELECT md5('r' || g || '-' || k)::uuid, md5('s' || g)::uuid, "
+                    "md5('st' || (((g % :sections) * :class_size + k) % :students))::uuid, "
+                    "CAST(:start AS date) + g / :sections, "
+                    "CASE WHEN (g + k) % 9 = 0 THEN 'absent' ELSE 'present' END, "
+                    "(CAST(:start AS date) + g / :sections) + time '09:05' + (g % 8) * interval '1 hour', 'bench' "
+                    "FROM generate_series(:low, :high - 1) g CROSS JOIN generate_series(0, :class_size - 1) k"
+                ),
+                bounds,
+            )
+            db.commit()
+        done = bounds["high"] * args.class_size
+        print(f"  {done:>12,} rows  {done / (time.perf_counter() - started):10,.0f} rows/s", flush=True)
+
+    print("copying into the flat table")
+    with factory() as db:
+        db.execute(text(f"DROP TABLE IF EXISTS {FLAT}"))
+        db.execute(text(f"CREATE TABLE {FLAT} (LIKE attendance_records INCLUDING DEFAULTS)"))
+        db.execute(text(f"INSERT INTO {FLAT} SELECT * FROM attendance_records"))
+        db.execute(text(f"ALTER TABLE {FLAT} ADD PRIMARY KEY (record_id)"))
+        db.execute(text(f"ALTER TABLE {FLAT} ADD UNIQUE (session_id, student_id)"))
+        db.execute(text(f"CREATE INDEX ix_{FLAT}_student_marked_at ON {FLAT} (student_id, marked_at)"))
+        db.commit()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql(f"VACUUM ANALYZE {FLAT}")
+        connection.exec_driver_sql("VACUUM ANALYZE attendance_records")
+
+
+def _window(table, flat, first_day, last_day):
+    """The old query filtered marked_at; the partitioned one filters the class date."""
+    if flat:
+        return (
+            table.c.marked_at >= datetime.combine(first_day, datetime.min.time()),
+            table.c.marked_at < datetime.combine(last_day + timedelta(days=1), datetime.min.time()),
+        )
+    return table.c.session_date >= first_day, table.c.session_date <= last_day
+
+
+def _history(table, flat, student_id, days=None):
+    query = select(table).where(table.c.student_id == student_id)
+    if days:
+        query = query.where(*_window(table, flat, date.today() - timedelta(days=days - 1), date.today()))
+    return query.order_by(table.c.marked_at.desc(), table.c.record_id.desc()).limit(50)
+
+
+def _summary(table, flat, student_id, days):
+    window = _window(table, flat, date.today() - timedelta(days=days - 1), date.today())
+    return (
+        select(table.c.status, func.count())
+        .where(table.c.student_id == student_id, *window)
+        .group_by(table.c.status)
+    )
+
+
+SCENARIOS = {
+    "history, last 30 days": lambda table, flat, student_id: _history(table, flat, student_id, days=30),
+    "history, newest page": lambda table, flat, student_id: _history(table, flat, student_id),
+    "summary, one semester": lambda table, flat, student_id: _summary(table, flat, student_id, days=120),
+}
+
+
+def _relations(plan):
+    found = set()
+    if isinstance(plan, dict):
+        if "Relation Name" in plan:
+            found.add(plan["Relation Name"])
+        for value in plan.values():
+            found |= _relations(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            found |= _relations(value)
+    return found
+
+
+def _tables_read(connection, query):
+    compiled = query.compile(dialect=connection.dialect)
+    params = {key: str(value) if isinstance(value, uuid.UUID) else value for key, value in compiled.params.items()}
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    return len(_relations(plan if isinstance(plan, list) else json.loads(plan)))
+
+
+def compare(engine, args):
+    tables = {
+        "flat": AttendanceRecord.__table__.to_metadata(MetaData(), name=FLAT),
+        "partitioned": AttendanceRecord.__table__,
+    }
+    students = [_student_id(number) for number in random.Random(7).sample(range(args.students), args.samples)]
+    with engine.connect() as connection:
+        for scenario, build in SCENARIOS.items():
+            print(f"\n{scenario} ({args.samples} students)")
+            for name, table in tables.items():
+                flat = name == "flat"
+                connection.execute(build(table, flat, students[0])).all()  # warm the cache
+                timings = []
+                for student_id in students:
+                    started = time.perf_counter()
+                    connection.execute(build(table, flat, student_id)).all()
+                    timings.append(time.perf_counter() - started)
+                timings.sort()
+                print(
+                    f"  {name:>11}  p50 {statistics.median(timings) * 1000:8.2f} ms"
+                    f"  p95 {timings[int(len(timings) * 0.95) - 1] * 1000:8.2f} ms"
+                    f"  tables read {_tables_read(connection, build(table, flat, students[0])):>3}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="scratch Postgres database")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--students", type=int, default=40_000)
+    parser.add_argument("--class-size", type=int, default=60)
+    parser.add_argument("--samples", type=int, default=100, help="students queried per scenario")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse rows from an earlier run")
+    args = parser.parse_args()
+    if not args.database_url.startswith("postgresql"):
+        parser.error("partitioning is Postgres-only; pass a postgresql:// URL")
+
+    engine = build_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    if not args.skip_seed:
+        seed(engine, factory, args)
+    compare(engine, args)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
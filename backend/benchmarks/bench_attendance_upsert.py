@@ -0,0 +1,169 @@
+"""Writing a section's marks: per-row ORM unit of work vs one INSERT ... ON CONFLICT.
+
+Two scenarios:
+  * one 300-student lab block, marked and then re-marked (the update path);
+  * the 9am burst: thousands of sections closing at once through a pool of writers.
+
+Only the attendance write and session close are timed; the notification fan-out is the
+same for both paths. Run from backend/ (defaults to a temporary SQLite file with a
+single writer; pass a scratch Postgres database to see round trips and lock contention):
+
+    python benchmarks/bench_attendance_upsert.py --lab-size 300 --sections 5000 --workers 16
+    python benchmarks/bench_attendance_upsert.py --database-url postgresql+psycopg2://.../bench
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.database import Base, build_engine  # noqa: E402
+from app.models.attendance import AttendanceRecord, AttendanceSession  # noqa: E402
+from app.services.attendance_service import upsert_attendance_records  # noqa: E402
+from app.utils.instrumentation import count_queries  # noqa: E402
+
+
+def legacy_write(db, session, statuses, marked_by):
+    """The previous loop: load existing rows, then one ORM object per student."""
+    existing = {
+        record.student_id: record
+        for record in db.query(AttendanceRecord).filter(AttendanceRecord.session_id == session.session_id).all()
+    }
+    present = absent = 0
+    for student_id, status in statuses.items():
+        record = existing.get(student_id)
+        if record:
+            record.status = status
+            record.marked_at = datetime.utcnow()
+            record.marked_by = marked_by
+        else:
+            record = AttendanceRecord(
+                session_id=session.session_id,
+                student_id=student_id,
+                session_date=session.session_date,
+                status=status,
+                marked_at=datetime.utcnow(),
+                marked_by=marked_by,
+            )
+            db.add(record)
+        if record.status == "present":
+            present += 1
+        else:
+            absent += 1
+    return present, absent
+
+
+def upsert_write(db, session, statuses, marked_by):
+    marked = upsert_attendance_records(db, session, statuses, marked_by=marked_by)
+    present = sum(1 for record in marked if record.status == "present")
+    return present, len(marked) - present
+
+
+WRITERS = {"orm": legacy_write, "upsert": upsert_write}
+
+
+def _statuses(size, salt=0):
+    return {uuid.uuid5(uuid.NAMESPACE_OID, f"{salt}-{i}"): ("absent" if i % 9 == 0 else "present") for i in range(size)}
+
+
+def close_section(factory, writer, session_id, statuses):
+    """Mark every student and close the session in one transaction; returns seconds taken."""
+    started = time.perf_counter()
+    with factory() as db:
+        session = db.get(AttendanceSession, session_id)
+        present, absent = writer(db, session, statuses, "bench")
+        session.present_count = present
+        session.absent_count = absent
+        session.total_students = len(statuses)
+        session.is_closed = True
+        db.commit()
+    return time.perf_counter() - started
+
+
+def _new_sessions(factory, count):
+    with factory() as db:
+        sessions = [
+            AttendanceSession(session_id=uuid.uuid4(), session_date=date.today(), start_time=datetime(2026, 1, 5, 9))
+            for _ in range(count)
+        ]
+        db.add_all(sessions)
+        db.commit()
+        return [session.session_id for session in sessions]
+
+
+def lab_block(factory, size, repeats):
+    print(f"\n{size}-student lab block (median of {repeats})")
+    for name, writer in WRITERS.items():
+        runs = {"first mark": [], "re-mark": []}
+        statements = {}
+        for session_id in _new_sessions(factory, repeats):
+            statuses = _statuses(size, session_id)
+            flipped = {student_id: "present" for student_id in statuses}
+            for label, marks in (("first mark", statuses), ("re-mark", flipped)):
+                with count_queries() as stats:
+                    runs[label].append(close_section(factory, writer, session_id, marks))
+                statements[label] = stats.queries
+        for label, timings in runs.items():
+            print(
+                f"  {name:>6} {label:<10} {statistics.median(timings) * 1000:8.1f} ms"
+                f"  {statements[label]:>4} statements"
+            )
+
+
+def burst(factory, sections, students, workers):
+    print(f"\n9am burst: {sections} sections x {students} students, {workers} writers")
+    for name, writer in WRITERS.items():
+        session_ids = _new_sessions(factory, sections)
+        started = time.perf_counter()
+        with count_queries() as stats, ThreadPoolExecutor(max_workers=workers) as pool:
+            latencies = sorted(pool.map(
+                lambda session_id: close_section(factory, writer, session_id, _statuses(students, session_id)),
+                session_ids,
+            ))
+        elapsed = time.perf_counter() - started
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"  {name:>6} {elapsed:7.2f} s  {sections / elapsed:7.1f} sections/s"
+            f"  p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms"
+            f"  {stats.queries:>8} statements"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (tables are created in it)")
+    parser.add_argument("--lab-size", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sections", type=int, default=5000)
+    parser.add_argument("--students", type=int, default=60, help="students per section in the burst")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    if url.startswith("sqlite"):
+        # SQLite has one writer at a time anyway; concurrency only matters on Postgres.
+        args.workers = 1
+        engine = build_engine(url)
+    else:
+        engine = build_engine(url, pool_size=args.workers, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    lab_block(factory, args.lab_size, args.repeats)
+    burst(factory, args.sections, args.students, args.workers)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
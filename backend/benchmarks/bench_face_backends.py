@@ -0,0 +1,101 @@
+"""Face backends on CPU: load time, resident memory and throughput in faces per second.
+
+Each backend runs in a fresh process, so its memory figure is only its own: the process's peak RSS after
+the backend loads (the models a worker keeps resident) and after the timed run. Photos come from
+--photos (a glob of real class or portrait photos; synthetic noise has no faces to count) and are
+decoded up front, so only detection + embedding is timed, --batch images per ``embed`` call.
+
+Run from backend/:
+
+    python benchmarks/bench_face_backends.py --photos 'samples/class/*.jpg'
+    AI_ONNX_MODEL_PATH=models/w600k_mbf.onnx python benchmarks/bench_face_backends.py \\
+        --photos 'samples/class/*.jpg' --backends dlib-hog onnx-arcface --batch 4
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(name, paths, batch, rounds, results):
+    from app.ai import backends
+    from app.ai.image_decoding import decode_image_file
+    from app.config import settings
+
+    images = []
+    for path in paths:
+        with open(path, "rb") as file:
+            images.append(decode_image_file(file, settings.AI_UPLOAD_MAX_PIXELS))
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    try:
+        backend = backends.get_backend(name)
+    except RuntimeError as exc:
+        results[name] = {"error": str(exc)}
+        return
+    load_seconds = time.perf_counter() - started
+    loaded = _peak_rss_mb()
+
+    backend.embed(images[:batch])  # warm-up: first-call allocations are not steady-state throughput
+    faces = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for low in range(0, len(images), batch):
+            faces += sum(len(embeddings) for _boxes, embeddings in backend.embed(images[low:low + batch]))
+    elapsed = time.perf_counter() - started
+    results[name] = {
+        "load_seconds": load_seconds,
+        "model_mb": loaded - baseline,
+        "peak_mb": _peak_rss_mb(),
+        "faces": faces,
+        "images": len(images) * rounds,
+        "seconds": elapsed,
+    }
+
+
+def main():
+    from app.ai import backends
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--photos", required=True, help="glob of photos to run through each backend")
+    parser.add_argument("--backends", nargs="+", default=backends.backend_names())
+    parser.add_argument("--batch", type=int, default=1, help="images per embed() call")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the photos")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.photos))
+    if not paths:
+        sys.exit(f"no photos match {args.photos!r}")
+    print(f"{len(paths)} photos x {args.rounds} rounds, batch {args.batch}, {os.cpu_count()} cores\n")
+    print(f"{'backend':<14} {'load s':>7} {'models MB':>10} {'peak MB':>8} {'faces/s':>9} {'images/s':>9}")
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        results = manager.dict()
+        for name in args.backends:
+            process = context.Process(target=_measure, args=(name, paths, args.batch, args.rounds, results))
+            process.start()
+            process.join()
+            result = results.get(name) or {"error": f"exited with code {process.exitcode}"}
+            if "error" in result:
+                print(f"{name:<14} unavailable: {result['error']}")
+                continue
+            print(
+                f"{name:<14} {result['load_seconds']:7.2f} {result['model_mb']:10.0f} {result['peak_mb']:8.0f} "
+                f"{result['faces'] / result['seconds']:9.1f} {result['images'] / result['seconds']:9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Face enrollment latency: the previous serial extract-and-average vs the parallel quality-gated pipeline.
+
+Enrolls one student from --samples photos of --size pixels (JPEG), --repeats times each way:
+  * "serial": the previous implementation, one decode + detect + encode after another, then a plain mean;
+  * "parallel": enroll_face_profile, which scores samples on the AI_BATCH_CAPTURE_WORKERS pool, gates
+    them on sharpness/size/pose and drops medoid outliers before averaging.
+
+Uses the AI_FACE_BACKEND backend; pass --stub-detector where dlib is unavailable (decoding and quality
+scoring are then real, detection is a numpy gradient pass over the whole photo). Parallel speed-up needs
+as many cores as workers: compare the two on the machine that will serve enrollments.
+
+Run from backend/:
+
+    python benchmarks/bench_face_enrollment.py --samples 8 --size 2400
+    AI_BATCH_CAPTURE_WORKERS=8 python benchmarks/bench_face_enrollment.py --stub-detector
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.ai.backends import DlibBackend  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.database import Base, build_engine  # noqa: E402
+from app.models import Student, User  # noqa: E402
+from app.models.ai import StudentFaceProfile  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services import ai_service  # noqa: E402
+
+
+def stub_face_recognition():
+    """Whole-photo "face" with a HOG-sized numpy workload and embeddings clustered around one identity."""
+    identity = np.random.default_rng(5).normal(size=128)
+
+    def face_locations(pixels, model):
+        np.gradient(pixels.astype(np.float32), axis=(0, 1))
+        return [(0, pixels.shape[1], pixels.shape[0], 0)]
+
+    def face_encodings(pixels, locations):
+        jitter = np.random.default_rng(int(pixels[:64, :64].sum())).normal(scale=0.05, size=128)
+        return [identity + jitter]
+
+    return SimpleNamespace(face_locations=face_locations, face_encodings=face_encodings)
+
+
+def legacy_enroll(db, student_id, image_samples):
+    """The previous implementation: extract each sample in turn, average them all."""
+    backend = ai_service.get_face_backend()
+    embeddings = []
+    for image in image_samples:
+        pixels = ai_service._decode_image(image)
+        face_locations = backend.detect(pixels)
+        if len(face_locations) != 1:
+            raise ValueError("Expected one face per image")
+        encodings = backend.encode(pixels, face_locations)
+        embeddings.append(ai_service._normalize_embedding(encodings[0].tolist()))
+    averaged = ai_service._normalize_embedding(np.mean(np.vstack(embeddings), axis=0).tolist())
+    profile = db.query(StudentFaceProfile).filter(StudentFaceProfile.student_id == student_id).first()
+    if profile is None:
+        profile = StudentFaceProfile(student_id=student_id)
+    profile.embedding_vector = json.dumps(averaged.tolist())
+    profile.model_name = "face-recognition"
+    profile.sample_count = len(image_samples)
+    profile.consent_given = True
+    db.add(profile)
+    db.commit()
+
+
+def photos(count, size):
+    rng = np.random.default_rng(17)
+    encoded = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, size=(size * 3 // 4, size, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        encoded.append(buffer.getvalue())
+    return encoded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=8)
+    parser.add_argument("--size", type=int, default=2400, help="photo width in pixels (4:3)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--stub-detector", action="store_true")
+    args = parser.parse_args()
+
+    if args.stub_detector:
+        stub = DlibBackend(face_recognition=stub_face_recognition())
+        ai_service.get_face_backend = lambda: stub
+    elif ai_service.get_face_backend() is None:
+        sys.exit(f"the {settings.AI_FACE_BACKEND} face backend is not installed; rerun with --stub-detector")
+    ai_service.face_detections.max_entries = 0
+
+    engine = build_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    with factory() as db:
+        user = User(email=f"{uuid.uuid4().hex}@example.com", role=UserRole.STUDENT)
+        db.add(user)
+        db.flush()
+        student = Student(user_id=user.user_id, registration_number="BENCH-1", first_name="B", last_name="S", program="B.Tech", semester=1)
+        db.add(student)
+        db.commit()
+        student_id = student.student_id
+
+    samples = photos(args.samples, args.size)
+    print(f"{args.samples} samples of {args.size}px, {settings.AI_BATCH_CAPTURE_WORKERS} workers, {os.cpu_count()} cores")
+    for label, enroll in (
+        ("serial", lambda db: legacy_enroll(db, student_id, samples)),
+        ("parallel", lambda db: ai_service.enroll_face_profile(db, student_id, samples, consent_given=True)),
+    ):
+        timings = []
+        for _ in range(args.repeats):
+            with factory() as db:
+                started = time.perf_counter()
+                enroll(db)
+                timings.append(time.perf_counter() - started)
+        print(f"  {label:<10} {statistics.median(timings) * 1000:10.1f} ms  (median of {args.repeats})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Face matching with one averaged embedding vs K prototypes per student: accuracy and latency.
+
+Simulates --students students; a --two-look-share of them enroll in two looks (glasses/no glasses,
+hair up/down), a shift of --look-spread relative to the identity. Each student enrolls --samples noisy
+samples. The benchmark then "photographs" every student --photos times in a random look, and reports:
+  * accuracy at --threshold for K=1 (today's averaged vector) and K=AI_FACE_PROTOTYPES: matched correctly,
+    missed (below threshold, the case that makes faculty rerun a capture) and matched to the wrong student;
+  * matcher latency for a full class photo: the previous per-pair Python loop vs the detections x
+    (students * K) matmul with a segment max.
+
+Synthetic vectors are not dlib embeddings; rerun with real enrollments before tuning the threshold.
+
+    python benchmarks/bench_face_prototypes.py --students 60 --look-spread 1.2
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import numpy as np  # noqa: E402
+
+from app.ai import face_matching  # noqa: E402
+from app.config import settings  # noqa: E402
+
+
+def unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def legacy_best_matches(detections, profile_embeddings):
+    """The previous matcher: one np.dot per (detection, student) pair."""
+    matches = []
+    for detected in detections:
+        best_student_id, best_similarity = None, -1.0
+        for student_id, profile_embedding in profile_embeddings.items():
+            similarity = float(np.dot(detected, profile_embedding))
+            if similarity > best_similarity:
+                best_student_id, best_similarity = student_id, similarity
+        matches.append((best_student_id, best_similarity))
+    return matches
+
+
+def simulate(args, rng):
+    identities = unit(rng.normal(size=(args.students, 128)))
+    looks = []
+    for identity in identities:
+        count = 2 if rng.random() < args.two_look_share else 1
+        shifts = [np.zeros(128)] + [args.look_spread * unit(rng.normal(size=128)) for _ in range(count - 1)]
+        looks.append([unit(identity + shift) for shift in shifts])
+
+    def sample(student):
+        look = looks[student][rng.integers(len(looks[student]))]
+        return unit(look + args.noise * rng.normal(size=128) / np.sqrt(128))
+
+    enrollments = {student: [sample(student) for _ in range(args.samples)] for student in range(args.students)}
+    photos = [(student, sample(student)) for student in range(args.students) for _ in range(args.photos)]
+    return enrollments, photos
+
+
+def accuracy(gallery, photos, threshold):
+    matches = gallery.best_matches([embedding for _student, embedding in photos])
+    correct = missed = wrong = 0
+    for (student, _embedding), (matched, similarity) in zip(photos, matches):
+        if similarity < threshold:
+            missed += 1
+        elif matched == student:
+            correct += 1
+        else:
+            wrong += 1
+    return correct, missed, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--two-look-share", type=float, default=0.4)
+    parser.add_argument("--look-spread", type=float, default=1.2)
+    parser.add_argument("--noise", type=float, default=0.35)
+    parser.add_argument("--samples", type=int, default=8)
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    enrollments, photos = simulate(args, rng)
+    k = settings.AI_FACE_PROTOTYPES
+    profiles = {
+        "K=1 (average)": {student: unit(np.mean(samples, axis=0)) for student, samples in enrollments.items()},
+        f"K={k} prototypes": {
+            student: face_matching.build_prototypes(samples, min(k, len(samples) // 2))
+            for student, samples in enrollments.items()
+        },
+    }
+
+    total = len(photos)
+    print(f"{args.students} students ({args.two_look_share:.0%} with two looks), {total} photos, threshold {args.threshold}")
+    for label, roster in profiles.items():
+        correct, missed, wrong = accuracy(face_matching.PrototypeGallery(roster), photos, args.threshold)
+        print(f"  {label:<16} correct {correct / total:6.1%}   missed {missed / total:6.1%}   wrong student {wrong / total:6.1%}")
+
+    class_photo = [embedding for _student, embedding in photos[:: args.photos]]
+    print(f"\nmatching one class photo ({len(class_photo)} faces), median of {args.repeats}")
+    contenders = {
+        "loop, K=1": lambda: legacy_best_matches(class_photo, profiles["K=1 (average)"]),
+        "matmul, K=1": lambda: face_matching.PrototypeGallery(profiles["K=1 (average)"]).best_matches(class_photo),
+        f"matmul, K={k}": lambda: face_matching.PrototypeGallery(profiles[f"K={k} prototypes"]).best_matches(class_photo),
+    }
+    for label, run in contenders.items():
+        timings = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        print(f"  {label:<14} {statistics.median(timings) * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
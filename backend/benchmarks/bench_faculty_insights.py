@@ -0,0 +1,212 @@
+"""Faculty AI insights dashboard: Python-side counting vs SQL aggregates vs the per-faculty cache.
+
+Seeds one faculty member teaching --sections sections of --class-size students, each with --days
+AI-captured sessions, then times get_faculty_attendance_ai_insights three ways:
+  * "python": the previous implementation, which loaded every AI record, session, enrollment and
+    60-day record for the sections and counted them with defaultdicts;
+  * "sql": the current aggregate queries, uncached;
+  * "cached": a dashboard reload with no session closed in between.
+
+Run from backend/ (defaults to a temporary SQLite file):
+
+    python benchmarks/bench_faculty_insights.py --sections 12 --days 90
+    python benchmarks/bench_faculty_insights.py --database-url postgresql+psycopg2://.../bench
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+from app.database import Base, build_engine  # noqa: E402
+from app.models import Course, CourseSection, Faculty, SectionEnrollment, Student, User  # noqa: E402
+from app.models.attendance import AttendanceRecord, AttendanceSession  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.services import ai_service, attendance_stats  # noqa: E402
+from app.services.insights_cache import faculty_insights  # noqa: E402
+from app.utils.instrumentation import count_queries  # noqa: E402
+
+
+def legacy_insights(db, faculty_id, low_attendance_threshold=75.0):
+    """The previous implementation: load rows for every section, count in Python."""
+    section_ids = [s.section_id for s in db.query(CourseSection).filter(CourseSection.faculty_id == faculty_id).all()]
+    ai_sessions = (
+        db.query(AttendanceSession)
+        .filter(AttendanceSession.section_id.in_(section_ids), AttendanceSession.session_type == "ai_face")
+        .all()
+    )
+    ai_records = (
+        db.query(AttendanceRecord)
+        .filter(
+            AttendanceRecord.session_id.in_([session.session_id for session in ai_sessions]),
+            AttendanceRecord.confidence_score.isnot(None),
+        )
+        .all()
+    )
+    confidences = [record.confidence_score for record in ai_records]
+    accuracy = round(sum(confidences) / len(confidences) * 100, 2) if confidences else 0.0
+    proxy_alerts = len([value for value in confidences if value < 0.65])
+
+    recent = (
+        db.query(AttendanceSession)
+        .filter(AttendanceSession.section_id.in_(section_ids))
+        .order_by(AttendanceSession.session_date.desc())
+        .limit(14)
+        .all()
+    )
+    trend = [
+        {
+            "date": session.session_date.isoformat(),
+            "present_rate": round(session.present_count / session.total_students * 100, 2) if session.total_students else 0.0,
+            "total_students": session.total_students or 0,
+        }
+        for session in reversed(recent[:7])
+    ]
+
+    enrollments = (
+        db.query(SectionEnrollment)
+        .filter(SectionEnrollment.section_id.in_(section_ids), SectionEnrollment.status == "active")
+        .all()
+    )
+    student_ids = sorted({enrollment.student_id for enrollment in enrollments})
+    records = (
+        db.query(AttendanceRecord)
+        .join(AttendanceSession, AttendanceRecord.session_id == AttendanceSession.session_id)
+        .filter(
+            AttendanceSession.section_id.in_(section_ids),
+            AttendanceRecord.student_id.in_(student_ids),
+            AttendanceRecord.marked_at >= datetime.utcnow() - timedelta(days=60),
+        )
+        .all()
+    )
+    totals, presents = defaultdict(int), defaultdict(int)
+    for record in records:
+        totals[record.student_id] += 1
+        presents[record.student_id] += record.status == "present"
+    by_student = {s.student_id: s for s in db.query(Student).filter(Student.student_id.in_(student_ids)).all()}
+    risk = []
+    for student_id, total in totals.items():
+        percent = round(presents[student_id] / total * 100, 2)
+        if percent < low_attendance_threshold:
+            student = by_student[student_id]
+            risk.append({"student_id": student_id, "name": f"{student.first_name} {student.last_name}", "attendance_percent": percent})
+    risk.sort(key=lambda item: item["attendance_percent"])
+    return {
+        "ai_attendance_accuracy_percent": accuracy,
+        "proxy_detection_alerts": proxy_alerts,
+        "ai_sessions_count": len(ai_sessions),
+        "trend_graph": trend,
+        "risk_students": risk,
+    }
+
+
+def seed(factory, args):
+    rng = random.Random(7)
+    today = date.today()
+    with factory() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex[:8]}@example.com", role=UserRole.FACULTY)
+        db.add(user)
+        db.flush()
+        faculty = Faculty(user_id=user.user_id, employee_id=f"EMP-{user.user_id.hex[:8]}", first_name="Bench", last_name="Faculty")
+        course = Course(course_code=f"BEN-{user.user_id.hex[:6]}", course_name="Benchmarking", credits=4)
+        db.add_all([faculty, course])
+        db.flush()
+
+        record_rows = []
+        for number in range(args.sections):
+            section = CourseSection(course_id=course.course_id, faculty_id=faculty.faculty_id, section_name=f"S{number}")
+            db.add(section)
+            db.flush()
+            students = [uuid.uuid4() for _ in range(args.class_size)]
+            db.execute(insert(User), [
+                {"user_id": student_id, "email": f"{student_id.hex}@example.com", "role": UserRole.STUDENT}
+                for student_id in students
+            ])
+            db.execute(insert(Student), [
+                {"student_id": student_id, "user_id": student_id, "registration_number": student_id.hex[:12],
+                 "first_name": "Student", "last_name": str(index), "program": "B.Tech", "semester": 3}
+                for index, student_id in enumerate(students)
+            ])
+            db.execute(insert(SectionEnrollment), [
+                {"section_id": section.section_id, "student_id": student_id} for student_id in students
+            ])
+            skip = {student_id: rng.random() * 0.4 for student_id in students}
+            for day in range(args.days):
+                session_date = today - timedelta(days=args.days - day)
+                session_id = uuid.uuid4()
+                marks = {student_id: rng.random() > skip[student_id] for student_id in students}
+                db.execute(insert(AttendanceSession), [{
+                    "session_id": session_id, "section_id": section.section_id, "session_date": session_date,
+                    "start_time": datetime.combine(session_date, datetime.min.time()), "session_type": "ai_face",
+                    "is_closed": True, "marked_by": faculty.faculty_id, "total_students": len(students),
+                    "present_count": sum(marks.values()), "absent_count": len(students) - sum(marks.values()),
+                }])
+                record_rows.extend(
+                    {"record_id": uuid.uuid4(), "session_id": session_id, "student_id": student_id,
+                     "session_date": session_date, "status": "present" if present else "absent",
+                     "confidence_score": round(rng.uniform(0.5, 0.99), 3) if present else None,
+                     "marked_at": datetime.combine(session_date, datetime.min.time())}
+                    for student_id, present in marks.items()
+                )
+        db.execute(insert(AttendanceRecord), record_rows)
+        attendance_stats.rebuild(db)
+        db.commit()
+        print(f"seeded {args.sections} sections, {args.sections * args.days} sessions, {len(record_rows):,} records")
+        return faculty.faculty_id
+
+
+def run(factory, faculty_id, repeats):
+    def uncached(db):
+        faculty_insights.clear()
+        return ai_service.get_faculty_attendance_ai_insights(db, faculty_id)
+
+    variants = {
+        "python": lambda db: legacy_insights(db, faculty_id),
+        "sql": uncached,
+        "cached": lambda db: ai_service.get_faculty_attendance_ai_insights(db, faculty_id),
+    }
+    print(f"\ndashboard load (median of {repeats})")
+    for name, load in variants.items():
+        timings = []
+        for _ in range(repeats):
+            with factory() as db, count_queries() as stats:
+                started = time.perf_counter()
+                load(db)
+                timings.append(time.perf_counter() - started)
+        print(f"  {name:>7} {statistics.median(timings) * 1000:9.2f} ms  {stats.queries:>3} queries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="scratch database (tables are created in it)")
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--class-size", type=int, default=60)
+    parser.add_argument("--days", type=int, default=90, help="AI sessions per section")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = build_engine(url)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    faculty_id = seed(factory, args)
+    run(factory, faculty_id, args.repeats)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
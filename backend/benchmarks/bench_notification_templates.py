@@ -0,0 +1,123 @@
+"""Render 10k absence notifications: per-recipient f-strings vs precompiled templates.
+
+Run from backend/:
+
+    python benchmarks/bench_notification_templates.py --recipients 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.services import notification_templates as templates  # noqa: E402
+
+FIRST_NAMES = ["Asha", "Ravi", "Priya", "Arjun", "Neha", "Karan", "Simran", "Rahul", "Pooja", "Aman"]
+LAST_NAMES = ["Sharma", "Verma", "Singh", "Gupta", "Kaur", "Patel", "Mehta", "Das"]
+
+
+def _contexts(count):
+    rng = random.Random(7)
+    return [
+        {
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "registration_number": f"121{index:05d}",
+            "program": "B.Tech CSE",
+            "semester": rng.choice([1, 3, 5, 7]),
+        }
+        for index in range(count)
+    ]
+
+
+def render_fstrings(contexts):
+    """The previous per-recipient f-string bodies."""
+    out = []
+    for c in contexts:
+        out.append("Attendance Alert: You were marked ABSENT today. Please contact your faculty if this is incorrect. - LPU Smart Campus")
+        out.append(f"Dear Parent, Your ward {c['first_name']} {c['last_name']} (Reg: {c['registration_number']}) was marked ABSENT today. - LPU")
+        out.append(f"""
+                    <html>
+                    <body style="font-family: Arial, sans-serif;">
+                        <h2 style="color: #dc2626;">Attendance Alert</h2>
+                        <p>Dear {c['first_name']},</p>
+                        <p>You were marked <strong style="color: #dc2626;">ABSENT</strong> in today's class.</p>
+                        <p><strong>Registration Number:</strong> {c['registration_number']}</p>
+                        <p>If you believe this is an error, please contact your faculty immediately.</p>
+                        <br>
+                        <p>Best regards,<br>LPU Smart Campus System</p>
+                    </body>
+                    </html>
+                    """)
+        out.append(f"Student Attendance Alert - {c['first_name']} {c['last_name']}")
+        out.append(f"""
+                        <html>
+                        <body style="font-family: Arial, sans-serif;">
+                            <h2 style="color: #dc2626;">Student Attendance Alert</h2>
+                            <p>Dear Parent/Guardian,</p>
+                            <p>This is to inform you that your ward has been marked <strong style="color: #dc2626;">ABSENT</strong> today.</p>
+                            <p><strong>Student Name:</strong> {c['first_name']} {c['last_name']}</p>
+                            <p><strong>Registration Number:</strong> {c['registration_number']}</p>
+                            <p><strong>Program:</strong> {c['program']}</p>
+                            <p><strong>Semester:</strong> {c['semester']}</p>
+                            <br>
+                            <p>Please ensure your ward maintains regular attendance.</p>
+                            <p>For any queries, please contact the university.</p>
+                            <br>
+                            <p>Best regards,<br>Lovely Professional University<br>Smart Campus System</p>
+                        </body>
+                        </html>
+                        """)
+    return out
+
+
+def render_templates(contexts):
+    out = []
+    for template in (
+        templates.ATTENDANCE_STUDENT_SMS,
+        templates.ATTENDANCE_PARENT_SMS,
+        templates.ATTENDANCE_STUDENT_EMAIL,
+        templates.ATTENDANCE_PARENT_EMAIL_SUBJECT,
+        templates.ATTENDANCE_PARENT_EMAIL,
+    ):
+        out.extend(template.render_many(contexts))
+    return out
+
+
+def _footprint(bodies):
+    unique = {id(body): len(body) for body in bodies}
+    return len(unique), sum(unique.values())
+
+
+def _time(label, fn, contexts, repeat):
+    best = min(_run(fn, contexts) for _ in range(repeat))
+    bodies = fn(contexts)
+    unique, size = _footprint(bodies)
+    print(f"{label:<22} {best * 1000:8.1f} ms  {len(bodies)} bodies, {unique} distinct objects, {size / 1e6:6.2f} MB")
+
+
+def _run(fn, contexts):
+    for template in templates.TEMPLATES.values():
+        template.clear_cache()
+    started = time.perf_counter()
+    fn(contexts)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    contexts = _contexts(args.recipients)
+    print(f"{args.recipients} absentees x 5 bodies (best of {args.repeat})")
+    _time("f-strings", render_fstrings, contexts, args.repeat)
+    _time("precompiled templates", render_templates, contexts, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
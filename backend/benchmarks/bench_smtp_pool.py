@@ -0,0 +1,116 @@
+"""SMTP throughput: one connection per message vs the persistent connection pool.
+
+Runs against a local aiosmtpd stand-in, from backend/:
+
+    python benchmarks/bench_smtp_pool.py --messages 2000 --workers 4 --latency-ms 2
+
+``--latency-ms`` adds a delay to every SMTP command reply to approximate a remote relay.
+"""
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import SMTP as SMTPServer  # noqa: E402
+
+from app.services.smtp_pool import SMTPConnectionPool, build_message  # noqa: E402
+
+
+class CountingHandler:
+    def __init__(self):
+        self.delivered = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered += len(envelope.rcpt_tos)
+        return "250 OK"
+
+
+class SlowSMTPServer(SMTPServer):
+    latency = 0.0
+
+    async def push(self, status):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super().push(status)
+
+
+class SlowController(Controller):
+    def factory(self):
+        return SlowSMTPServer(self.handler, **self.SMTP_kwargs)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _messages(count):
+    body = "<html><body><p>You were marked <strong>ABSENT</strong> today.</p></body></html>"
+    return [build_message("alerts@example.com", f"student{i}@example.com", "Attendance Alert", body) for i in range(count)]
+
+
+def run_per_message(host, port, messages, workers):
+    def _send(message):
+        with smtplib.SMTP(host, port, timeout=10) as client:
+            client.ehlo()
+            client.send_message(message)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(_send, messages))
+
+
+def run_pooled(host, port, messages, workers):
+    pool = SMTPConnectionPool(host, port, use_tls=False, size=workers, max_messages_per_connection=10_000)
+    chunks = [messages[offset::workers] for offset in range(workers)]
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for errors in executor.map(pool.send_batch, chunks):
+                assert not any(errors), errors
+    finally:
+        pool.close()
+    return pool.connections_opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    SlowSMTPServer.latency = args.latency_ms / 1000
+    handler = CountingHandler()
+    controller = SlowController(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        messages = _messages(args.messages)
+        print(f"{args.messages} messages, {args.workers} workers, {args.latency_ms}ms per SMTP reply")
+
+        started = time.perf_counter()
+        run_per_message(controller.hostname, controller.port, messages, args.workers)
+        naive = time.perf_counter() - started
+        print(f"connection per message: {naive:7.2f}s  {args.messages / naive:8.0f} msg/s")
+        assert handler.delivered == args.messages
+        handler.delivered = 0
+
+        started = time.perf_counter()
+        connections = run_pooled(controller.hostname, controller.port, messages, args.workers)
+        pooled = time.perf_counter() - started
+        print(f"pooled ({connections} connections): {pooled:7.2f}s  {args.messages / pooled:8.0f} msg/s")
+        assert handler.delivered == args.messages
+        print(f"speedup: {naive / pooled:.1f}x")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
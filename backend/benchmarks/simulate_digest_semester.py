@@ -0,0 +1,103 @@
+"""Outbound message volume for a synthetic semester: immediate alerts vs digests.
+
+Replays absences through the real digest staging/flush code on an in-memory SQLite
+database with a simulated clock. Run from backend/:
+
+    python benchmarks/simulate_digest_semester.py --students 120 --days 90 --windows 60,240,600
+"""
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import build_engine  # noqa: E402
+from app.models.notification import NotificationDigestEvent, NotificationOutbox  # noqa: E402
+from app.services import notification_digest  # noqa: E402
+
+CLASS_HOURS = (9, 10, 11, 13, 14, 15)
+COURSES = ("CSE101", "CSE205", "MTH111", "PHY102", "ECE150", "HSS120")
+CHANNELS = (("student", "sms"), ("parent", "sms"), ("student", "email"), ("parent", "email"))
+
+
+def synthetic_semester(students, days, seed):
+    """Yields (timestamp, course, absent student indexes) for every class in the semester."""
+    rng = random.Random(seed)
+    # Most students miss the odd class; a few miss a lot, often a whole day at once.
+    profiles = [rng.choices([0.04, 0.15, 0.4], weights=[80, 15, 5])[0] for _ in range(students)]
+    start = datetime(2026, 1, 5)
+    for day in range(days):
+        date = start + timedelta(days=day)
+        if date.weekday() >= 5:
+            continue
+        skipping_day = {index for index, rate in enumerate(profiles) if rng.random() < rate / 3}
+        for slot, hour in enumerate(CLASS_HOURS):
+            absent = [
+                index for index, rate in enumerate(profiles)
+                if index in skipping_day or rng.random() < rate
+            ]
+            yield date.replace(hour=hour), COURSES[slot], absent
+
+
+def simulate(students, days, window_minutes, seed):
+    engine = build_engine("sqlite://")
+    for table in (NotificationDigestEvent.__table__, NotificationOutbox.__table__):
+        table.create(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    student_ids = [uuid.uuid4() for _ in range(students)]
+    contexts = [
+        {"first_name": f"Student{i}", "last_name": "Test", "registration_number": f"121{i:05d}",
+         "program": "B.Tech CSE", "semester": 3}
+        for i in range(students)
+    ]
+    absences = 0
+    last_time = None
+    for timestamp, course, absent in synthetic_semester(students, days, seed):
+        notification_digest.flush_due_digests(db, now=timestamp)
+        targets = [
+            (audience, channel, f"{audience}-{channel}-{index}", student_ids[index], contexts[index])
+            for index in absent
+            for audience, channel in CHANNELS
+        ]
+        notification_digest.stage_absence_events(
+            db, None, targets, f"{course} {timestamp:%H:%M}", window_minutes=window_minutes, now=timestamp
+        )
+        db.commit()
+        absences += len(absent)
+        last_time = timestamp
+    notification_digest.flush_due_digests(db, now=last_time + timedelta(days=1))
+    db.commit()
+
+    sent = db.query(NotificationOutbox).count()
+    db.close()
+    engine.dispose()
+    return absences, sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=120)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--windows", default="60,240,600", help="digest windows in minutes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.students} students, {args.days} days, {len(CLASS_HOURS)} classes/day, {len(CHANNELS)} recipients each")
+    baseline = None
+    for window in [int(value) for value in args.windows.split(",")]:
+        absences, sent = simulate(args.students, args.days, window, args.seed)
+        if baseline is None:
+            baseline = absences * len(CHANNELS)
+            print(f"absences: {absences}, immediate messages: {baseline}")
+        print(f"window {window:>4} min: {sent:>7} messages  ({100 * (1 - sent / baseline):5.1f}% fewer)")
+
+
+if __name__ == "__main__":
+    main()
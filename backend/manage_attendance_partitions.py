@@ -0,0 +1,41 @@
+"""Create, archive and restore monthly attendance_records partitions (Postgres).
+
+Usage:
+    python manage_attendance_partitions.py ensure [months_ahead]
+    python manage_attendance_partitions.py archive <months_to_keep> [archive_dir]
+    python manage_attendance_partitions.py restore <partition_name>
+"""
+import sys
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import attendance_partitions
+
+
+def main(argv):
+    command = argv[0] if argv else "ensure"
+    if command == "ensure":
+        months_ahead = int(argv[1]) if len(argv) > 1 else settings.ATTENDANCE_PARTITION_MONTHS_AHEAD
+        result = attendance_partitions.run_maintenance(SessionLocal, months_ahead=months_ahead)
+        print(f"Created {len(result['created'])} partition(s): {', '.join(result['created']) or '-'}")
+    elif command == "archive" and len(argv) > 1:
+        archive_dir = argv[2] if len(argv) > 2 else settings.ATTENDANCE_ARCHIVE_DIR
+        result = attendance_partitions.run_maintenance(
+            SessionLocal,
+            months_ahead=settings.ATTENDANCE_PARTITION_MONTHS_AHEAD,
+            archive_after_months=int(argv[1]),
+            archive_dir=archive_dir,
+        )
+        print(f"Archived {len(result['archived'])} partition(s) to {archive_dir}: {', '.join(result['archived']) or '-'}")
+    elif command == "restore" and len(argv) > 1:
+        with SessionLocal() as db:
+            rows = attendance_partitions.restore_partition(db, argv[1])
+            db.commit()
+        print(f"Restored {argv[1]}: {rows} rows")
+    else:
+        print(__doc__)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,20 @@
+"""Recompute student_section_attendance_stats from raw attendance records.
+
+Usage: python rebuild_attendance_stats.py [section_id ...]
+"""
+import sys
+from uuid import UUID
+
+from app.database import SessionLocal
+from app.services import attendance_stats
+
+
+def main(argv):
+    section_ids = [UUID(value) for value in argv] or None
+    rows = attendance_stats.run_rebuild(SessionLocal, section_ids)
+    scope = f"{len(section_ids)} section(s)" if section_ids else "all sections"
+    print(f"Rebuilt attendance stats for {scope}: {rows} student/section rows")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
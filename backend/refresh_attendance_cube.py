@@ -0,0 +1,19 @@
+"""Fold newly closed attendance sessions into the campus analytics cube.
+
+Usage: python refresh_attendance_cube.py [--full]
+"""
+import sys
+
+from app.database import SessionLocal
+from app.services import attendance_cube
+
+
+def main(argv):
+    full = "--full" in argv
+    result = attendance_cube.run_refresh(SessionLocal, full=full)
+    kind = "Rebuilt" if result["full"] else "Refreshed"
+    print(f"{kind} attendance cube (refresh {result['refresh_id']}): {result['sessions_folded']} session(s) folded")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
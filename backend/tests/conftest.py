@@ -1,8 +1,155 @@
 import sys
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
+import pytest
+
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.utils.instrumentation import count_queries  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_face_detections():
+    """Detections are cached per photo digest for the whole process; tests reuse photos with other fake detectors."""
+    from app.services.ai_service import face_detections
+
+    face_detections.clear()
+    yield
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Usage: ``with assert_max_queries(3): client.get("/api/...")``."""
+
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        with count_queries() as stats:
+            yield stats
+        assert stats.queries <= limit, (
+            f"expected at most {limit} queries, got {stats.queries}:\n" + "\n".join(stats.statements)
+        )
+
+    return _assert_max_queries
+
+
+# Tables that grow with enrollment x days; a full scan of any of them will not survive production.
+LARGE_TABLES = {
+    "attendance_records",
+    "attendance_sessions",
+    "section_enrollments",
+    "course_sections",
+    "food_orders",
+    "order_items",
+    "remedial_attendance",
+    "notifications",
+}
+
+
+@pytest.fixture
+def assert_no_full_scans():
+    """Usage: ``with assert_no_full_scans(db): service_call(db)``.
+
+    Every SELECT issued in the block is re-run under ``EXPLAIN QUERY PLAN`` (SQLite) and the
+    block fails if any large table is scanned rather than searched through an index.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @contextmanager
+    def _assert_no_full_scans(db):
+        captured = []
+
+        def _capture(_conn, _cursor, statement, parameters, _context, _executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                captured.append((statement, parameters))
+
+        event.listen(Engine, "before_cursor_execute", _capture)
+        try:
+            yield captured
+        finally:
+            event.remove(Engine, "before_cursor_execute", _capture)
+
+        connection = db.connection()
+        problems = []
+        for statement, parameters in captured:
+            plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            # "SCAN t" reads every row; "SCAN t USING INDEX i" walks the whole index, which is no better.
+            scans = [step for step in plan if step.startswith("SCAN ") and step.split()[1] in LARGE_TABLES]
+            if scans:
+                problems.append(f"{statement}\n  -> " + "\n  -> ".join(plan))
+        assert captured, "no SELECT statements were issued"
+        assert not problems, "full scans of large tables:\n" + "\n\n".join(problems)
+
+    return _assert_no_full_scans
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.database import Base, build_engine
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(bind=db_engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def db_session(db_session_factory):
+    db = db_session_factory()
+    yield db
+    db.close()
+
+
+def seed_section(db, student_count: int, with_contacts: bool = True):
+    """Create a faculty member, a section and ``student_count`` enrolled students."""
+    from app.models import Course, CourseSection, Faculty, SectionEnrollment, Student, User
+    from app.models.user import UserRole
+
+    suffix = uuid.uuid4().hex[:8]
+    faculty_user = User(email=f"faculty-{suffix}@example.com", role=UserRole.FACULTY)
+    db.add(faculty_user)
+    db.flush()
+    faculty = Faculty(user_id=faculty_user.user_id, employee_id=f"EMP-{suffix}", first_name="Fac", last_name="Ulty")
+    course = Course(course_code=f"CSE-{suffix}", course_name="Data Structures", credits=4)
+    db.add_all([faculty, course])
+    db.flush()
+    section = CourseSection(course_id=course.course_id, faculty_id=faculty.faculty_id, section_name="K1")
+    db.add(section)
+    db.flush()
+
+    students = []
+    for index in range(student_count):
+        user = User(email=f"student-{suffix}-{index}@example.com", role=UserRole.STUDENT)
+        db.add(user)
+        db.flush()
+        student = Student(
+            user_id=user.user_id,
+            registration_number=f"REG-{suffix}-{index:04d}",
+            first_name=f"Student{index}",
+            last_name="Test",
+            phone=f"90000{index:05d}" if with_contacts else None,
+            parent_phone=f"80000{index:05d}" if with_contacts else None,
+            parent_email=f"parent-{suffix}-{index}@example.com" if with_contacts else None,
+            program="B.Tech CSE",
+            semester=3,
+        )
+        db.add(student)
+        db.flush()
+        db.add(SectionEnrollment(section_id=section.section_id, student_id=student.student_id))
+        students.append(student)
+    db.commit()
+    return faculty, section, students
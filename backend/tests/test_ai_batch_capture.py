@@ -0,0 +1,180 @@
+import io
+import json
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.ai.backends import DlibBackend
+from app.api import ai as ai_api
+from app.database import get_db, get_read_db
+from app.models.ai import StudentFaceProfile
+from app.models.attendance import AttendanceRecord, AttendanceSession, StudentSectionAttendanceStats
+from app.models.course import CourseSection, SectionEnrollment
+from app.services import ai_service
+from app.utils import auth as auth_utils
+from app.utils.uploads import UploadSlots
+from conftest import seed_section
+
+DAY = date(2026, 3, 9)
+EMBEDDINGS = [np.eye(128, dtype=np.float32)[index] for index in range(3)]
+
+
+def _photo(*students):
+    """A photo whose top row encodes which students' faces the fake detector will find."""
+    image = Image.new("RGB", (8, 8), (0, 0, 0))
+    for student in students:
+        image.putpixel((student, 0), (255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_detector(monkeypatch):
+    def face_locations(pixels, model):
+        return [(0, column + 1, 1, column) for column in range(3) if pixels[0, column, 0] > 128]
+
+    def face_encodings(pixels, locations):
+        return [EMBEDDINGS[left] for _top, _right, _bottom, left in locations]
+
+    fake = SimpleNamespace(face_locations=face_locations, face_encodings=face_encodings)
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+
+
+def _seed_exam(db):
+    """One invigilator, two sections sharing the same three students, three open sessions."""
+    faculty, first, students = seed_section(db, 3, with_contacts=False)
+    second = CourseSection(course_id=first.course_id, faculty_id=faculty.faculty_id, section_name="K2")
+    db.add(second)
+    db.flush()
+    for student, embedding in zip(students, EMBEDDINGS):
+        db.add(SectionEnrollment(section_id=second.section_id, student_id=student.student_id))
+        db.add(StudentFaceProfile(
+            student_id=student.student_id,
+            embedding_vector=json.dumps(embedding.tolist()),
+            approval_status="approved",
+            model_name="face-recognition",
+            consent_given=True,
+        ))
+    sessions = []
+    for section in (first, first, second):
+        session = AttendanceSession(
+            section_id=section.section_id,
+            session_date=DAY,
+            start_time=datetime(2026, 3, 9, 9),
+            marked_by=faculty.faculty_id,
+        )
+        db.add(session)
+        sessions.append(session)
+    db.commit()
+    return faculty, sessions
+
+
+def test_batch_shares_loads_and_reports_each_item(db_session, fake_detector, assert_max_queries):
+    faculty, (room_a, room_b, room_c) = _seed_exam(db_session)
+    room_b.is_closed = True
+    db_session.commit()
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    items = [
+        (room_a.session_id, _photo(0, 1)),
+        (room_b.session_id, _photo(0)),
+        (room_c.session_id, _photo(2)),
+        (room_a.session_id, _photo(2)),
+        (uuid.UUID(missing), _photo(0)),
+    ]
+    # Sessions, three roster queries and existing records once; then each section's close claims, writes and commit.
+    with assert_max_queries(16):
+        outcomes = ai_service.capture_attendance_batch(
+            db_session, faculty.faculty_id, items, captured_at=datetime(2026, 3, 9, 9, 5)
+        )
+
+    assert [type(outcome["error"]).__name__ if outcome["error"] else None for outcome in outcomes] == [
+        None, "ValueError", None, "ValueError", "LookupError",
+    ]
+    assert (outcomes[0]["result"]["present_count"], outcomes[2]["result"]["present_count"]) == (2, 1)
+
+    db_session.expire_all()
+    assert room_a.is_closed and room_c.is_closed
+    statuses = db_session.query(AttendanceRecord.session_id, AttendanceRecord.status).all()
+    assert sorted(status for session_id, status in statuses if session_id == room_c.session_id) == [
+        "absent", "absent", "present",
+    ]
+
+
+def test_unreadable_photo_fails_only_its_item(db_session, fake_detector):
+    faculty, (room_a, room_b, _room_c) = _seed_exam(db_session)
+
+    outcomes = ai_service.capture_attendance_batch(
+        db_session, faculty.faculty_id, [(room_a.session_id, b"not a photo"), (room_b.session_id, _photo(1))]
+    )
+
+    assert isinstance(outcomes[0]["error"], ValueError)
+    assert outcomes[1]["result"]["matched_students"] == 1
+    db_session.expire_all()
+    assert (room_a.is_closed, room_b.is_closed) == (False, True)
+
+
+def test_batch_endpoint(db_session_factory, fake_detector, monkeypatch):
+    db = db_session_factory()
+    faculty, (room_a, room_b, room_c) = _seed_exam(db)
+    faculty_user = faculty.user
+    monkeypatch.setattr(ai_api, "upload_slots", UploadSlots(per_key=1, total=4))
+
+    def _override_db():
+        yield db
+
+    test_app = FastAPI()
+    test_app.include_router(ai_api.router, prefix="/api/ai")
+    test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
+    test_app.dependency_overrides[auth_utils.get_current_user] = lambda: faculty_user
+    client = TestClient(test_app)
+    url = "/api/ai/attendance/capture-photo/batch"
+
+    response = client.post(
+        url,
+        data={"session_ids": [str(room_a.session_id), str(room_c.session_id)]},
+        files=[
+            ("image_files", ("a.png", _photo(0, 2), "image/png")),
+            ("image_files", ("c.png", b"", "image/png")),
+        ],
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert [item["status_code"] for item in body["results"]] == [200, 400]
+    assert body["results"][0]["result"]["present_count"] == 2
+
+    mismatched = client.post(
+        url,
+        data={"session_ids": [str(room_b.session_id)]},
+        files=[("image_files", ("a.png", _photo(0), "image/png")), ("image_files", ("b.png", _photo(1), "image/png"))],
+    )
+    assert mismatched.status_code == 400
+    db.close()
+
+
+def test_capture_claims_the_close_before_writing(db_session, db_session_factory, fake_detector):
+    faculty, (room_a, room_b, _room_c) = _seed_exam(db_session)
+    assert not room_a.is_closed and not room_b.is_closed  # this request saw both sessions open
+    with db_session_factory() as other:
+        other.query(AttendanceSession).filter(
+            AttendanceSession.session_id.in_([room_a.session_id, room_b.session_id])
+        ).update({"is_closed": True}, synchronize_session=False)
+        other.commit()
+
+    with pytest.raises(ValueError, match="already closed"):
+        ai_service.capture_attendance_from_photo(db_session, room_a.session_id, faculty.faculty_id, _photo(0))
+    db_session.rollback()
+    outcomes = ai_service.capture_attendance_batch(db_session, faculty.faculty_id, [(room_b.session_id, _photo(1))])
+
+    assert isinstance(outcomes[0]["error"], ValueError)
+    assert db_session.query(AttendanceRecord).count() == 0
+    assert db_session.query(StudentSectionAttendanceStats).count() == 0
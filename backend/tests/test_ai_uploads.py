@@ -0,0 +1,201 @@
+import asyncio
+import io
+import json
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.ai.backends import DlibBackend
+from app.ai.image_decoding import BackgroundImageDecoder
+from app.api import ai as ai_api
+from app.database import get_db, get_read_db
+from app.models.ai import StudentFaceProfile
+from app.models.attendance import AttendanceSession
+from app.services import ai_service
+from app.utils import auth as auth_utils
+from app.utils.uploads import SpooledUpload, UploadSlots, UploadSlotsExhaustedError, UploadTooLargeError, spool_stream
+from conftest import seed_section
+
+
+def _encode(width, height, image_format="JPEG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+async def _chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_spooled_upload_caps_size_and_serves_a_growing_reader():
+    data = _encode(64, 48)
+    with SpooledUpload(max_bytes=len(data)) as spool:
+        reader = spool.reader()
+        spool.write(data[:10])
+        assert reader.read(4) == data[:4]
+        asyncio.run(spool_stream(_chunks(data[10:], 100), spool))
+        assert reader.read() == data[4:]
+        assert reader.seek(0, 2) == len(data)
+
+    with SpooledUpload(max_bytes=len(data) - 1) as spool, pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_stream(_chunks(data, 100), spool))
+
+
+def test_upload_slots_cap_each_user_and_the_process():
+    slots = UploadSlots(per_key=1, total=2)
+    with slots.acquire("a"):
+        with pytest.raises(UploadSlotsExhaustedError):
+            with slots.acquire("a"):
+                pass
+        with slots.acquire("b"):
+            with pytest.raises(UploadSlotsExhaustedError):
+                with slots.acquire("c"):
+                    pass
+    assert slots.in_flight() == 0
+    with slots.acquire("a"):
+        assert slots.in_flight("a") == 1
+
+
+def _wait(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_decoder_runs_while_the_body_arrives():
+    data = _encode(640, 480)
+    with SpooledUpload(max_bytes=len(data)) as spool:
+        decoder = BackgroundImageDecoder(spool, max_pixels=1_000_000)
+        spool.write(data[: len(data) // 2])
+        time.sleep(0.05)
+        assert not decoder._future.done()  # waiting on the rest of the body, not failed
+        spool.write(data[len(data) // 2:])
+        spool.finish()
+        pixels = asyncio.run(decoder.result())
+    assert pixels.shape == (480, 640, 3)
+
+
+def test_decoder_rejects_huge_or_unreadable_images_from_the_header():
+    huge = _encode(4000, 3000, "PNG")
+    with SpooledUpload(max_bytes=len(huge)) as spool:
+        decoder = BackgroundImageDecoder(spool, max_pixels=1_000_000)
+        spool.write(huge[:4096])
+        _wait(decoder._future.done)
+        with pytest.raises(ValueError, match="4000x3000"):
+            decoder.check()
+
+    with SpooledUpload(max_bytes=1000) as spool:
+        decoder = BackgroundImageDecoder(spool, max_pixels=1_000_000)
+        spool.write(b"not an image" * 10)
+        spool.finish()
+        with pytest.raises(ValueError, match="not a readable image"):
+            asyncio.run(decoder.result())
+
+
+@pytest.fixture
+def capture_client(db_session_factory, monkeypatch):
+    db = db_session_factory()
+    faculty, section, students = seed_section(db, 2, with_contacts=False)
+    embeddings = [np.eye(128, dtype=np.float32)[index] for index in range(2)]
+    for student, embedding in zip(students, embeddings):
+        db.add(StudentFaceProfile(
+            student_id=student.student_id,
+            embedding_vector=json.dumps(embedding.tolist()),
+            approval_status="approved",
+            model_name="face-recognition",
+            consent_given=True,
+        ))
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date(2026, 3, 9),
+        start_time=datetime(2026, 3, 9, 9),
+        marked_by=faculty.faculty_id,
+    )
+    db.add(session)
+    db.commit()
+
+    decoded = []
+
+    def face_locations(pixels, model):
+        decoded.append(pixels.shape)
+        return [(0, 1, 1, 0)]
+
+    fake_face_recognition = SimpleNamespace(
+        face_locations=face_locations,
+        face_encodings=lambda pixels, locations: [embeddings[0]],
+    )
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake_face_recognition))
+    monkeypatch.setattr(ai_api, "upload_slots", UploadSlots(per_key=1, total=4))
+    faculty_user = faculty.user
+
+    def _override_db():
+        yield db
+
+    test_app = FastAPI()
+    test_app.include_router(ai_api.router, prefix="/api/ai")
+    test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
+    test_app.dependency_overrides[auth_utils.get_current_user] = lambda: faculty_user
+    yield TestClient(test_app), session.session_id, faculty_user, decoded
+    db.close()
+
+
+def test_streamed_capture_is_decoded_as_it_arrives(capture_client):
+    client, session_id, _user, decoded = capture_client
+    body = _encode(80, 60)
+
+    response = client.post(
+        f"/api/ai/attendance/sessions/{session_id}/capture-photo/stream",
+        content=_sync_chunks(body, 512),
+        headers={"Content-Type": "image/jpeg"},
+        params={"captured_at": "2026-03-09T09:05:00"},
+    )
+    assert response.status_code == 200, response.text
+    assert (response.json()["present_count"], response.json()["absent_count"]) == (1, 1)
+    assert decoded == [(60, 80, 3)]
+
+    closed = client.post(f"/api/ai/attendance/sessions/{session_id}/capture-photo/stream", content=body)
+    assert closed.status_code == 400
+
+
+def _sync_chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_streamed_capture_limits(capture_client, monkeypatch):
+    client, session_id, user, _decoded = capture_client
+    url = f"/api/ai/attendance/sessions/{session_id}/capture-photo/stream"
+
+    monkeypatch.setattr(ai_api.settings, "AI_UPLOAD_MAX_BYTES", 1000)
+    assert client.post(url, content=b"x" * 1001).status_code == 413
+    assert client.post(url, content=_sync_chunks(b"x" * 1001, 100)).status_code == 413
+    monkeypatch.setattr(ai_api.settings, "AI_UPLOAD_MAX_BYTES", 1 << 20)
+
+    assert client.post(url, content=b"").status_code == 400
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.post(f"/api/ai/attendance/sessions/{missing}/capture-photo/stream", content=b"x").status_code == 404
+
+    with ai_api.upload_slots.acquire(user.user_id):
+        busy = client.post(url, content=_encode(8, 8))
+    assert busy.status_code == 429
+    assert ai_api.upload_slots.in_flight() == 0
+
+
+def test_multipart_capture_reads_the_spooled_file(capture_client):
+    client, session_id, _user, decoded = capture_client
+    response = client.post(
+        f"/api/ai/attendance/sessions/{session_id}/capture-photo",
+        files={"image_file": ("class.png", _encode(80, 60, "PNG"), "image/png")},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["matched_students"] == 1
+    assert decoded == [(60, 80, 3)]
@@ -0,0 +1,87 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.schemas.attendance import AttendanceRecordCreate
+from app.services import attendance_service, notification_dispatcher
+from app.services.notification_dispatcher import InMemoryBroker
+from conftest import seed_section
+
+
+@pytest.fixture(autouse=True)
+def broker(monkeypatch):
+    monkeypatch.setattr(notification_dispatcher, "_broker", InMemoryBroker())
+
+
+def _open_session(db, faculty, section):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date.today(),
+        start_time=datetime.utcnow(),
+        marked_by=faculty.faculty_id,
+    )
+    db.add(session)
+    db.commit()
+    return session
+
+
+@pytest.mark.parametrize("section_size", [5, 300])
+def test_bulk_marking_is_constant_in_queries(db_session, assert_max_queries, section_size):
+    faculty, section, students = seed_section(db_session, section_size, with_contacts=False)
+    session = _open_session(db_session, faculty, section)
+    session_id, faculty_id = session.session_id, faculty.faculty_id
+    payload = [
+        AttendanceRecordCreate(student_id=student.student_id, status="absent" if index % 10 == 0 else "present")
+        for index, student in enumerate(students)
+    ]
+    db_session.expire_all()
+
+    # Session, enrollments, close claim, marks upsert, stats upsert, session UPDATE, plus the
+    # four-statement notification fan-out.
+    with assert_max_queries(10):
+        result = attendance_service.mark_bulk_attendance(db_session, session_id, payload, faculty_id)
+
+    expected_absent = len(range(0, section_size, 10))
+    assert result["absent_count"] == expected_absent
+    assert result["present_count"] == section_size - expected_absent
+    assert db_session.query(AttendanceRecord).count() == section_size
+
+
+def test_upsert_updates_existing_marks_in_place(db_session):
+    faculty, section, students = seed_section(db_session, 3, with_contacts=False)
+    session = _open_session(db_session, faculty, section)
+    first, second, third = (student.student_id for student in students)
+
+    attendance_service.upsert_attendance_records(
+        db_session, session, {first: "absent", second: "absent"}, marked_by="faculty"
+    )
+    db_session.commit()
+    original_id = db_session.query(AttendanceRecord.record_id).filter(AttendanceRecord.student_id == first).scalar()
+
+    returned = attendance_service.upsert_attendance_records(
+        db_session, session, {first: "present", third: "absent"}, marked_by="faculty:review"
+    )
+    db_session.commit()
+
+    assert sorted((row.student_id, row.status) for row in returned) == sorted([(first, "present"), (third, "absent")])
+    rows = {row.student_id: row for row in db_session.query(AttendanceRecord).all()}
+    assert len(rows) == 3
+    assert rows[first].record_id == original_id
+    assert (rows[first].status, rows[first].marked_by) == ("present", "faculty:review")
+    assert rows[second].status == "absent"
+
+
+def test_duplicate_students_in_payload_keep_the_last_mark(db_session):
+    faculty, section, students = seed_section(db_session, 2, with_contacts=False)
+    session = _open_session(db_session, faculty, section)
+    student_id = students[0].student_id
+    payload = [
+        AttendanceRecordCreate(student_id=student_id, status="absent"),
+        AttendanceRecordCreate(student_id=student_id, status="present"),
+    ]
+
+    result = attendance_service.mark_bulk_attendance(db_session, session.session_id, payload, faculty.faculty_id)
+
+    assert (result["present_count"], result["absent_count"]) == (1, 0)
+    assert db_session.query(AttendanceRecord).one().status == "present"
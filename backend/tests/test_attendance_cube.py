@@ -0,0 +1,202 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import attendance
+from app.database import get_db, get_read_db
+from app.models.attendance import AttendanceCubeCell, AttendanceCubeRefresh, AttendanceSession
+from app.models.course import Course
+from app.models.user import User, UserRole
+from app.services import attendance_cube, attendance_service, notification_dispatcher
+from app.services.notification_dispatcher import OutboxDispatcher
+from app.utils import auth as auth_utils
+from conftest import seed_section
+
+SUNDAY = date(2026, 3, 8)
+MONDAY = date(2026, 3, 9)
+
+
+def _section(db, department, students=2):
+    faculty, section, students = seed_section(db, students, with_contacts=False)
+    db.query(Course).filter(Course.course_id == section.course_id).update({"department": department})
+    db.commit()
+    return section
+
+
+def _session(db, section, day, present, absent, closed_at=None, session_type="regular"):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=day,
+        start_time=datetime.combine(day, datetime.min.time()),
+        session_type=session_type,
+        is_closed=closed_at is not None,
+        end_time=closed_at,
+        closed_at=closed_at,
+        total_students=present + absent,
+        present_count=present,
+        absent_count=absent,
+    )
+    db.add(session)
+    db.commit()
+    return session
+
+
+def _cells(db):
+    return {
+        (cell.section_id, cell.week_start, cell.session_type): (cell.session_count, cell.present_count, cell.absent_count)
+        for cell in db.query(AttendanceCubeCell).all()
+    }
+
+
+def test_sessions_are_bucketed_into_monday_weeks(db_session):
+    section = _section(db_session, "CSE")
+    closed = datetime(2026, 3, 10, 12)
+    _session(db_session, section, SUNDAY, 2, 0, closed)
+    _session(db_session, section, MONDAY, 1, 1, closed)
+    attendance_cube.refresh(db_session)
+    db_session.commit()
+
+    assert attendance_cube.week_start(SUNDAY) == date(2026, 3, 2)
+    assert _cells(db_session) == {
+        (section.section_id, date(2026, 3, 2), "regular"): (1, 2, 0),
+        (section.section_id, MONDAY, "regular"): (1, 1, 1),
+    }
+
+
+def test_refresh_folds_only_newly_closed_sessions(db_session):
+    section = _section(db_session, "CSE")
+    _session(db_session, section, MONDAY, 2, 0, datetime(2026, 3, 9, 10))
+    still_open = _session(db_session, section, MONDAY, 0, 0)
+    first = attendance_cube.refresh(db_session, now=datetime(2026, 3, 9, 11))
+    db_session.commit()
+    assert (first.full, first.sessions_folded) == (True, 1)
+
+    still_open.is_closed = True
+    still_open.end_time = still_open.closed_at = datetime(2026, 3, 9, 12)
+    still_open.present_count, still_open.absent_count = 1, 1
+    _session(db_session, section, MONDAY, 1, 1, datetime(2026, 3, 9, 12), session_type="ai_face")
+    db_session.commit()
+
+    second = attendance_cube.refresh(db_session, now=datetime(2026, 3, 9, 13))
+    db_session.commit()
+    assert (second.full, second.sessions_folded) == (False, 2)
+    # Overlapping windows find the same sessions again but do not count them twice.
+    assert attendance_cube.refresh(db_session, now=datetime(2026, 3, 9, 13, 5)).sessions_folded == 0
+    db_session.commit()
+
+    incremental = _cells(db_session)
+    assert incremental == {
+        (section.section_id, MONDAY, "regular"): (2, 3, 1),
+        (section.section_id, MONDAY, "ai_face"): (1, 1, 1),
+    }
+    assert attendance_cube.refresh(db_session, full=True).sessions_folded == 3
+    db_session.commit()
+    assert _cells(db_session) == incremental
+
+
+def test_late_uploaded_capture_is_folded_by_its_close_time(db_session):
+    section = _section(db_session, "ECE")
+    assert attendance_cube.refresh(db_session, now=datetime(2026, 3, 9, 11)).full
+    db_session.commit()
+    session = _session(db_session, section, MONDAY, 2, 0)
+
+    # The photo was taken hours before the upload closed the session: end_time is old, closed_at is not.
+    attendance_service.claim_session_close(db_session, session)
+    session.end_time = datetime(2026, 3, 9, 9, 5)
+    db_session.commit()
+
+    assert attendance_cube.refresh(db_session).sessions_folded == 1
+    db_session.commit()
+    assert _cells(db_session) == {(section.section_id, MONDAY, "regular"): (1, 2, 0)}
+
+
+def test_in_process_worker_keeps_the_cube_fresh(db_session, db_session_factory, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(notification_dispatcher.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(notification_dispatcher.settings, "NOTIFICATION_BROKER", "memory")
+    monkeypatch.setattr(notification_dispatcher.settings, "ATTENDANCE_CUBE_REFRESH_SECONDS", 300.0)
+    monkeypatch.setattr(notification_dispatcher.settings, "ATTENDANCE_CUBE_FULL_REFRESH_SECONDS", 3600.0)
+    dispatcher = OutboxDispatcher(
+        db_session_factory, senders={}, periodic_jobs=notification_dispatcher._periodic_jobs(db_session_factory)
+    )
+    section = _section(db_session, "CSE")
+    _session(db_session, section, MONDAY, 2, 0, datetime.utcnow())
+
+    for elapsed in (0, 60, 300, 3600):
+        clock[0] = 1000.0 + elapsed
+        dispatcher.run_periodic_jobs()
+
+    db_session.expire_all()
+    runs = db_session.query(AttendanceCubeRefresh).order_by(AttendanceCubeRefresh.started_at).all()
+    # Startup (a first run is a full build), the 300 s refresh, then the hourly rebuild and its refresh.
+    assert sorted(run.full for run in runs) == [False, False, True, True]
+    assert attendance_cube.freshness(db_session)["refreshed_at"] is not None
+    assert _cells(db_session) == {(section.section_id, MONDAY, "regular"): (1, 2, 0)}
+
+
+def test_query_slices_and_reports_staleness(db_session):
+    cse = _section(db_session, "CSE")
+    ece = _section(db_session, "ECE")
+    closed = datetime(2026, 3, 20)
+    _session(db_session, cse, MONDAY, 3, 1, closed)
+    _session(db_session, cse, MONDAY + timedelta(days=7), 2, 2, closed)
+    _session(db_session, ece, MONDAY, 1, 3, closed)
+
+    assert attendance_cube.query_cube(db_session)["refreshed_at"] is None
+    attendance_cube.refresh(db_session)
+    db_session.commit()
+
+    by_department = attendance_cube.query_cube(db_session, group_by=["department"])
+    assert by_department["stale_seconds"] >= 0
+    assert [(row["department"], row["session_count"], row["attendance_percent"]) for row in by_department["rows"]] == [
+        ("CSE", 2, 62.5),
+        ("ECE", 1, 25.0),
+    ]
+
+    weekly = attendance_cube.query_cube(
+        db_session, group_by=["week_start"], department="CSE", week_from=MONDAY + timedelta(days=3)
+    )
+    assert [(row["week_start"], row["present_count"]) for row in weekly["rows"]] == [(MONDAY, 3), (MONDAY + timedelta(days=7), 2)]
+
+    campus = attendance_cube.query_cube(db_session, group_by=[])["rows"]
+    assert [(row["session_count"], row["enrolled_count"]) for row in campus] == [(3, 12)]
+
+    with pytest.raises(ValueError):
+        attendance_cube.query_cube(db_session, group_by=["faculty"])
+
+
+def test_analytics_api_is_admin_only(db_session_factory):
+    session = db_session_factory()
+    section = _section(session, "CSE")
+    _session(session, section, MONDAY, 1, 1, datetime(2026, 3, 9, 12))
+    admin = User(email="admin@example.com", role=UserRole.ADMIN)
+    session.add(admin)
+    session.commit()
+    current = {"user": admin}
+
+    def _override_db():
+        yield session
+
+    test_app = FastAPI()
+    test_app.include_router(attendance.router, prefix="/api/attendance")
+    test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
+    test_app.dependency_overrides[auth_utils.get_current_user] = lambda: current["user"]
+    client = TestClient(test_app)
+
+    assert client.post("/api/attendance/analytics/refresh").json()["sessions_folded"] == 1
+    body = client.get(
+        "/api/attendance/analytics", params=[("group_by", "department"), ("group_by", "session_type")]
+    ).json()
+    assert body["group_by"] == ["department", "session_type"]
+    assert body["refreshed_at"] is not None
+    assert [(row["department"], row["session_type"], row["attendance_percent"]) for row in body["rows"]] == [
+        ("CSE", "regular", 50.0)
+    ]
+    assert client.get("/api/attendance/analytics", params={"group_by": "faculty"}).status_code == 400
+
+    current["user"] = User(email="faculty@example.com", role=UserRole.FACULTY)
+    assert client.get("/api/attendance/analytics").status_code == 403
+    session.close()
@@ -0,0 +1,127 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import attendance
+from app.database import get_db, get_read_db
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.models.student import Student
+from app.services import attendance_service
+from app.utils import auth as auth_utils
+from conftest import seed_section
+
+START = datetime(2026, 2, 2, 9, 0)
+
+
+def _seed_history(db, days=10):
+    """One student attending two courses daily; every third class of the second course is missed."""
+    _faculty, first_section, (student,) = seed_section(db, 1, with_contacts=False)
+    _other_faculty, second_section, _ = seed_section(db, 0)
+    for day in range(days):
+        for offset, section in enumerate((first_section, second_section)):
+            marked_at = START + timedelta(days=day, hours=offset)
+            session = AttendanceSession(
+                section_id=section.section_id,
+                session_date=marked_at.date(),
+                start_time=marked_at,
+                is_closed=True,
+            )
+            db.add(session)
+            db.flush()
+            status = "absent" if section is second_section and day % 3 == 0 else "present"
+            db.add(AttendanceRecord(
+                session_id=session.session_id,
+                student_id=student.student_id,
+                session_date=session.session_date,
+                status=status,
+                # Both classes of a day share a timestamp every other day so pages tie-break on the id.
+                marked_at=marked_at if day % 2 else START + timedelta(days=day),
+            ))
+    db.commit()
+    return student.student_id, first_section, second_section
+
+
+def test_history_pages_are_keyset_and_complete(db_session, assert_max_queries):
+    student_id, _first, _second = _seed_history(db_session)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        with assert_max_queries(1):
+            items, cursor = attendance_service.list_student_attendance(db_session, student_id, limit=6, cursor=cursor)
+        seen.extend(items)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert len({record.record_id for record in seen}) == len(seen) == 20
+    keys = [(record.marked_at, str(record.record_id)) for record in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_history_filters_by_window_and_section(db_session):
+    student_id, first, _second = _seed_history(db_session)
+
+    items, cursor = attendance_service.list_student_attendance(
+        db_session,
+        student_id,
+        date_from=date(2026, 2, 4),
+        date_to=date(2026, 2, 6),
+        section_id=first.section_id,
+    )
+    assert cursor is None
+    assert sorted(record.marked_at.date() for record in items) == [date(2026, 2, d) for d in (4, 5, 6)]
+
+    with pytest.raises(ValueError):
+        attendance_service.list_student_attendance(
+            db_session, student_id, date_from=date(2026, 2, 6), date_to=date(2026, 2, 4)
+        )
+
+
+def test_summary_aggregates_per_course(db_session, assert_max_queries):
+    student_id, first, second = _seed_history(db_session)
+    db_session.expire_all()
+
+    with assert_max_queries(1):
+        summary = attendance_service.summarize_student_attendance(db_session, student_id, date_to=date(2026, 2, 7))
+
+    by_course = {course["course_id"]: course for course in summary["courses"]}
+    assert by_course[first.course_id]["total_count"] == 6
+    assert by_course[first.course_id]["attendance_percent"] == 100.0
+    # Days 0 and 3 missed out of six.
+    assert (by_course[second.course_id]["absent_count"], by_course[second.course_id]["total_count"]) == (2, 6)
+    assert (summary["present_count"], summary["total_count"]) == (10, 12)
+
+
+def test_history_and_summary_endpoints(db_session_factory):
+    session = db_session_factory()
+    student_id, _first, _second = _seed_history(session)
+    _faculty, _section, (classmate,) = seed_section(session, 1, with_contacts=False)
+    student = session.get(Student, student_id)
+    user = student.user
+
+    def _override_db():
+        yield session
+
+    app = FastAPI()
+    app.include_router(attendance.router, prefix="/api/attendance")
+    app.dependency_overrides[get_db] = _override_db
+    app.dependency_overrides[get_read_db] = _override_db
+    app.dependency_overrides[auth_utils.get_current_user] = lambda: user
+    client = TestClient(app)
+    try:
+        page = client.get("/api/attendance/me/history", params={"limit": 15}).json()
+        assert len(page["items"]) == 15 and page["next_cursor"]
+        rest = client.get("/api/attendance/me/history", params={"limit": 15, "cursor": page["next_cursor"]}).json()
+        assert len(rest["items"]) == 5 and rest["next_cursor"] is None
+
+        summary = client.get("/api/attendance/me/summary", params={"date_from": "2026-02-05"}).json()
+        assert summary["total_count"] == 14
+
+        assert client.get("/api/attendance/me/history", params={"cursor": "bogus"}).status_code == 400
+        other = client.get(f"/api/attendance/student/{classmate.student_id}/summary")
+        assert other.status_code == 403
+    finally:
+        session.close()
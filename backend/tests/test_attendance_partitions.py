@@ -0,0 +1,156 @@
+import gzip
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.models.attendance import AttendanceRecord, AttendanceRecordArchive, AttendanceSession, StudentSectionAttendanceStats
+from app.services import attendance_partitions, attendance_service, attendance_stats, notification_dispatcher
+from app.services.notification_dispatcher import OutboxDispatcher
+from conftest import seed_section
+
+
+def _closed_session(db, section, students, day, absent=()):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=day,
+        start_time=datetime.combine(day, datetime.min.time()),
+        is_closed=True,
+    )
+    db.add(session)
+    db.flush()
+    db.add_all(
+        AttendanceRecord(
+            session_id=session.session_id,
+            student_id=student.student_id,
+            session_date=day,
+            status="absent" if student in absent else "present",
+            marked_at=datetime.combine(day, datetime.min.time()),
+        )
+        for student in students
+    )
+    db.flush()
+    return session
+
+
+def test_month_arithmetic_and_names():
+    assert attendance_partitions.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert attendance_partitions.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    name = attendance_partitions.partition_name(date(2026, 9, 1))
+    assert name == "attendance_records_p202609"
+    assert attendance_partitions.partition_range(name) == (date(2026, 9, 1), date(2026, 10, 1))
+    assert attendance_partitions.partition_range(attendance_partitions.DEFAULT_PARTITION) is None
+
+
+def test_maintenance_is_a_no_op_without_postgres(db_session, db_session_factory):
+    assert attendance_partitions.ensure_partitions(db_session) == []
+    result = attendance_partitions.run_maintenance(db_session_factory, archive_after_months=1, archive_dir="unused")
+    assert result == {"created": [], "archived": []}
+
+
+def test_rebuild_keeps_counts_for_archived_months(db_session):
+    _faculty, old_section, old_students = seed_section(db_session, 2, with_contacts=False)
+    _faculty, live_section, live_students = seed_section(db_session, 2, with_contacts=False)
+    _closed_session(db_session, old_section, old_students, date(2024, 1, 10), absent=old_students[:1])
+    _closed_session(db_session, live_section, live_students, date(2026, 3, 2))
+    attendance_stats.rebuild(db_session)
+    db_session.commit()
+
+    # January 2024 is archived: its partition (and rows) are gone from attendance_records.
+    db_session.query(AttendanceRecord).filter(AttendanceRecord.session_date < date(2024, 2, 1)).delete()
+    db_session.add(AttendanceRecordArchive(
+        partition_name="attendance_records_p202401",
+        range_start=date(2024, 1, 1),
+        range_end=date(2024, 2, 1),
+        row_count=2,
+        location="archives/attendance/attendance_records_p202401.csv.gz",
+    ))
+    db_session.commit()
+
+    assert attendance_stats.rebuild(db_session) == 2
+    db_session.commit()
+    sections = {
+        row.section_id: row.total_count for row in db_session.query(StudentSectionAttendanceStats).all()
+    }
+    assert sections == {old_section.section_id: 1, live_section.section_id: 1}
+    assert attendance_stats.get_student_stats(db_session, old_students[0].student_id)["absent_count"] == 1
+
+
+def test_history_window_is_on_the_class_date(db_session):
+    _faculty, section, (student,) = seed_section(db_session, 1, with_contacts=False)
+    session = _closed_session(db_session, section, [student], date(2026, 3, 31))
+    # Marked after midnight, a day after the class.
+    record = db_session.query(AttendanceRecord).filter(AttendanceRecord.session_id == session.session_id).one()
+    record.marked_at = datetime(2026, 4, 1, 0, 30)
+    db_session.commit()
+
+    march, _ = attendance_service.list_student_attendance(
+        db_session, student.student_id, date_from=date(2026, 3, 1), date_to=date(2026, 3, 31)
+    )
+    april, _ = attendance_service.list_student_attendance(
+        db_session, student.student_id, date_from=date(2026, 4, 1), date_to=date(2026, 4, 30)
+    )
+    assert [row.record_id for row in march] == [record.record_id]
+    assert april == []
+
+
+def test_archive_exports_before_taking_the_parent_lock(tmp_path):
+    statements = []
+
+    class _Cursor:
+        rowcount = 2
+
+        def copy_expert(self, sql, stream):
+            statements.append(sql)
+            stream.write("record_id,session_date\n1,2024-01-08\n2,2024-01-09\n")
+
+        def close(self):
+            pass
+
+    class _Db:
+        def execute(self, statement, *args):
+            statements.append(str(statement))
+
+        def connection(self):
+            return SimpleNamespace(connection=SimpleNamespace(cursor=_Cursor))
+
+        def merge(self, archive):
+            return archive
+
+    archive = attendance_partitions.archive_partition(_Db(), "attendance_records_p202401", str(tmp_path))
+
+    assert [statement.split(" (")[0] for statement in statements] == [
+        "LOCK TABLE attendance_records_p202401 IN SHARE MODE",
+        "COPY attendance_records_p202401 TO STDOUT WITH",
+        f"SET LOCAL lock_timeout = '{attendance_partitions.DETACH_LOCK_TIMEOUT}'",
+        "ALTER TABLE attendance_records DETACH PARTITION attendance_records_p202401",
+        "DROP TABLE attendance_records_p202401",
+    ]
+    assert (archive.row_count, archive.range_start) == (2, date(2024, 1, 1))
+    with gzip.open(archive.location, "rt") as stream:
+        assert stream.read().count("\n") == 3
+
+
+def test_in_process_worker_schedules_partition_maintenance(db_session_factory, monkeypatch):
+    clock = [1000.0]
+    runs = []
+    monkeypatch.setattr(notification_dispatcher.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(attendance_partitions, "run_maintenance", lambda factory, **kwargs: runs.append(kwargs))
+    monkeypatch.setattr(notification_dispatcher.settings, "NOTIFICATION_BROKER", "memory")
+    monkeypatch.setattr(notification_dispatcher.settings, "ATTENDANCE_PARTITION_MAINTENANCE_SECONDS", 3600.0)
+    dispatcher = OutboxDispatcher(
+        db_session_factory, senders={}, periodic_jobs=notification_dispatcher._periodic_jobs(db_session_factory)
+    )
+
+    dispatcher.run_periodic_jobs()
+    clock[0] += 600
+    dispatcher.run_periodic_jobs()
+    assert len(runs) == 1  # on startup, then throttled
+    assert runs[0]["months_ahead"] == notification_dispatcher.settings.ATTENDANCE_PARTITION_MONTHS_AHEAD
+    clock[0] += 3600
+    dispatcher.run_periodic_jobs()
+    assert len(runs) == 2
+
+    # Celery beat owns the schedule when the broker is Celery.
+    monkeypatch.setattr(notification_dispatcher.settings, "NOTIFICATION_BROKER", "celery")
+    for job in notification_dispatcher._periodic_jobs(db_session_factory):
+        job()
+    assert len(runs) == 2
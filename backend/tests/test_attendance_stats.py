@@ -0,0 +1,101 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models.attendance import AttendanceSession, StudentSectionAttendanceStats
+from app.schemas.attendance import AttendanceRecordCreate
+from app.services import ai_service, attendance_service, attendance_stats, notification_dispatcher
+from app.services.notification_dispatcher import InMemoryBroker
+from conftest import seed_section
+
+
+@pytest.fixture(autouse=True)
+def broker(monkeypatch):
+    monkeypatch.setattr(notification_dispatcher, "_broker", InMemoryBroker())
+
+
+def _close(db, faculty, section, students, absent):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date.today(),
+        start_time=datetime.utcnow(),
+        marked_by=faculty.faculty_id,
+    )
+    db.add(session)
+    db.commit()
+    payload = [
+        AttendanceRecordCreate(student_id=student.student_id, status="absent" if student in absent else "present")
+        for student in students
+    ]
+    attendance_service.mark_bulk_attendance(db, session.session_id, payload, faculty.faculty_id)
+
+
+def _snapshot(db):
+    return {
+        (row.student_id, row.section_id): (row.present_count, row.total_count, round(row.attendance_percent, 2))
+        for row in db.query(StudentSectionAttendanceStats).all()
+    }
+
+
+def test_closing_sessions_updates_counts_incrementally(db_session):
+    faculty, section, (steady, shaky, gone) = seed_section(db_session, 3, with_contacts=False)
+    students = [steady, shaky, gone]
+    _close(db_session, faculty, section, students, absent=[shaky, gone])
+    _close(db_session, faculty, section, students, absent=[gone])
+    _close(db_session, faculty, section, students, absent=[shaky, gone])
+    _close(db_session, faculty, section, students, absent=[])
+
+    stats = attendance_stats.get_student_stats(db_session, shaky.student_id)
+    assert (stats["present_count"], stats["total_count"], stats["attendance_percent"]) == (2, 4, 50.0)
+    assert stats["sections"][0]["section_id"] == section.section_id
+
+    snapshot = _snapshot(db_session)
+    assert snapshot[(gone.student_id, section.section_id)] == (1, 4, 25.0)
+
+    # The rebuild job recomputes the same numbers from raw records.
+    assert attendance_stats.rebuild(db_session) == 3
+    db_session.commit()
+    assert _snapshot(db_session) == snapshot
+
+
+def test_risk_students_come_from_the_rollup(db_session, assert_max_queries):
+    faculty, section, (steady, shaky, gone) = seed_section(db_session, 3, with_contacts=False)
+    students = [steady, shaky, gone]
+    for absent in ([shaky, gone], [gone], [gone], []):
+        _close(db_session, faculty, section, students, absent=absent)
+    section_id = section.section_id
+
+    with assert_max_queries(1):
+        risk = attendance_stats.list_risk_students(db_session, [section_id], threshold=80.0)
+    assert [(item["student_id"], item["attendance_percent"]) for item in risk] == [
+        (gone.student_id, 25.0),
+        (shaky.student_id, 75.0),
+    ]
+
+    insights = ai_service.get_faculty_attendance_ai_insights(db_session, faculty.faculty_id, low_attendance_threshold=80.0)
+    assert [item["student_id"] for item in insights["risk_students"]] == [gone.student_id, shaky.student_id]
+    assert insights["risk_students"][0]["dropout_risk_percent"] == round(min(99.0, 55 * 1.8 + 10), 2)
+
+
+def test_a_session_is_folded_into_the_counts_once(db_session, db_session_factory):
+    faculty, section, students = seed_section(db_session, 2, with_contacts=False)
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date.today(),
+        start_time=datetime.utcnow(),
+        marked_by=faculty.faculty_id,
+    )
+    db_session.add(session)
+    db_session.commit()
+    session_id, faculty_id = session.session_id, faculty.faculty_id
+    assert session.is_closed is False  # loaded: this request read the session while it was still open
+    payload = [AttendanceRecordCreate(student_id=student.student_id, status="present") for student in students]
+
+    # A double-click: the first submit closes the session while the second has already passed its check.
+    with db_session_factory() as first:
+        attendance_service.mark_bulk_attendance(first, session_id, payload, faculty_id)
+    with pytest.raises(ValueError, match="already closed"):
+        attendance_service.mark_bulk_attendance(db_session, session_id, payload, faculty_id)
+
+    db_session.expire_all()
+    assert {counts[:2] for counts in _snapshot(db_session).values()} == {(1, 1)}
@@ -7,7 +7,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
 
 from app.api import attendance, auth, food, remedial, student
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services import food_service, remedial_service, student_service
 from app.utils import auth as auth_utils
 
@@ -36,6 +36,7 @@ def app():
     test_app.include_router(remedial.router, prefix="/api/remedial", tags=["Remedial Classes"])
     test_app.include_router(student.router, prefix="/api/students", tags=["Student Management"])
     test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
     return test_app
 
 
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+
+from app.database import build_engine
+from app.utils.db_metrics import (
+    InstrumentedQueuePool,
+    build_pool_saturation_guard,
+    is_pool_saturated,
+    pool_snapshot,
+)
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    engine = build_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_snapshot_tracks_checked_out_connections(small_engine):
+    with small_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        snapshot = pool_snapshot(small_engine.pool)
+        assert snapshot["checked_out"] == 1
+        assert snapshot["max_connections"] == 1
+
+    snapshot = pool_snapshot(small_engine.pool)
+    assert snapshot["checked_out"] == 0
+    assert snapshot["wait_seconds"]["count"] == 1
+
+
+def test_checkout_timeout_is_counted(small_engine):
+    with small_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            small_engine.connect()
+
+    assert small_engine.pool.metrics.checkout_timeouts == 1
+    assert small_engine.pool.metrics.waiters == 0
+
+
+def test_pre_ping_failure_is_counted(small_engine, monkeypatch):
+    with small_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    monkeypatch.setattr(small_engine.dialect, "do_ping", lambda _dbapi_connection: False)
+    with small_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert small_engine.pool.metrics.pre_ping_failures == 1
+
+
+def test_metrics_survive_engine_dispose(small_engine):
+    metrics = small_engine.pool.metrics
+    small_engine.dispose()
+    assert small_engine.pool.metrics is metrics
+
+
+def test_guard_sheds_requests_when_pool_saturated(small_engine):
+    app = FastAPI()
+    app.middleware("http")(build_pool_saturation_guard(lambda: small_engine.pool, max_waiters=1))
+
+    @app.get("/work")
+    def work():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/work").status_code == 200
+
+    with small_engine.connect():
+        small_engine.pool.metrics.checkout_started()
+        try:
+            assert is_pool_saturated(small_engine.pool, max_waiters=1)
+            response = client.get("/work")
+        finally:
+            small_engine.pool.metrics.checkout_finished(0.0)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert small_engine.pool.metrics.shed_requests == 1
@@ -0,0 +1,141 @@
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.ai import backends
+from app.ai.backends import DlibBackend, OnnxArcFaceBackend
+from app.models.ai import StudentFaceProfile
+from app.models.attendance import AttendanceSession
+from app.services import ai_service
+from conftest import seed_section
+
+
+class _CountingBackend(backends.FaceBackend):
+    loads = 0
+
+    def __init__(self, name):
+        self.name = name
+        self.embedding_model = name
+
+    def load(self):
+        _CountingBackend.loads += 1
+
+
+class _MissingBackend(backends.FaceBackend):
+    def load(self):
+        raise RuntimeError("not installed")
+
+
+def test_registry_loads_each_backend_once(monkeypatch):
+    monkeypatch.setattr(backends, "_factories", dict(backends._factories))
+    monkeypatch.setattr(backends, "_loaded", {})
+    backends.register_backend("counting", lambda: _CountingBackend("counting"))
+    backends.register_backend("missing", _MissingBackend)
+
+    first = backends.get_backend("counting")
+    assert backends.get_backend("counting") is first
+    assert _CountingBackend.loads == 1
+    assert {"dlib-hog", "dlib-cnn", "onnx-arcface", "counting"} <= set(backends.backend_names())
+
+    with pytest.raises(RuntimeError, match="not installed"):
+        backends.get_backend("missing")
+    with pytest.raises(RuntimeError, match="Unknown face backend"):
+        backends.get_backend("no-such-backend")
+
+    monkeypatch.setattr(ai_service.settings, "AI_FACE_BACKEND", "missing")
+    assert ai_service.get_face_backend() is None
+
+
+def test_cnn_detector_batches_same_sized_frames():
+    calls = []
+    fake = SimpleNamespace(
+        face_locations=lambda pixels, model: calls.append(("single", model)) or [[0, 2, 2, 0]],
+        batch_face_locations=lambda images, batch_size: calls.append(("batch", batch_size)) or [[[0, 2, 2, 0]]] * len(images),
+        face_encodings=lambda pixels, boxes: [np.ones(128) for _ in boxes],
+    )
+    frames = [np.zeros((4, 4, 3), dtype=np.uint8)] * 3
+
+    results = DlibBackend("cnn", face_recognition=fake).embed(frames)
+    assert calls == [("batch", 3)]
+    assert [len(embeddings) for _boxes, embeddings in results] == [1, 1, 1]
+
+    DlibBackend("hog", face_recognition=fake).embed(frames)
+    assert calls[1:] == [("single", "hog")] * 3
+
+
+def test_onnx_backend_embeds_every_crop_in_one_run(tmp_path, monkeypatch):
+    runs = []
+
+    class _Session:
+        def __init__(self, path, sess_options, providers):
+            assert providers == ["CPUExecutionProvider"]
+
+        def get_inputs(self):
+            return [SimpleNamespace(name="input.1")]
+
+        def run(self, outputs, feeds):
+            batch = feeds["input.1"]
+            runs.append(batch.shape)
+            return [np.tile(batch[:, 0, 0, :1], (1, 512))]
+
+    fake_onnxruntime = SimpleNamespace(SessionOptions=lambda: SimpleNamespace(), InferenceSession=_Session)
+    monkeypatch.setattr(backends, "load_onnxruntime", lambda: fake_onnxruntime)
+    model = tmp_path / "w600k_mbf.onnx"
+    model.write_bytes(b"onnx")
+    backend = OnnxArcFaceBackend(str(model))
+    backend._detector = DlibBackend(face_recognition=SimpleNamespace(
+        face_locations=lambda pixels, model: [(0, 20, 20, 0), (20, 40, 40, 20)][: int(pixels[0, 0, 0])],
+    ))
+    backend.load()
+
+    frames = [np.full((40, 40, 3), faces, dtype=np.uint8) for faces in (2, 0, 1)]
+    results = backend.embed(frames)
+
+    assert runs == [(3, 3, 112, 112)]
+    assert [len(boxes) for boxes, _embeddings in results] == [2, 0, 1]
+    assert [len(embeddings) for _boxes, embeddings in results] == [2, 0, 1]
+    assert results[0][1][0].shape == (512,)
+    assert backend.embedding_model == "onnx-w600k_mbf"
+
+    monkeypatch.setattr(backends, "load_onnxruntime", lambda: None)
+    with pytest.raises(RuntimeError, match="onnxruntime"):
+        OnnxArcFaceBackend(str(model)).load()
+
+
+def test_capture_only_matches_profiles_from_the_backend_embedding_space(db_session, monkeypatch):
+    faculty, section, (student,) = seed_section(db_session, 1, with_contacts=False)
+    embedding = np.eye(128, dtype=np.float32)[0]
+    db_session.add(StudentFaceProfile(
+        student_id=student.student_id,
+        embedding_vector=json.dumps(embedding.tolist()),
+        approval_status="approved",
+        consent_given=True,
+        model_name="hash-fallback",
+    ))
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date(2026, 3, 9),
+        start_time=datetime(2026, 3, 9, 9),
+        marked_by=faculty.faculty_id,
+    )
+    db_session.add(session)
+    db_session.commit()
+    fake = SimpleNamespace(
+        face_locations=lambda pixels, model: [(0, 1, 1, 0)],
+        face_encodings=lambda pixels, boxes: [embedding],
+    )
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+
+    with pytest.raises(ValueError, match="No approved face profiles"):
+        ai_service.capture_attendance_from_photo(
+            db_session, session.session_id, faculty.faculty_id, np.zeros((4, 4, 3), dtype=np.uint8)
+        )
+
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: None)
+    with pytest.raises(RuntimeError, match="dependencies"):
+        ai_service.capture_attendance_from_photo(
+            db_session, session.session_id, faculty.faculty_id, np.zeros((4, 4, 3), dtype=np.uint8)
+        )
@@ -0,0 +1,83 @@
+import io
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+from app.ai.backends import DlibBackend
+from app.models.ai import StudentFaceProfile
+from app.models.attendance import AttendanceSession
+from app.services import ai_service
+from app.utils.lru_cache import LRUCache
+from conftest import seed_section
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.get_or_compute("a", lambda: -1) == 1
+    assert cache.get_or_compute("b", lambda: 20) == 20
+    assert (len(cache), cache.hits, cache.misses) == (2, 2, 4)
+    assert LRUCache(max_entries=0).get_or_compute("a", lambda: 5) == 5
+
+
+def _photo(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_retried_capture_only_rematches(db_session, monkeypatch):
+    faculty, section, students = seed_section(db_session, 2, with_contacts=False)
+    embeddings = [np.eye(128, dtype=np.float32)[index] for index in range(2)]
+    for student, embedding in zip(students, embeddings):
+        db_session.add(StudentFaceProfile(
+            student_id=student.student_id,
+            embedding_vector=json.dumps(embedding.tolist()),
+            approval_status="approved",
+            model_name="face-recognition",
+            consent_given=True,
+        ))
+    sessions = []
+    for _ in range(2):
+        session = AttendanceSession(
+            section_id=section.section_id,
+            session_date=date(2026, 3, 9),
+            start_time=datetime(2026, 3, 9, 9),
+            marked_by=faculty.faculty_id,
+        )
+        db_session.add(session)
+        sessions.append(session)
+    db_session.commit()
+
+    detector_runs = []
+    # A face that is 0.8-similar to the first student's profile.
+    face = 0.8 * embeddings[0] + 0.6 * np.eye(128, dtype=np.float32)[5]
+
+    def face_locations(pixels, model):
+        detector_runs.append(model)
+        return [(0, 1, 1, 0)]
+
+    fake = SimpleNamespace(face_locations=face_locations, face_encodings=lambda pixels, locations: [face])
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+    photo = _photo((10, 20, 30))
+
+    strict = ai_service.capture_attendance_from_photo(
+        db_session, sessions[0].session_id, faculty.faculty_id, photo, confidence_threshold=0.9
+    )
+    relaxed = ai_service.capture_attendance_from_photo(
+        db_session, sessions[1].session_id, faculty.faculty_id, io.BytesIO(photo), confidence_threshold=0.75
+    )
+
+    assert (strict["matched_students"], relaxed["matched_students"]) == (0, 1)
+    assert detector_runs == ["hog"]
+    assert ai_service.face_detections.hits == 1
+
+    ai_service._extract_multi_face_embeddings(_photo((10, 20, 31)))
+    assert len(detector_runs) == 2
@@ -0,0 +1,91 @@
+import io
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.ai import face_quality
+from app.ai.backends import DlibBackend
+from app.models.ai import StudentFaceProfile
+from app.services import ai_service
+from conftest import seed_section
+
+GOOD, BLURRY, OUTLIER, TURNED = range(4)
+FACE_BOX = (10, 190, 190, 10)
+
+
+def _sample(kind, number):
+    """A 200 px photo: a sharp checkerboard (or flat grey when blurry), tagged in its corner pixel."""
+    if kind == BLURRY:
+        pixels = np.full((200, 200, 3), 128, dtype=np.uint8)
+    else:
+        tiles = (np.indices((200, 200)).sum(axis=0) // 4) % 2
+        pixels = np.repeat((tiles * 255).astype(np.uint8)[..., None], 3, axis=2)
+    pixels[0, 0] = (kind * 40, number * 10, 0)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_detector(monkeypatch):
+    def face_encodings(pixels, locations):
+        kind, number = int(pixels[0, 0, 0]) // 40, int(pixels[0, 0, 1]) // 10
+        base = np.eye(128)[1 if kind == OUTLIER else 0]
+        return [base + 0.05 * np.eye(128)[10 + number]]
+
+    def face_landmarks(pixels, locations, model):
+        nose_x = 130 if int(pixels[0, 0, 0]) // 40 == TURNED else 100
+        return [{"left_eye": [(70, 80)], "right_eye": [(130, 80)], "nose_tip": [(nose_x, 110)]}]
+
+    fake = SimpleNamespace(
+        face_locations=lambda pixels, model: [FACE_BOX],
+        face_encodings=face_encodings,
+        face_landmarks=face_landmarks,
+    )
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+
+
+def test_quality_scores():
+    sharp = np.indices((40, 40)).sum(axis=0) % 2 * 255
+    photo = np.repeat(sharp.astype(np.uint8)[..., None], 3, axis=2)
+    assert face_quality.sharpness(photo, (0, 40, 40, 0)) > 1000
+    assert face_quality.sharpness(np.zeros_like(photo), (0, 40, 40, 0)) == 0.0
+    assert face_quality.face_pixels((10, 90, 70, 20)) == 60
+    assert face_quality.yaw_proxy({"left_eye": [(0, 0)], "right_eye": [(10, 0)], "nose_tip": [(8, 5)]}) == 0.3
+    assert face_quality.yaw_proxy({"left_eye": [(0, 0)]}) is None
+
+    unit = np.eye(3)
+    assert face_quality.medoid_distances([unit[0], unit[0], unit[1]]) == [0.0, 0.0, 1.0]
+
+
+def test_enrollment_drops_low_quality_samples(db_session, fake_detector):
+    _faculty, _section, (student,) = seed_section(db_session, 1, with_contacts=False)
+    samples = [_sample(kind, number) for number, kind in enumerate([GOOD, BLURRY, GOOD, OUTLIER, GOOD, TURNED, GOOD])]
+
+    result = ai_service.enroll_face_profile(db_session, student.student_id, samples, consent_given=True)
+
+    assert (result["sample_count"], result["rejected_samples"]) == (4, 3)
+    reasons = {stats["index"]: stats.get("reason") for stats in result["quality_stats"]}
+    assert reasons == {
+        0: None, 1: "too blurry", 2: None, 3: "does not match the other samples", 4: None, 5: "not facing the camera", 6: None,
+    }
+    profile = db_session.query(StudentFaceProfile).filter(StudentFaceProfile.student_id == student.student_id).one()
+    stored = json.loads(profile.quality_stats)
+    assert [stats["accepted"] for stats in stored] == [True, False, True, False, True, False, True]
+    assert stored[0]["face_pixels"] == 180 and stored[0]["medoid_distance"] < face_quality.MAX_MEDOID_DISTANCE
+    assert json.loads(profile.embedding_vector)[0] > 0.99
+
+
+def test_enrollment_fails_when_too_few_samples_pass(db_session, fake_detector):
+    _faculty, _section, (student,) = seed_section(db_session, 1, with_contacts=False)
+    samples = [_sample(kind, number) for number, kind in enumerate([GOOD, BLURRY, GOOD, BLURRY, BLURRY])]
+    samples.append(b"not a photo")
+
+    with pytest.raises(ValueError, match="Only 2 of 6 images passed quality checks") as failure:
+        ai_service.enroll_face_profile(db_session, student.student_id, samples, consent_given=True)
+    assert "image 2: too blurry" in str(failure.value)
+    assert "image 6: Uploaded file is not a readable image" in str(failure.value)
+    assert db_session.query(StudentFaceProfile).count() == 0
@@ -0,0 +1,114 @@
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.ai import face_matching, face_quality
+from app.ai.backends import DlibBackend
+from app.models.ai import StudentFaceProfile
+from app.models.attendance import AttendanceSession
+from app.services import ai_service
+from conftest import seed_section
+
+
+def _unit(vector):
+    return vector / np.linalg.norm(vector)
+
+
+def _looks(rng, identity, offsets, per_look):
+    return [_unit(identity + offset + rng.normal(scale=0.02, size=128)) for offset in offsets for _ in range(per_look)]
+
+
+def test_prototypes_separate_distinct_looks():
+    rng = np.random.default_rng(1)
+    identity = rng.normal(size=128)
+    glasses = rng.normal(size=128)
+    samples = _looks(rng, identity, [0, glasses], per_look=4)
+
+    prototypes = face_matching.build_prototypes(samples, 3)
+    assert prototypes.dtype == np.float32 and 2 <= len(prototypes) <= 3
+    for sample in samples:
+        assert float((prototypes @ sample).max()) > 0.95
+    assert len(face_matching.build_prototypes(samples, 1)) == 1
+
+    packed = face_matching.pack_prototypes(prototypes)
+    assert np.array_equal(face_matching.unpack_prototypes(packed, len(prototypes)), prototypes)
+
+
+def test_a_lone_outlier_never_becomes_its_own_prototype():
+    rng = np.random.default_rng(11)
+    identity = rng.normal(size=128)
+    samples = [_unit(identity + rng.normal(scale=0.15, size=128)) for _ in range(5)]
+    samples.append(_unit(identity + rng.normal(scale=0.45, size=128)))  # looser, but inside the medoid gate
+    assert face_quality.medoid_distances(samples)[-1] < face_quality.MAX_MEDOID_DISTANCE
+
+    def _cluster_sizes(prototypes):
+        return np.bincount(np.argmax(np.vstack(samples) @ prototypes.T, axis=1), minlength=len(prototypes))
+
+    assert 1 in _cluster_sizes(face_matching.build_prototypes(samples, 3, min_members=1))
+    prototypes = face_matching.build_prototypes(samples, 3)
+    assert _cluster_sizes(prototypes).min() >= 2
+
+
+def test_gallery_matches_the_per_prototype_loop():
+    rng = np.random.default_rng(2)
+    roster = {f"s{index}": _unit(rng.normal(size=(rng.integers(1, 4), 128))) for index in range(25)}
+    detections = [_unit(rng.normal(size=128)) for _ in range(12)]
+
+    matches = face_matching.PrototypeGallery(roster).best_matches(detections)
+
+    for detection, (student_id, similarity) in zip(detections, matches):
+        scores = {key: float((prototypes @ detection).max()) for key, prototypes in roster.items()}
+        expected = max(scores, key=scores.get)
+        assert student_id == expected
+        assert abs(similarity - scores[expected]) < 1e-5
+    assert face_matching.PrototypeGallery({}).best_matches(detections[:1]) == [(None, -1.0)]
+
+
+def test_capture_matches_a_look_the_average_would_miss(db_session, monkeypatch):
+    faculty, section, (student, other) = seed_section(db_session, 2, with_contacts=False)
+    rng = np.random.default_rng(3)
+    identity, glasses = rng.normal(size=128), 2.0 * rng.normal(size=128)
+    samples = _looks(rng, identity, [0, glasses], per_look=3)
+    prototypes = face_matching.build_prototypes(samples, 3)
+    average = _unit(np.mean(samples, axis=0))
+    with_glasses = _unit(identity + glasses)
+    assert float(average @ with_glasses) < 0.9 < float((prototypes @ with_glasses).max())
+
+    db_session.add_all([
+        StudentFaceProfile(
+            student_id=student.student_id,
+            embedding_vector=json.dumps(average.tolist()),
+            prototype_vectors=face_matching.pack_prototypes(prototypes),
+            prototype_count=len(prototypes),
+            approval_status="approved",
+            model_name="face-recognition",
+            consent_given=True,
+        ),
+        StudentFaceProfile(
+            student_id=other.student_id,
+            embedding_vector=json.dumps(_unit(rng.normal(size=128)).tolist()),
+            approval_status="approved",
+            model_name="face-recognition",
+            consent_given=True,
+        ),
+    ])
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date(2026, 3, 9),
+        start_time=datetime(2026, 3, 9, 9),
+        marked_by=faculty.faculty_id,
+    )
+    db_session.add(session)
+    db_session.commit()
+    fake = SimpleNamespace(
+        face_locations=lambda pixels, model: [(0, 1, 1, 0)],
+        face_encodings=lambda pixels, locations: [with_glasses],
+    )
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+
+    result = ai_service.capture_attendance_from_photo(
+        db_session, session.session_id, faculty.faculty_id, np.zeros((4, 4, 3), dtype=np.uint8), confidence_threshold=0.9
+    )
+    assert result["matched_registration_numbers"] == [student.registration_number]
@@ -0,0 +1,68 @@
+import base64
+import io
+import json
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.ai.backends import DlibBackend
+from app.ai.face_recognition_service import FaceRecognitionService
+from app.services import ai_service
+from conftest import seed_section
+
+
+def _photo(faces):
+    """A small PNG whose corner pixel tells the fake detector how many faces it holds."""
+    pixels = np.zeros((20, 20, 3), dtype=np.uint8)
+    pixels[0, 0, 0] = faces
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_detector(monkeypatch):
+    axes = np.eye(128)
+    fake = SimpleNamespace(
+        face_locations=lambda pixels, model: [(0, 1, 1, 0)] * int(pixels[0, 0, 0]),
+        face_encodings=lambda pixels, boxes: [axes[index] for index in range(len(boxes))],
+    )
+    monkeypatch.setattr(ai_service, "get_face_backend", lambda: DlibBackend(face_recognition=fake))
+    return axes
+
+
+def test_base64_images_decode_into_memory():
+    photo = _photo(1)
+    encoded = base64.b64encode(photo).decode()
+
+    assert FaceRecognitionService.process_base64_image(encoded).getvalue() == photo
+    assert FaceRecognitionService.process_base64_image(f"data:image/png;base64,{encoded}").getvalue() == photo
+    with pytest.raises(ValueError, match="not valid base64"):
+        FaceRecognitionService.process_base64_image("data:image/png;base64,@@@")
+
+
+def test_enroll_and_mark_attendance_from_memory(db_session, fake_detector, assert_max_queries):
+    _faculty, section, students = seed_section(db_session, 3, with_contacts=False)
+    FaceRecognitionService.enroll_student_face(db_session, students[0].student_id, io.BytesIO(_photo(1)))
+    assert json.loads(students[0].face_encoding)[0] == pytest.approx(1.0)
+    students[1].face_encoding = json.dumps(fake_detector[1].tolist())
+    db_session.commit()
+
+    with pytest.raises(ValueError, match="Multiple faces"):
+        FaceRecognitionService.enroll_student_face(db_session, students[2].student_id, _photo(2))
+    with pytest.raises(LookupError):
+        FaceRecognitionService.enroll_student_face(db_session, uuid.uuid4(), _photo(1))
+
+    section_id, present_ids = section.section_id, [str(student.student_id) for student in students[:2]]
+    class_photo = base64.b64encode(_photo(3)).decode()
+    with assert_max_queries(1):
+        result = FaceRecognitionService.mark_attendance_from_image(
+            db_session, section_id, FaceRecognitionService.process_base64_image(class_photo)
+        )
+
+    assert (result["total_faces_detected"], result["students_recognized"], result["unrecognized_faces"]) == (3, 2, 1)
+    assert [entry["student_id"] for entry in result["present_students"]] == present_ids
+    assert result["present_students"][0]["confidence"] == 100.0
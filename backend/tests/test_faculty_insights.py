@@ -0,0 +1,140 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.models.course import CourseSection
+from app.schemas.attendance import AttendanceRecordCreate, AttendanceSessionCreate
+from app.services import ai_service, attendance_service, insights_cache, notification_dispatcher
+from app.services.notification_dispatcher import InMemoryBroker
+from app.utils.ttl_cache import TTLCache
+from conftest import seed_section
+
+START = date(2026, 3, 2)
+
+
+@pytest.fixture(autouse=True)
+def broker(monkeypatch):
+    monkeypatch.setattr(notification_dispatcher, "_broker", InMemoryBroker())
+
+
+def _seed_ai_sessions(db, faculty, section, students, days, confidences):
+    for day in range(days):
+        session_date = START + timedelta(days=day)
+        session = AttendanceSession(
+            section_id=section.section_id,
+            session_date=session_date,
+            start_time=datetime.combine(session_date, datetime.min.time()),
+            session_type="ai_face",
+            is_closed=True,
+            marked_by=faculty.faculty_id,
+            total_students=len(students),
+            present_count=day % (len(students) + 1),
+        )
+        db.add(session)
+        db.flush()
+        db.add_all(
+            AttendanceRecord(
+                session_id=session.session_id,
+                student_id=student.student_id,
+                session_date=session_date,
+                status="present" if confidence is not None else "absent",
+                confidence_score=confidence,
+            )
+            for student, confidence in zip(students, confidences)
+        )
+    db.commit()
+
+
+def test_insights_are_aggregated_in_sql(db_session, assert_max_queries):
+    faculty, section, students = seed_section(db_session, 4, with_contacts=False)
+    _seed_ai_sessions(db_session, faculty, section, students, days=9, confidences=[0.9, 0.6, 0.5, None])
+    faculty_id = faculty.faculty_id
+
+    with assert_max_queries(4):
+        insights = ai_service._compute_faculty_insights(db_session, faculty_id, 75.0)
+
+    assert insights["ai_sessions_count"] == 9
+    assert insights["ai_attendance_accuracy_percent"] == round((0.9 + 0.6 + 0.5) / 3 * 100, 2)
+    assert insights["proxy_detection_alerts"] == 9 * 2
+    # The seven most recent sessions, oldest first.
+    assert [point["date"] for point in insights["trend_graph"]] == [
+        (START + timedelta(days=day)).isoformat() for day in range(2, 9)
+    ]
+    assert insights["trend_graph"][-1]["present_rate"] == round(8 % 5 / 4 * 100, 2)
+
+
+def test_query_count_does_not_grow_with_sections(db_session, assert_max_queries):
+    faculty, section, students = seed_section(db_session, 3, with_contacts=False)
+    for _ in range(11):
+        extra = CourseSection(course_id=section.course_id, faculty_id=faculty.faculty_id, section_name="K2")
+        db_session.add(extra)
+        db_session.flush()
+        _seed_ai_sessions(db_session, faculty, extra, students, days=3, confidences=[0.8, 0.7, 0.6])
+    faculty_id = faculty.faculty_id
+
+    with assert_max_queries(4):
+        insights = ai_service._compute_faculty_insights(db_session, faculty_id, 75.0)
+    assert insights["ai_sessions_count"] == 33
+
+
+def test_cached_until_a_session_closes(db_session, assert_max_queries):
+    faculty, section, students = seed_section(db_session, 2, with_contacts=False)
+    faculty_id = faculty.faculty_id
+    first = ai_service.get_faculty_attendance_ai_insights(db_session, faculty_id)
+    assert first["trend_graph"] == []
+
+    with assert_max_queries(0):
+        assert ai_service.get_faculty_attendance_ai_insights(db_session, faculty_id) is first
+
+    session = attendance_service.create_session(
+        db_session,
+        AttendanceSessionCreate(section_id=section.section_id, session_date=START),
+        faculty_id,
+    )
+    # Opening a session does not change the dashboard; closing one does.
+    assert ai_service.get_faculty_attendance_ai_insights(db_session, faculty_id) is first
+    attendance_service.mark_bulk_attendance(
+        db_session,
+        session.session_id,
+        [AttendanceRecordCreate(student_id=student.student_id, status="present") for student in students],
+        faculty_id,
+    )
+
+    refreshed = ai_service.get_faculty_attendance_ai_insights(db_session, faculty_id)
+    assert [point["present_rate"] for point in refreshed["trend_graph"]] == [100.0]
+
+
+def test_rolled_back_close_keeps_the_cache(db_session):
+    faculty, _section, _students = seed_section(db_session, 1, with_contacts=False)
+    first = ai_service.get_faculty_attendance_ai_insights(db_session, faculty.faculty_id)
+
+    insights_cache.session_closed(db_session, faculty.faculty_id)
+    db_session.rollback()
+    db_session.commit()
+
+    assert ai_service.get_faculty_attendance_ai_insights(db_session, faculty.faculty_id) is first
+
+
+def test_ttl_cache_expiry_and_stale_writes():
+    now = [0.0]
+    cache = TTLCache(ttl_seconds=10, clock=lambda: now[0])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute(("a", 1), compute) == 1
+    assert cache.get_or_compute(("a", 1), compute) == 1
+    now[0] = 11
+    assert cache.get_or_compute(("a", 1), compute) == 2
+
+    # A value computed across an invalidation is returned but not stored.
+    def racing_compute():
+        cache.invalidate("a")
+        return "stale"
+
+    now[0] = 30
+    assert cache.get_or_compute(("a", 1), racing_compute) == "stale"
+    assert cache.get_or_compute(("a", 1), compute) == 3
@@ -0,0 +1,75 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.models.notification import NotificationDigestEvent, NotificationOutbox
+from app.services import notification_digest
+from app.services.notification_service import NotificationService
+from conftest import seed_section
+
+
+@pytest.fixture
+def digest_mode(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_ENABLED", True)
+    monkeypatch.setattr(settings, "NOTIFICATION_DIGEST_WINDOW_MINUTES", 240)
+
+
+def _close_session(db, section, faculty, hour, absent_students):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date.today(),
+        start_time=datetime.utcnow().replace(hour=hour, minute=0, second=0, microsecond=0),
+        marked_by=faculty.faculty_id,
+    )
+    db.add(session)
+    db.flush()
+    records = [AttendanceRecord(student_id=student.student_id, status="absent") for student in absent_students]
+    NotificationService.queue_attendance_notifications(db, session.session_id, records)
+    db.commit()
+
+
+def test_absences_in_a_window_become_one_message_per_recipient(db_session, digest_mode):
+    faculty, section, (frequent, once) = seed_section(db_session, 2)
+    for hour in (9, 11, 14):
+        _close_session(db_session, section, faculty, hour, [frequent] if hour != 9 else [frequent, once])
+
+    assert db_session.query(NotificationOutbox).count() == 0
+    assert db_session.query(NotificationDigestEvent).count() == 16
+
+    assert notification_digest.flush_due_digests(db_session) == {"events": 0, "digests": 0}
+
+    result = notification_digest.flush_due_digests(db_session, now=datetime.utcnow() + timedelta(hours=5))
+    db_session.commit()
+    assert result == {"events": 16, "digests": 8}
+    assert db_session.query(NotificationDigestEvent).count() == 0
+
+    messages = {(row.channel, row.recipient): row for row in db_session.query(NotificationOutbox).all()}
+    digest_sms = messages[("sms", frequent.phone)]
+    assert "ABSENT in 3 classes" in digest_sms.body
+    assert "CSE-" in digest_sms.body and "09:00" in digest_sms.body
+    assert messages[("email", frequent.parent_email)].subject.endswith("absent in 3 classes")
+    # A window with a single absence goes out as the regular alert.
+    assert messages[("sms", once.phone)].body.startswith("Attendance Alert: You were marked ABSENT today.")
+
+
+def test_new_window_opens_after_the_previous_one_closes(db_session):
+    student_id = seed_section(db_session, 1)[2][0].student_id
+    target = [("student", "sms", "9000000000", student_id, {"first_name": "A"})]
+    start = datetime(2026, 1, 5, 9, 0)
+
+    notification_digest.stage_absence_events(db_session, None, target, "CSE101 09:00", window_minutes=60, now=start)
+    notification_digest.stage_absence_events(
+        db_session, None, target, "CSE102 09:30", window_minutes=60, now=start + timedelta(minutes=30)
+    )
+    notification_digest.stage_absence_events(
+        db_session, None, target, "CSE103 11:00", window_minutes=60, now=start + timedelta(hours=2)
+    )
+    db_session.commit()
+
+    flush_times = sorted({event.flush_at for event in db_session.query(NotificationDigestEvent).all()})
+    assert flush_times == [start + timedelta(hours=1), start + timedelta(hours=3)]
+
+    assert notification_digest.flush_due_digests(db_session, now=start + timedelta(hours=1)) == {"events": 2, "digests": 1}
+    assert notification_digest.flush_due_digests(db_session, now=start + timedelta(hours=3)) == {"events": 1, "digests": 1}
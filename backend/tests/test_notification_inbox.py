@@ -0,0 +1,208 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import notifications, realtime
+from app.database import get_db, get_read_db
+from app.models.attendance import AttendanceRecord
+from app.models.notification import Notification
+from app.services import notification_inbox
+from app.services.notification_hub import hub
+from app.services.notification_service import NotificationService
+from app.utils import auth as auth_utils
+from conftest import seed_section
+
+
+def _seed_inbox(db, user_id, count, start=None):
+    start = start or datetime(2026, 3, 2, 9, 0)
+    rows = [
+        Notification(
+            user_id=user_id,
+            notification_type="attendance",
+            title=f"Alert {index}",
+            message="Marked absent",
+            is_read=False,
+            # Pairs share a timestamp so pages must tie-break on the id.
+            created_at=start + timedelta(minutes=index // 2),
+        )
+        for index in range(count)
+    ]
+    db.add_all(rows)
+    db.flush()
+    notification_inbox.increment_unread(db, [user_id] * count)
+    db.commit()
+    return rows
+
+
+def test_keyset_pages_cover_every_row_once(db_session):
+    user = seed_section(db_session, 1)[2][0].user
+    rows = _seed_inbox(db_session, user.user_id, 7)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = notification_inbox.list_notifications(db_session, user.user_id, limit=3, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert {row.notification_id for row in seen} == {row.notification_id for row in rows}
+    assert [row.created_at for row in seen] == sorted((row.created_at for row in seen), reverse=True)
+
+
+def test_bad_cursor_is_rejected(db_session):
+    with pytest.raises(ValueError):
+        notification_inbox.list_notifications(db_session, None, cursor="not-a-cursor")
+
+
+def test_counter_tracks_fan_out_and_reads(db_session, assert_max_queries):
+    _faculty, _section, students = seed_section(db_session, 3)
+    records = [AttendanceRecord(student_id=student.student_id, status="absent") for student in students]
+    NotificationService.queue_attendance_notifications(db_session, None, records)
+    NotificationService.queue_attendance_notifications(db_session, None, records[:1])
+    db_session.commit()
+
+    first = students[0].user_id
+    with assert_max_queries(1):
+        assert notification_inbox.get_unread_count(db_session, first) == 2
+    assert notification_inbox.get_unread_count(db_session, students[1].user_id) == 1
+
+    notification = db_session.query(Notification).filter(Notification.user_id == first).first()
+    assert notification_inbox.mark_read(db_session, first, notification.notification_id) is True
+    assert notification_inbox.mark_read(db_session, first, notification.notification_id) is False
+    assert notification_inbox.get_unread_count(db_session, first) == 1
+
+    with pytest.raises(LookupError):
+        notification_inbox.mark_read(db_session, students[1].user_id, notification.notification_id)
+
+
+def test_mark_all_read_is_set_based(db_session, assert_max_queries):
+    user_id = seed_section(db_session, 1)[2][0].user_id
+    _seed_inbox(db_session, user_id, 40)
+
+    # One UPDATE on notifications, one on the counter.
+    with assert_max_queries(2):
+        assert notification_inbox.mark_all_read(db_session, user_id) == 40
+
+    assert notification_inbox.get_unread_count(db_session, user_id) == 0
+    assert db_session.query(Notification).filter(Notification.is_read.is_(False)).count() == 0
+
+
+def test_mark_all_read_keeps_notifications_that_arrive_meanwhile(db_session, monkeypatch):
+    user_id = seed_section(db_session, 1)[2][0].user_id
+    _seed_inbox(db_session, user_id, 3)
+    execute = db_session.execute
+    arrived = []
+
+    def _execute(statement, *args, **kwargs):
+        result = execute(statement, *args, **kwargs)
+        if not arrived:
+            # A fan-out lands after the notifications UPDATE and before the counter UPDATE.
+            arrived.append(
+                Notification(user_id=user_id, notification_type="attendance", title="Late", message="Marked absent")
+            )
+            db_session.add(arrived[0])
+            db_session.flush()
+            notification_inbox.increment_unread(db_session, [user_id])
+        return result
+
+    monkeypatch.setattr(db_session, "execute", _execute)
+    assert notification_inbox.mark_all_read(db_session, user_id) == 3
+    monkeypatch.undo()
+
+    assert notification_inbox.get_unread_count(db_session, user_id) == 1
+    assert db_session.query(Notification).filter(Notification.is_read.is_(False)).count() == 1
+
+
+def test_commit_wakes_subscribers_but_rollback_does_not(db_session):
+    user = seed_section(db_session, 1)[2][0].user
+
+    async def _scenario():
+        wakeup = hub.subscribe(user.user_id)
+        try:
+            notification_inbox.increment_unread(db_session, [user.user_id])
+            db_session.rollback()
+            await asyncio.sleep(0)
+            assert not wakeup.is_set()
+
+            notification_inbox.increment_unread(db_session, [user.user_id])
+            db_session.commit()
+            await asyncio.wait_for(wakeup.wait(), timeout=1)
+        finally:
+            hub.unsubscribe(user.user_id, wakeup)
+
+    asyncio.run(_scenario())
+    assert notification_inbox.get_unread_count(db_session, user.user_id) == 1
+
+
+@pytest.fixture
+def client(db_session_factory):
+    session = db_session_factory()
+    user = seed_section(session, 1)[2][0].user
+    _seed_inbox(session, user.user_id, 5)
+
+    def _override_db():
+        yield session
+
+    test_app = FastAPI()
+    test_app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
+    test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
+    test_app.dependency_overrides[auth_utils.get_current_user] = lambda: user
+    yield TestClient(test_app)
+    session.close()
+
+
+def test_inbox_api_round_trip(client):
+    page = client.get("/api/notifications", params={"limit": 2}).json()
+    assert len(page["items"]) == 2
+    assert page["unread_count"] == 5
+    assert page["next_cursor"]
+
+    second = client.get("/api/notifications", params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert {item["notification_id"] for item in second["items"]}.isdisjoint(
+        item["notification_id"] for item in page["items"]
+    )
+
+    read = client.post(f"/api/notifications/{page['items'][0]['notification_id']}/read").json()
+    assert read == {"marked": 1, "unread_count": 4}
+    assert client.get("/api/notifications/unread-count").json() == {"unread_count": 4}
+    assert client.post("/api/notifications/read-all").json() == {"marked": 4, "unread_count": 0}
+
+    assert client.get("/api/notifications", params={"cursor": "bogus"}).status_code == 400
+    missing = client.post("/api/notifications/00000000-0000-0000-0000-000000000000/read")
+    assert missing.status_code == 404
+
+
+def test_notification_socket_reads_wakeups_from_primary_and_unsubscribes_on_close(db_session_factory, monkeypatch):
+    session = db_session_factory()
+    user = seed_section(session, 1)[2][0].user
+    user_id = user.user_id
+    _seed_inbox(session, user_id, 2)
+    reads = []
+
+    def _opener(source):
+        def _open(*_args):
+            reads.append(source)
+            return db_session_factory()
+        return _open
+
+    monkeypatch.setattr(realtime, "_resolve_user_from_token", lambda token, db: user)
+    monkeypatch.setattr(realtime, "SessionLocal", _opener("primary"))
+    monkeypatch.setattr(realtime, "open_read_session", _opener("replica"))
+    test_app = FastAPI()
+    test_app.include_router(realtime.router)
+
+    with TestClient(test_app).websocket_connect("/ws/notifications?token=t") as websocket:
+        assert websocket.receive_json()["unread_count"] == 2
+        notification_inbox.increment_unread(session, [user_id])
+        session.commit()
+        assert websocket.receive_json()["unread_count"] == 3
+    session.close()
+
+    # Resolving the token, the first read, then the read after the in-process wakeup.
+    assert reads == ["primary", "replica", "primary"]
+    assert user_id not in hub._subscribers
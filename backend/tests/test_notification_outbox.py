@@ -0,0 +1,244 @@
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.models.notification import Notification, NotificationOutbox
+from app.schemas.attendance import AttendanceRecordCreate
+from app.services import attendance_service, notification_dispatcher
+from app.services.notification_dispatcher import InMemoryBroker, OutboxDispatcher
+from app.services.notification_service import NotificationService
+from conftest import seed_section
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = InMemoryBroker()
+    monkeypatch.setattr(notification_dispatcher, "_broker", broker)
+    return broker
+
+
+def _open_session(db, faculty, section):
+    session = AttendanceSession(
+        section_id=section.section_id,
+        session_date=date.today(),
+        start_time=datetime.utcnow(),
+        marked_by=faculty.faculty_id,
+    )
+    db.add(session)
+    db.commit()
+    return session
+
+
+def _queue(db, count, channel="email"):
+    for index in range(count):
+        db.add(NotificationOutbox(channel=channel, recipient=f"r{index}@example.com", subject="s", body="b"))
+    db.commit()
+
+
+def test_mark_attendance_commits_outbox_rows_without_sending(db_session, broker, monkeypatch):
+    faculty, section, students = seed_section(db_session, 6)
+    session = _open_session(db_session, faculty, section)
+
+    def _fail_send(*_args, **_kwargs):
+        raise AssertionError("delivery must not happen on the request path")
+
+    monkeypatch.setattr("app.services.notification_service.NotificationService.send_email", _fail_send)
+    monkeypatch.setattr("app.services.notification_service.NotificationService.send_sms", _fail_send)
+
+    payload = [
+        AttendanceRecordCreate(student_id=student.student_id, status="absent" if index < 2 else "present")
+        for index, student in enumerate(students)
+    ]
+    result = attendance_service.mark_bulk_attendance(db_session, session.session_id, payload, faculty.faculty_id)
+
+    assert result["absent_count"] == 2
+    assert result["notifications"]["student_emails"] == 2
+    assert result["notifications"]["parent_sms"] == 2
+    assert len(result["notifications"]["absentees"]) == 2
+    assert broker.published == 1
+
+    rows = db_session.query(NotificationOutbox).all()
+    assert len(rows) == 8
+    assert {row.status for row in rows} == {"pending"}
+    assert {row.reference_id for row in rows} == {session.session_id}
+    assert db_session.query(Notification).count() == 2
+
+
+@pytest.mark.parametrize("section_size", [3, 120])
+def test_notification_fan_out_is_constant_in_queries(db_session, assert_max_queries, section_size):
+    _faculty, _section, students = seed_section(db_session, section_size)
+    records = [AttendanceRecord(student_id=student.student_id, status="absent") for student in students]
+    db_session.expire_all()
+
+    # One joined SELECT for students + users, one bulk INSERT each for outbox and in-app rows,
+    # one upsert for unread counters.
+    with assert_max_queries(4):
+        result = NotificationService.queue_attendance_notifications(db_session, uuid.uuid4(), records)
+    db_session.commit()
+
+    assert len(result["absentees"]) == section_size
+    assert db_session.query(NotificationOutbox).count() == 4 * section_size
+    assert db_session.query(Notification).count() == section_size
+
+
+def test_dispatcher_batches_and_limits_channel_concurrency(db_session, db_session_factory):
+    _queue(db_session, 7, channel="email")
+    _queue(db_session, 3, channel="sms")
+
+    active = {"email": 0}
+    peak = {"email": 0}
+    lock = threading.Lock()
+
+    def _send_email(_message):
+        with lock:
+            active["email"] += 1
+            peak["email"] = max(peak["email"], active["email"])
+        time.sleep(0.02)
+        with lock:
+            active["email"] -= 1
+        return True
+
+    dispatcher = OutboxDispatcher(
+        db_session_factory,
+        senders={"email": _send_email, "sms": lambda _message: True},
+        batch_size=4,
+        concurrency={"email": 2, "sms": 1},
+    )
+    try:
+        assert dispatcher.drain() == {"sent": 10, "retried": 0, "failed": 0}
+    finally:
+        dispatcher.shutdown()
+
+    assert peak["email"] == 2
+    db_session.expire_all()
+    assert {row.status for row in db_session.query(NotificationOutbox).all()} == {"sent"}
+
+
+def test_failed_sends_back_off_then_fail_permanently(db_session, db_session_factory):
+    _queue(db_session, 1, channel="sms")
+
+    def _flaky(_message):
+        raise ConnectionError("gateway down")
+
+    dispatcher = OutboxDispatcher(
+        db_session_factory, senders={"sms": _flaky}, max_attempts=2, retry_base_seconds=60
+    )
+    try:
+        assert dispatcher.drain() == {"sent": 0, "retried": 1, "failed": 0}
+        row = db_session.query(NotificationOutbox).one()
+        assert row.status == "pending"
+        assert row.attempts == 1
+        assert "gateway down" in row.last_error
+        assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=50)
+
+        # Not due yet, so nothing is claimed.
+        assert dispatcher.drain() == {"sent": 0, "retried": 0, "failed": 0}
+
+        row.next_attempt_at = datetime.utcnow()
+        db_session.commit()
+        assert dispatcher.drain() == {"sent": 0, "retried": 0, "failed": 1}
+        db_session.expire_all()
+        assert db_session.query(NotificationOutbox).one().status == "failed"
+    finally:
+        dispatcher.shutdown()
+
+
+def test_stale_sending_rows_are_reclaimed(db_session, db_session_factory):
+    _queue(db_session, 1)
+    row = db_session.query(NotificationOutbox).one()
+    row.status = "sending"
+    row.locked_at = datetime.utcnow() - timedelta(hours=1)
+    db_session.commit()
+
+    dispatcher = OutboxDispatcher(db_session_factory, senders={"email": lambda _message: True})
+    try:
+        assert dispatcher.drain()["sent"] == 1
+    finally:
+        dispatcher.shutdown()
+
+
+def test_stale_sending_rows_stop_after_max_attempts(db_session, db_session_factory):
+    _queue(db_session, 1)
+    row = db_session.query(NotificationOutbox).one()
+    # The worker died mid-send on every attempt, the last one included.
+    row.status, row.attempts = "sending", 3
+    row.locked_at = datetime.utcnow() - timedelta(hours=1)
+    db_session.commit()
+    sent = []
+
+    dispatcher = OutboxDispatcher(db_session_factory, senders={"email": sent.append}, max_attempts=3)
+    try:
+        assert dispatcher.drain() == {"sent": 0, "retried": 0, "failed": 0}
+    finally:
+        dispatcher.shutdown()
+
+    assert sent == []
+    db_session.expire_all()
+    row = db_session.query(NotificationOutbox).one()
+    assert (row.status, row.attempts, row.locked_at) == ("failed", 3, None)
+    assert "lease" in row.last_error
+
+
+def test_background_worker_wakes_on_publish(db_session, db_session_factory):
+    delivered = threading.Event()
+    broker = InMemoryBroker()
+    dispatcher = OutboxDispatcher(db_session_factory, senders={"email": lambda _message: delivered.set() or True})
+    dispatcher.start(broker, poll_seconds=30)
+    try:
+        _queue(db_session, 1)
+        broker.publish()
+        assert delivered.wait(5)
+    finally:
+        dispatcher.shutdown()
+
+
+def test_batch_senders_get_one_chunk_per_worker(db_session, db_session_factory):
+    _queue(db_session, 9)
+
+    class _BatchSender:
+        def __init__(self):
+            self.chunks = []
+
+        def __call__(self, _message):
+            raise AssertionError("batch senders are called with send_batch")
+
+        def send_batch(self, messages):
+            self.chunks.append(len(messages))
+            return [None if message.recipient != "r4@example.com" else "550 rejected" for message in messages]
+
+    sender = _BatchSender()
+    dispatcher = OutboxDispatcher(db_session_factory, senders={"email": sender}, concurrency={"email": 3})
+    try:
+        assert dispatcher.drain(max_batches=1) == {"sent": 8, "retried": 1, "failed": 0}
+    finally:
+        dispatcher.shutdown()
+
+    assert sorted(sender.chunks) == [3, 3, 3]
+
+
+def test_shutdown_waits_for_in_flight_sends(db_session, db_session_factory, monkeypatch):
+    started, finished = threading.Event(), []
+
+    def _slow_send(_message):
+        started.set()
+        time.sleep(0.2)
+        finished.append(True)
+        return True
+
+    broker = InMemoryBroker()
+    dispatcher = OutboxDispatcher(db_session_factory, senders={"email": _slow_send})
+    monkeypatch.setattr(notification_dispatcher, "_dispatcher", dispatcher)
+    dispatcher.start(broker, poll_seconds=30)
+    _queue(db_session, 1)
+    broker.publish()
+    assert started.wait(5)
+
+    notification_dispatcher.shutdown_dispatcher()
+
+    assert finished == [True]
+    assert notification_dispatcher._dispatcher is None
+    assert all(executor._shutdown for executor in dispatcher._executors.values())
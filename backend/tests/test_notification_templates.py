@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.notification_templates import (
+    ATTENDANCE_PARENT_EMAIL,
+    ATTENDANCE_STUDENT_SMS,
+    NotificationTemplate,
+    get_template,
+)
+
+CONTEXT = {
+    "first_name": "Asha",
+    "last_name": "Verma",
+    "registration_number": "12110001",
+    "program": "B.Tech CSE",
+    "semester": 3,
+}
+
+
+def test_identical_renders_share_one_string():
+    template = NotificationTemplate("test.greeting", "Hi {name}, reg {reg}")
+
+    first = template.render({"name": "Asha", "reg": 1})
+    second = template.render({"name": "Asha", "reg": 1})
+    other = template.render({"name": "Ravi", "reg": 2})
+
+    assert first == "Hi Asha, reg 1"
+    assert first is second
+    assert other == "Hi Ravi, reg 2"
+    assert (template.hits, template.misses) == (1, 2)
+
+
+def test_constant_templates_render_without_context():
+    assert ATTENDANCE_STUDENT_SMS.fields == ()
+    assert ATTENDANCE_STUDENT_SMS.render({}) is ATTENDANCE_STUDENT_SMS.render({"ignored": 1})
+
+
+def test_html_templates_escape_values():
+    body = ATTENDANCE_PARENT_EMAIL.render({**CONTEXT, "last_name": "<script>"})
+
+    assert "&lt;script&gt;" in body
+    assert "<script>" not in body
+    assert body.startswith("<html>")
+
+
+def test_render_many_and_cache_bound():
+    template = NotificationTemplate("test.bounded", "{name}", cache_size=2)
+
+    assert template.render_many([{"name": "a"}, {"name": "b"}, {"name": "c"}, {"name": "a"}]) == ["a", "b", "c", "a"]
+    assert template.misses == 4
+
+
+def test_bad_placeholders_fail_at_compile_time():
+    with pytest.raises(ValueError):
+        NotificationTemplate("test.bad", "{user.name}")
+    with pytest.raises(LookupError):
+        get_template("missing")
@@ -0,0 +1,135 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.models.attendance import AttendanceRecord, AttendanceSession
+from app.models.food import FoodMenuItem, FoodOrder, FoodVendor, OrderItem
+from app.models.notification import Notification
+from app.models.remedial import RemedialAttendance, RemedialClass
+from app.models.user import User, UserRole
+from app.services import (
+    ai_service,
+    attendance_service,
+    attendance_stats,
+    food_service,
+    notification_inbox,
+    remedial_service,
+)
+from conftest import seed_section
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def seeded(db_session):
+    """A couple of sections with a week of attendance, food orders, remedial marks and an inbox."""
+    db = db_session
+    faculty, section, students = seed_section(db, 6)
+    _other_faculty, other_section, _ = seed_section(db, 4)
+
+    for day in range(7):
+        for target in (section, other_section):
+            started = datetime.combine(TODAY - timedelta(days=day), time(9))
+            session = AttendanceSession(
+                section_id=target.section_id,
+                session_date=started.date(),
+                start_time=started,
+                session_type="ai_face" if day % 2 else "regular",
+                is_closed=True,
+                total_students=len(students),
+                present_count=len(students) - 1,
+            )
+            db.add(session)
+            db.flush()
+            db.add_all(
+                AttendanceRecord(
+                    session_id=session.session_id,
+                    student_id=student.student_id,
+                    session_date=session.session_date,
+                    status="absent" if index == day % len(students) else "present",
+                    marked_at=started,
+                    confidence_score=0.9,
+                )
+                for index, student in enumerate(students)
+            )
+    attendance_stats.rebuild(db)
+
+    vendor_user = User(email="vendor-plans@example.com", role=UserRole.VENDOR)
+    db.add(vendor_user)
+    db.flush()
+    vendor = FoodVendor(user_id=vendor_user.user_id, vendor_name="Canteen")
+    db.add(vendor)
+    db.flush()
+    item = FoodMenuItem(vendor_id=vendor.vendor_id, item_name="Dosa", price=40)
+    db.add(item)
+    db.flush()
+    for index, student in enumerate(students):
+        order = FoodOrder(
+            student_id=student.student_id,
+            vendor_id=vendor.vendor_id,
+            order_date=TODAY - timedelta(days=index),
+            order_time=datetime.combine(TODAY - timedelta(days=index), time(12)),
+            total_amount=40,
+            pickup_code=f"P{index:04d}",
+        )
+        db.add(order)
+        db.flush()
+        db.add(OrderItem(order_id=order.order_id, item_id=item.item_id, quantity=1, item_price=40, subtotal=40))
+
+    remedial = RemedialClass(
+        section_id=section.section_id,
+        faculty_id=faculty.faculty_id,
+        scheduled_date=TODAY,
+        start_time=time(16),
+        end_time=time(17),
+        remedial_code="RMD001",
+        code_expires_at=datetime.utcnow() + timedelta(hours=1),
+    )
+    db.add(remedial)
+    db.flush()
+    db.add(RemedialAttendance(remedial_id=remedial.remedial_id, student_id=students[0].student_id))
+
+    db.add_all(
+        Notification(user_id=students[0].user_id, title=f"Alert {index}", message="Marked absent")
+        for index in range(5)
+    )
+    db.commit()
+    return {
+        "faculty_id": faculty.faculty_id,
+        "section_id": section.section_id,
+        "student_id": students[0].student_id,
+        "user_id": students[0].user_id,
+        "vendor_user_id": vendor_user.user_id,
+        "vendor_id": vendor.vendor_id,
+    }
+
+
+SERVICE_QUERIES = {
+    "faculty_sections": lambda db, s: attendance_service.get_faculty_sections(db, s["faculty_id"]),
+    "section_roster": lambda db, s: attendance_service.list_section_students(db, s["section_id"], s["faculty_id"]),
+    "student_history": lambda db, s: attendance_service.list_student_attendance(
+        db, s["student_id"], date_from=TODAY - timedelta(days=3), section_id=s["section_id"]
+    ),
+    "student_summary": lambda db, s: attendance_service.summarize_student_attendance(db, s["student_id"]),
+    "student_stats": lambda db, s: attendance_stats.get_student_stats(db, s["student_id"]),
+    "faculty_insights": lambda db, s: ai_service.get_faculty_attendance_ai_insights(db, s["faculty_id"]),
+    "student_orders": lambda db, s: food_service.get_student_orders(db, s["student_id"]),
+    "vendor_orders": lambda db, s: food_service.get_vendor_orders(db, s["vendor_user_id"]),
+    "food_rush": lambda db, s: ai_service.predict_food_rush(db),
+    "vendor_food_rush": lambda db, s: ai_service.predict_food_rush(db, s["vendor_id"]),
+    "remedial_history": lambda db, s: remedial_service.get_student_remedial_attendance(db, s["student_id"]),
+    "inbox": lambda db, s: notification_inbox.list_notifications(db, s["user_id"]),
+    "unread_inbox": lambda db, s: notification_inbox.list_notifications(db, s["user_id"], unread_only=True),
+}
+
+
+@pytest.mark.parametrize("name", sorted(SERVICE_QUERIES))
+def test_service_queries_use_indexes(name, seeded, db_session, assert_no_full_scans):
+    with assert_no_full_scans(db_session):
+        SERVICE_QUERIES[name](db_session, seeded)
+
+
+def test_harness_flags_unindexed_filter(seeded, db_session, assert_no_full_scans):
+    with pytest.raises(AssertionError, match="SCAN food_orders"):
+        with assert_no_full_scans(db_session):
+            db_session.query(FoodOrder).filter(FoodOrder.total_amount > 10).all()
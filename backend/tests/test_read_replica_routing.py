@@ -0,0 +1,125 @@
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import ReplicaRouter, RoutingSession, build_engine, get_db, get_read_db
+from app.models.resource import Block
+
+
+@pytest.fixture
+def stand_ins(tmp_path, monkeypatch):
+    primary = build_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = build_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        Block.__table__.create(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(Block.__table__.insert().values(block_id=uuid.uuid4(), block_name=name, block_code=name[:3]))
+
+    lags = {id(replica): 0.0}
+    router = ReplicaRouter(
+        replicas=[replica],
+        max_lag_seconds=5.0,
+        lag_check_interval_seconds=0.0,
+        read_your_writes_seconds=60.0,
+        lag_probe=lambda engine: lags[id(engine)],
+    )
+    factory = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=primary)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    monkeypatch.setattr(database, "ReadSessionLocal", factory)
+
+    yield primary, replica, router, lags
+    primary.dispose()
+    replica.dispose()
+
+
+def _block_names(db):
+    return sorted(block.block_name for block in db.query(Block).all())
+
+
+def test_reads_go_to_replica_and_writes_to_primary(stand_ins):
+    primary, replica, _router, _lags = stand_ins
+
+    db = database.open_read_session()
+    try:
+        assert db.info["read_bind"] is replica
+        assert _block_names(db) == ["replica"]
+
+        db.add(Block(block_name="new", block_code="NEW"))
+        db.commit()
+    finally:
+        db.close()
+
+    with sessionmaker(bind=primary)() as primary_db:
+        assert _block_names(primary_db) == ["new", "primary"]
+
+
+def test_lagging_replica_falls_back_to_primary(stand_ins):
+    _primary, replica, router, lags = stand_ins
+    lags[id(replica)] = 30.0
+
+    assert router.choose() is None
+    db = database.open_read_session()
+    try:
+        assert _block_names(db) == ["primary"]
+    finally:
+        db.close()
+
+
+def test_unreachable_replica_falls_back_to_primary(stand_ins):
+    _primary, _replica, router, _lags = stand_ins
+
+    def _raise(_engine):
+        raise ConnectionError("replica down")
+
+    router.lag_probe = _raise
+    assert router.choose() is None
+
+
+def test_user_reads_own_write_from_primary(stand_ins):
+    app = FastAPI()
+
+    @app.post("/blocks")
+    def create_block(db=Depends(get_db)):
+        db.add(Block(block_name="mine", block_code="MIN"))
+        db.commit()
+        return {"ok": True}
+
+    @app.get("/blocks")
+    def list_blocks(db=Depends(get_read_db)):
+        return _block_names(db)
+
+    client = TestClient(app)
+    writer = {"Authorization": "Bearer writer-token"}
+    other = {"Authorization": "Bearer other-token"}
+
+    assert client.get("/blocks", headers=writer).json() == ["replica"]
+    assert client.post("/blocks", headers=writer).status_code == 200
+    assert client.get("/blocks", headers=writer).json() == ["mine", "primary"]
+    assert client.get("/blocks", headers=other).json() == ["replica"]
+
+
+def test_expired_pins_are_pruned_when_new_ones_arrive(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+    router = ReplicaRouter(
+        replicas=[object()],
+        max_lag_seconds=5.0,
+        lag_check_interval_seconds=0.0,
+        read_your_writes_seconds=10.0,
+        lag_probe=lambda engine: 0.0,
+    )
+    for token in range(50):
+        router.pin(f"token-{token}")
+    clock[0] = 105.0
+    router.pin("token-0")  # re-pinned: now the newest entry
+
+    clock[0] = 111.0
+    router.pin("fresh")
+
+    assert list(router._pins) == ["token-0", "fresh"]
+    assert router.is_pinned("token-0") and not router.is_pinned("token-1")
@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database import build_engine
+from app.models.resource import Block
+from app.utils.instrumentation import MetricsRegistry, build_instrumentation_middleware
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    Block.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _build_app(engine, metrics_registry, server_timing=False):
+    app = FastAPI()
+    app.middleware("http")(build_instrumentation_middleware(metrics_registry, server_timing=server_timing))
+    factory = sessionmaker(bind=engine)
+
+    @app.get("/blocks/{block_code}")
+    def get_block(block_code: str):
+        with factory() as db:
+            db.add(Block(block_id=uuid.uuid4(), block_name=block_code, block_code=block_code))
+            db.commit()
+            return {"count": db.query(Block).count()}
+
+    @app.get("/metrics")
+    def metrics():
+        return metrics_registry.render_prometheus({"primary": engine.pool})
+
+    return app
+
+
+def test_metrics_are_grouped_by_route_template(engine):
+    metrics_registry = MetricsRegistry()
+    client = TestClient(_build_app(engine, metrics_registry))
+
+    client.get("/blocks/A1")
+    client.get("/blocks/B2")
+    client.get("/missing")
+
+    routes = metrics_registry.routes()
+    block_metrics = routes[("GET", "/blocks/{block_code}")]
+    assert block_metrics.statuses == {200: 2}
+    assert block_metrics.queries == 4
+    assert block_metrics.db_seconds > 0
+    assert routes[("GET", "<unmatched>")].statuses == {404: 1}
+
+    exposition = metrics_registry.render_prometheus({"primary": engine.pool})
+    assert 'http_request_db_queries_total{method="GET",route="/blocks/{block_code}"} 4' in exposition
+    assert 'http_request_duration_seconds_count{method="GET",route="/blocks/{block_code}"} 2' in exposition
+    assert 'db_pool_checked_out{pool="primary"} 0' in exposition
+
+
+def test_server_timing_header_is_optional(engine):
+    plain = TestClient(_build_app(engine, MetricsRegistry()))
+    assert "Server-Timing" not in plain.get("/blocks/A1").headers
+
+    timed = TestClient(_build_app(engine, MetricsRegistry(), server_timing=True))
+    header = timed.get("/blocks/B2").headers["Server-Timing"]
+    assert header.startswith("app;dur=")
+    assert 'desc="2 queries"' in header
+
+
+def test_assert_max_queries_helper(engine, assert_max_queries):
+    client = TestClient(_build_app(engine, MetricsRegistry()))
+
+    with assert_max_queries(2) as stats:
+        client.get("/blocks/A1")
+    assert stats.queries == 2
+
+    with pytest.raises(AssertionError, match="expected at most 1 queries"):
+        with assert_max_queries(1):
+            client.get("/blocks/B2")
@@ -0,0 +1,152 @@
+import smtplib
+import socket
+
+import pytest
+
+from app.services.smtp_pool import SMTPConnectionPool, build_message
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller  # noqa: E402
+
+
+class _RecordingHandler:
+    def __init__(self):
+        self.sessions = set()
+        self.recipients = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("reject"):
+            return "550 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def _pool(controller, **kwargs):
+    return SMTPConnectionPool(controller.hostname, controller.port, use_tls=False, **kwargs)
+
+
+def _messages(count, prefix="student"):
+    return [build_message("alerts@example.com", f"{prefix}{i}@example.com", "Absent", "<p>hi</p>") for i in range(count)]
+
+
+def test_batch_reuses_one_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = _pool(controller)
+    try:
+        assert pool.send_batch(_messages(25)) == [None] * 25
+        assert pool.send_batch(_messages(5)) == [None] * 5
+    finally:
+        pool.close()
+
+    assert pool.connections_opened == 1
+    assert len(handler.sessions) == 1
+    assert len(handler.recipients) == 30
+
+
+def test_rejected_recipient_does_not_break_the_batch(smtp_server):
+    controller, handler = smtp_server
+    pool = _pool(controller)
+    messages = _messages(2) + _messages(1, prefix="reject") + _messages(2, prefix="late")
+    try:
+        results = pool.send_batch(messages)
+    finally:
+        pool.close()
+
+    assert [result is None for result in results] == [True, True, False, True, True]
+    assert "SMTPRecipientsRefused" in results[2]
+    assert pool.connections_opened == 1
+    assert len(handler.recipients) == 4
+
+
+def test_reconnects_after_server_drops_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = _pool(controller)
+    try:
+        assert pool.send_batch(_messages(1)) == [None]
+        with pool.connection() as connection:
+            connection.client.sock.shutdown(socket.SHUT_RDWR)
+        assert pool.send_batch(_messages(3)) == [None] * 3
+    finally:
+        pool.close()
+
+    assert pool.connections_opened == 2
+    assert len(handler.recipients) == 4
+
+
+def test_rotates_connections_after_message_cap(smtp_server):
+    controller, _handler = smtp_server
+    pool = _pool(controller, max_messages_per_connection=4)
+    try:
+        assert pool.send_batch(_messages(10)) == [None] * 10
+    finally:
+        pool.close()
+
+    assert pool.connections_opened == 3
+
+
+def _count_connects(pool):
+    attempts = []
+    open_connection = pool._open
+
+    def _open():
+        attempts.append(1)
+        return open_connection()
+
+    pool._open = _open
+    return attempts
+
+
+def test_unreachable_server_fails_the_batch_after_one_connect():
+    pool = SMTPConnectionPool("127.0.0.1", _free_port(), use_tls=False, timeout=1.0)
+    attempts = _count_connects(pool)
+
+    results = pool.send_batch(_messages(50))
+
+    assert len(attempts) == 1
+    assert all(result.startswith("ConnectionRefusedError") for result in results)
+
+
+class _RejectingLogin:
+    def __init__(self, host, port, timeout):
+        pass
+
+    def ehlo(self):
+        pass
+
+    def login(self, username, password):
+        raise smtplib.SMTPAuthenticationError(535, b"5.7.8 Authentication credentials invalid")
+
+    def close(self):
+        pass
+
+
+def test_rejected_login_is_not_retried(monkeypatch):
+    monkeypatch.setattr(smtplib, "SMTP", _RejectingLogin)
+    pool = SMTPConnectionPool("smtp.example.com", use_tls=False, username="alerts", password="wrong")
+    attempts = _count_connects(pool)
+
+    results = pool.send_batch(_messages(20))
+    pool.send_batch(_messages(20))
+
+    assert len(attempts) == 2  # one per batch, not one or two per message
+    assert all(result.startswith("SMTPAuthenticationError") for result in results)
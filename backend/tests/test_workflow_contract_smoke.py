@@ -6,7 +6,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.api import attendance, food, remedial
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.services import attendance_service
 from app.utils import auth as auth_utils
 
@@ -39,6 +39,7 @@ def app():
     test_app.include_router(food.router, prefix="/api/food", tags=["Food"])
     test_app.include_router(remedial.router, prefix="/api/remedial", tags=["Remedial"])
     test_app.dependency_overrides[get_db] = _override_db
+    test_app.dependency_overrides[get_read_db] = _override_db
     return test_app
 
 
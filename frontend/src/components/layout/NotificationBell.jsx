@@ -1,14 +1,17 @@
-import { useEffect, useRef, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
 import { Bell } from 'lucide-react';
+import authService from '../../services/authService';
+import notificationService from '../../services/notificationService';
+import { connectNotificationSocket } from '../../services/realtimeService';
 
-const notifications = [
-  { id: 'attn', title: 'Attendance updated', detail: 'Attendance records were updated.' },
-  { id: 'food', title: 'Food order ready', detail: 'A recent order is marked ready for pickup.' },
-  { id: 'warn', title: 'Low attendance alert', detail: 'Some students dropped below attendance threshold.' },
-];
+const PAGE_SIZE = 10;
 
 export default function NotificationBell() {
   const [open, setOpen] = useState(false);
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [unreadCount, setUnreadCount] = useState(0);
+  const [loading, setLoading] = useState(false);
   const rootRef = useRef(null);
 
   useEffect(() => {
@@ -22,6 +25,78 @@ export default function NotificationBell() {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
+  useEffect(() => {
+    let socket = null;
+    let mounted = true;
+
+    const connect = async () => {
+      try {
+        const token = await authService.getAuthToken();
+        if (!mounted || !token) return;
+
+        socket = connectNotificationSocket({
+          token,
+          onMessage: (payload) => {
+            if (!mounted || !payload || payload.error) return;
+            setUnreadCount(payload.unread_count || 0);
+          },
+        });
+      } catch (error) {
+        // The badge falls back to the count returned with each page.
+      }
+    };
+
+    connect();
+
+    return () => {
+      mounted = false;
+      if (socket) socket.close();
+    };
+  }, []);
+
+  const loadPage = useCallback(async (cursor = null) => {
+    setLoading(true);
+    try {
+      const params = { limit: PAGE_SIZE };
+      if (cursor) params.cursor = cursor;
+      const page = await notificationService.listNotifications(params);
+      setItems((current) => (cursor ? [...current, ...page.items] : page.items));
+      setNextCursor(page.next_cursor);
+      setUnreadCount(page.unread_count);
+    } catch (error) {
+      // Keep whatever is already shown.
+    } finally {
+      setLoading(false);
+    }
+  }, []);
+
+  useEffect(() => {
+    if (open) loadPage();
+  }, [open, loadPage]);
+
+  const handleMarkRead = async (item) => {
+    if (item.is_read) return;
+    try {
+      const result = await notificationService.markRead(item.notification_id);
+      setUnreadCount(result.unread_count);
+      setItems((current) => current.map((entry) => (
+        entry.notification_id === item.notification_id ? { ...entry, is_read: true } : entry
+      )));
+    } catch (error) {
+      // Leave the item unread.
+    }
+  };
+
+  const handleMarkAllRead = async () => {
+    try {
+      await notificationService.markAllRead();
+      setUnreadCount(0);
+      setItems((current) => current.map((entry) => ({ ...entry, is_read: true })));
+    } catch (error) {
+      // Leave the items unread.
+    }
+  };
+
   return (
     <div className="relative" ref={rootRef}>
       <button
@@ -33,9 +108,11 @@ export default function NotificationBell() {
         title="Notifications"
       >
         <Bell size={18} style={{ color: 'var(--text-color)' }} />
-        <span className="absolute -right-1 -top-1 rounded-full bg-red-500 px-1.5 text-[10px] text-white">
-          {notifications.length}
-        </span>
+        {unreadCount > 0 && (
+          <span className="absolute -right-1 -top-1 rounded-full bg-red-500 px-1.5 text-[10px] text-white">
+            {unreadCount > 99 ? '99+' : unreadCount}
+          </span>
+        )}
       </button>
 
       {open && (
@@ -43,24 +120,57 @@ export default function NotificationBell() {
           className="absolute right-0 z-50 mt-2 w-72 rounded-xl border p-3 shadow-lg"
           style={{ borderColor: 'var(--border-color)', background: 'var(--card-bg)' }}
         >
-          <p className="mb-2 text-sm font-semibold" style={{ color: 'var(--text-color)' }}>
-            Notifications
-          </p>
-          <div className="space-y-2">
-            {notifications.map((item) => (
-              <div
-                key={item.id}
-                className="rounded-lg border p-2"
-                style={{ borderColor: 'var(--border-color)', background: 'var(--card-bg-pink)' }}
+          <div className="mb-2 flex items-center justify-between">
+            <p className="text-sm font-semibold" style={{ color: 'var(--text-color)' }}>
+              Notifications
+            </p>
+            {unreadCount > 0 && (
+              <button
+                type="button"
+                onClick={handleMarkAllRead}
+                className="text-xs underline"
+                style={{ color: 'var(--text-secondary)' }}
+              >
+                Mark all read
+              </button>
+            )}
+          </div>
+          <div className="max-h-80 space-y-2 overflow-y-auto">
+            {items.length === 0 && !loading && (
+              <p className="text-xs" style={{ color: 'var(--text-secondary)' }}>
+                No notifications yet.
+              </p>
+            )}
+            {items.map((item) => (
+              <button
+                type="button"
+                key={item.notification_id}
+                onClick={() => handleMarkRead(item)}
+                className="block w-full rounded-lg border p-2 text-left"
+                style={{
+                  borderColor: 'var(--border-color)',
+                  background: item.is_read ? 'var(--card-bg)' : 'var(--card-bg-pink)',
+                }}
               >
                 <p className="text-sm font-medium" style={{ color: 'var(--text-color)' }}>
                   {item.title}
                 </p>
                 <p className="text-xs" style={{ color: 'var(--text-secondary)' }}>
-                  {item.detail}
+                  {item.message}
                 </p>
-              </div>
+              </button>
             ))}
+            {nextCursor && (
+              <button
+                type="button"
+                onClick={() => loadPage(nextCursor)}
+                disabled={loading}
+                className="w-full text-xs underline"
+                style={{ color: 'var(--text-secondary)' }}
+              >
+                {loading ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         </div>
       )}
@@ -518,8 +518,13 @@ function FacultyAttendance() {
   );
 }
 
+const HISTORY_PAGE_SIZE = 50;
+
 function StudentAttendance() {
   const [records, setRecords] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [status, setStatus] = useState('');
   const [enrollFiles, setEnrollFiles] = useState([]);
@@ -531,8 +536,13 @@ function StudentAttendance() {
     const loadHistory = async () => {
       setLoading(true);
       try {
-        const history = await attendanceService.getMyAttendanceHistory();
-        setRecords(history);
+        const [history, summary] = await Promise.all([
+          attendanceService.getMyAttendanceHistory({ limit: HISTORY_PAGE_SIZE }),
+          attendanceService.getMyAttendanceStats(),
+        ]);
+        setRecords(history.items);
+        setNextCursor(history.next_cursor);
+        setStats(summary);
       } catch (error) {
         setStatus(getApiErrorMessage(error, 'Failed to load attendance history'));
       } finally {
@@ -542,10 +552,27 @@ function StudentAttendance() {
     loadHistory();
   }, []);
 
-  const total = records.length;
-  const present = records.filter((record) => record.status === 'present').length;
-  const absent = records.filter((record) => record.status === 'absent').length;
-  const percentage = total ? ((present / total) * 100).toFixed(2) : '0.00';
+  const loadMoreHistory = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const history = await attendanceService.getMyAttendanceHistory({
+        limit: HISTORY_PAGE_SIZE,
+        cursor: nextCursor,
+      });
+      setRecords((current) => [...current, ...history.items]);
+      setNextCursor(history.next_cursor);
+    } catch (error) {
+      setStatus(getApiErrorMessage(error, 'Failed to load attendance history'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const total = stats?.total_count || 0;
+  const present = stats?.present_count || 0;
+  const absent = stats?.absent_count || 0;
+  const percentage = (stats?.attendance_percent || 0).toFixed(2);
 
   const handleEnrollment = async () => {
     if (enrollFiles.length < 5 || enrollFiles.length > 10) {
@@ -645,6 +672,16 @@ function StudentAttendance() {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <button
+                  type="button"
+                  onClick={loadMoreHistory}
+                  disabled={loadingMore}
+                  className="mt-3 rounded-md border border-gray-300 px-4 py-2 text-sm disabled:opacity-60"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              )}
             </div>
           )}
         </div>
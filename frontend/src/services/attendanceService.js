@@ -53,9 +53,9 @@ const attendanceService = {
     }
   },
 
-  async getStudentAttendance(studentId) {
+  async getStudentAttendance(studentId, params = {}) {
     try {
-      const response = await api.get(`/attendance/student/${studentId}`);
+      const response = await api.get(`/attendance/student/${studentId}`, { params });
       return response.data;
     } catch (error) {
       console.error('Get student attendance error:', error.response?.data || error.message);
@@ -63,9 +63,29 @@ const attendanceService = {
     }
   },
 
-  async getMyAttendanceHistory() {
+  async getMyAttendanceSummary(params = {}) {
     try {
-      const response = await api.get('/attendance/me/history');
+      const response = await api.get('/attendance/me/summary', { params });
+      return response.data;
+    } catch (error) {
+      console.error('Get my attendance summary error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  async getMyAttendanceStats() {
+    try {
+      const response = await api.get('/attendance/me/stats');
+      return response.data;
+    } catch (error) {
+      console.error('Get my attendance stats error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  async getMyAttendanceHistory(params = {}) {
+    try {
+      const response = await api.get('/attendance/me/history', { params });
       return response.data;
     } catch (error) {
       console.error('Get my attendance history error:', error.response?.data || error.message);
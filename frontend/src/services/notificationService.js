@@ -0,0 +1,45 @@
+import api from './api';
+
+const notificationService = {
+  async listNotifications(params = {}) {
+    try {
+      const response = await api.get('/notifications', { params });
+      return response.data;
+    } catch (error) {
+      console.error('List notifications error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  async getUnreadCount() {
+    try {
+      const response = await api.get('/notifications/unread-count');
+      return response.data;
+    } catch (error) {
+      console.error('Get unread count error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  async markRead(notificationId) {
+    try {
+      const response = await api.post(`/notifications/${notificationId}/read`);
+      return response.data;
+    } catch (error) {
+      console.error('Mark notification read error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+
+  async markAllRead() {
+    try {
+      const response = await api.post('/notifications/read-all');
+      return response.data;
+    } catch (error) {
+      console.error('Mark all notifications read error:', error.response?.data || error.message);
+      throw error;
+    }
+  },
+};
+
+export default notificationService;
@@ -27,3 +27,24 @@ export function connectFoodRushSocket({ token, vendorId, onMessage, onError, onC
 
   return socket;
 }
+
+export function connectNotificationSocket({ token, onMessage, onError, onClose }) {
+  const base = toWsBaseUrl();
+  const query = new URLSearchParams({ token });
+
+  const socket = new WebSocket(`${base}/api/realtime/ws/notifications?${query.toString()}`);
+
+  socket.onmessage = (event) => {
+    try {
+      const payload = JSON.parse(event.data);
+      onMessage?.(payload);
+    } catch (error) {
+      onError?.(error);
+    }
+  };
+
+  socket.onerror = (event) => onError?.(event);
+  socket.onclose = (event) => onClose?.(event);
+
+  return socket;
+}
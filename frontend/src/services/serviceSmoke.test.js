@@ -1,6 +1,7 @@
 import api from './api';
 import attendanceService from './attendanceService';
 import foodService from './foodService';
+import notificationService from './notificationService';
 import remedialService from './remedialService';
 import studentService from './studentService';
 
@@ -21,6 +22,18 @@ describe('service smoke contracts', () => {
     expect(api.get).toHaveBeenCalledWith('/attendance/sections/my');
   });
 
+  test('attendance stats endpoint contract', async () => {
+    api.get.mockResolvedValue({ data: { sections: [] } });
+    await attendanceService.getMyAttendanceStats();
+    expect(api.get).toHaveBeenCalledWith('/attendance/me/stats');
+  });
+
+  test('attendance history page contract', async () => {
+    api.get.mockResolvedValue({ data: { items: [], next_cursor: null } });
+    await attendanceService.getMyAttendanceHistory({ limit: 50, cursor: 'abc' });
+    expect(api.get).toHaveBeenCalledWith('/attendance/me/history', { params: { limit: 50, cursor: 'abc' } });
+  });
+
   test('food order status update contract', async () => {
     api.put.mockResolvedValue({ data: { message: 'ok' } });
     await foodService.updateOrderStatus('order-1', 'ready');
@@ -35,6 +48,18 @@ describe('service smoke contracts', () => {
     });
   });
 
+  test('notification inbox page contract', async () => {
+    api.get.mockResolvedValue({ data: { items: [], next_cursor: null, unread_count: 0 } });
+    await notificationService.listNotifications({ limit: 10, cursor: 'abc' });
+    expect(api.get).toHaveBeenCalledWith('/notifications', { params: { limit: 10, cursor: 'abc' } });
+  });
+
+  test('notification mark all read contract', async () => {
+    api.post.mockResolvedValue({ data: { marked: 3, unread_count: 0 } });
+    await notificationService.markAllRead();
+    expect(api.post).toHaveBeenCalledWith('/notifications/read-all');
+  });
+
   test('student list query contract', async () => {
     api.get.mockResolvedValue({ data: [] });
     await studentService.listStudents({ search: 'riya' });